@@ -1,14 +1,43 @@
 # backend/app.py
-from flask import Flask, request, jsonify, send_from_directory
+import os
+# Modo de servidor cooperativo (gevent): o monkey patch precisa acontecer antes dos demais imports
+if os.environ.get('TECHFLOW_SERVIDOR') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, request, jsonify, abort, g, has_request_context, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_cors import CORS
 import jwt
 from datetime import datetime, timedelta
 import re
-import os
+import base64
+import calendar
+import io
+import hashlib
+import html
+import json
+import queue
+import unicodedata
+import threading
+import time
 import logging
+import math
+import atexit
+import random
+from logging.handlers import QueueHandler, QueueListener
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import BrokenExecutor, TimeoutError as FuturoTimeoutError
 from functools import wraps # Importado para o decorador jwt_required
+from itertools import count
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.schema import CreateTable
+from urllib.parse import quote, unquote
+# csv, gzip, mimetypes, brotli e o ProcessPoolExecutor (multiprocessing) são importados só
+# onde são usados: importar o módulo (cada worker, comando CLI ou teste) não paga por eles.
 
 # =============================================
 # CONFIGURAÇÃO INICIAL DA APLICAÇÃO FLASK
@@ -19,8 +48,21 @@ diretorio_raiz_projeto = os.path.abspath(os.path.join(os.path.dirname(__file__),
 frontend_static_folder = os.path.join(diretorio_raiz_projeto, 'frontend', 'static')
 frontend_templates_folder = os.path.join(diretorio_raiz_projeto, 'frontend', 'templates')
 
+class AplicacaoTechFlow(Flask):
+    """
+    Flask com inicialização adiada: importar o módulo só define configuração, modelos e rotas.
+    A engine do banco, os listeners do SQLAlchemy e o logging são configurados no primeiro
+    contexto de aplicação (primeira requisição, comando CLI ou teste), por inicializar_app().
+    """
+    inicializada = False
+
+    def app_context(self):
+        if not self.inicializada:
+            inicializar_app()
+        return super().app_context()
+
 # Inicializa o aplicativo Flask, configurando as pastas de arquivos estáticos e templates
-app = Flask(
+app = AplicacaoTechFlow(
     __name__,
     static_folder=frontend_static_folder,
     template_folder=frontend_templates_folder
@@ -29,21 +71,602 @@ CORS(app)  # Habilita CORS para permitir requisições do frontend para o backen
 
 # Configurações da aplicação
 app.config['SECRET_KEY'] = 'techflow-super-secret-key-para-seguranca-geral-do-flask'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///techflow.db' # Configura o banco de dados SQLite
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('TECHFLOW_DATABASE_URI', 'sqlite:///techflow.db') # Configura o banco de dados SQLite
+app.config['SQLITE_PERFIL'] = os.environ.get('TECHFLOW_SQLITE_PERFIL', 'padrao') # 'padrao' (configuração do SQLite sem ajustes) ou 'producao'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False # Desabilita o rastreamento de modificações para melhor performance
 app.config['JWT_SECRET_KEY'] = 'UMA_CHAVE_SECRETA_MUITO_FORTE_E_UNICA_PARA_O_JWT_TECHFLOW_AQUI_2025_XYZ' # Chave secreta para assinar tokens JWT
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24) # Tempo de expiração do token JWT (24 horas para facilitar testes)
+app.config['JWT_CACHE_TAMANHO'] = 4096 # Máximo de tokens decodificados mantidos em memória (0 desativa o cache)
+app.config['PERFIL_CACHE_TAMANHO'] = 10000 # Máximo de perfis de usuário mantidos em memória (0 desativa o cache)
+app.config['PERFIL_CACHE_TTL_SEGUNDOS'] = 300 # Validade de um perfil em cache (limita a defasagem entre processos)
+app.config['QUADRO_CACHE_BYTES'] = 64 * 1024 * 1024 # Memória máxima dos snapshots de GET /tasks em cache (0 desativa o cache)
+# Log de alterações para a sincronização incremental (GET /tasks/changes)
+app.config['ALTERACOES_RETENCAO_DIAS'] = 30 # Tombstones de tarefas removidas são mantidos por este período
+app.config['ALTERACOES_MAX_REMOVIDAS_POR_USUARIO'] = 5000 # Limite de tombstones retidos por usuário
+app.config['ALTERACOES_COMPACTAR_A_CADA'] = 1000 # Alterações (por processo) entre compactações automáticas do log
+# Contadores de tarefas por usuário (GET /tasks/stats), mantidos por gatilhos no SQLite
+app.config['CONTADORES_RECONCILIAR_A_CADA'] = 20000 # Alterações (por processo) entre reconciliações com a tabela de tarefas
+app.config['CONTADORES_USUARIOS_POR_BLOCO'] = 500 # Usuários reconciliados por transação (limita o tempo segurando a escrita)
+# Arquivamento: tarefas concluídas há mais tempo saem do quadro para a tabela tarefa_arquivada (GET /tasks/archive)
+app.config['ARQUIVAMENTO_DIAS'] = int(os.environ.get('TECHFLOW_ARQUIVAMENTO_DIAS', 30)) # Dias após a conclusão; 0 desativa o arquivamento
+app.config['ARQUIVAMENTO_LOTE'] = 500 # Tarefas movidas por transação (limita o tempo segurando a escrita)
+app.config['ARQUIVAMENTO_A_CADA'] = 5000 # Alterações (por processo) entre arquivamentos automáticos
+
+app.config['LEMBRETES_ATIVO'] = os.environ.get('TECHFLOW_LEMBRETES_ATIVO', '1') == '1' # Agendador de lembretes de vencimento (iniciado na primeira requisição de cada processo)
+app.config['LEMBRETES_INTERVALO_SEGUNDOS'] = int(os.environ.get('TECHFLOW_LEMBRETES_INTERVALO_SEGUNDOS', 60)) # Intervalo entre verificações
+app.config['LEMBRETES_ANTECEDENCIA_HORAS'] = 24 # Antecedência do aviso 'vence_em_breve'
+app.config['LEMBRETES_ATRASO_APOS_HORAS'] = 24 # O vencimento é uma data (00:00): a tarefa só fica atrasada quando o dia termina
+app.config['LEMBRETES_LOTE'] = 500 # Tarefas verificadas por transação (limita o tempo segurando a escrita)
+app.config['LEMBRETES_RECUPERACAO_MAXIMA_DIAS'] = 7 # Após uma parada, atrasos mais antigos que isso não geram notificação
+# Eventos em tempo real (GET /tasks/events, Server-Sent Events)
+app.config['EVENTOS_FILA_ASSINANTE'] = 100 # Eventos pendentes por conexão antes de descartar um consumidor lento
+app.config['EVENTOS_MAX_ASSINANTES'] = 10000 # Conexões SSE simultâneas aceitas por processo
+app.config['EVENTOS_HEARTBEAT_SEGUNDOS'] = 15 # Intervalo dos comentários de heartbeat em conexões ociosas
+app.config['EVENTOS_TICKET_SEGUNDOS'] = 60 # Validade do ticket de POST /tasks/events/ticket, aceito só para abrir a conexão SSE
+# Hash de senhas: parâmetros do scrypt ('scrypt:N:r:p') e pool de processos dedicado
+app.config['SENHA_HASH_METODO'] = os.environ.get('TECHFLOW_SENHA_HASH_METODO', 'scrypt:32768:8:1')
+app.config['SENHA_POOL_PROCESSOS'] = int(os.environ.get('TECHFLOW_SENHA_POOL_PROCESSOS', min(4, os.cpu_count() or 1))) # 0 executa o hash na própria thread
+app.config['SENHA_POOL_FILA'] = int(os.environ.get('TECHFLOW_SENHA_POOL_FILA', 16)) # Pedidos que podem aguardar além dos que estão executando
+app.config['SENHA_POOL_TIMEOUT'] = 10 # Segundos máximos de espera pelo resultado de um hash
+app.config['SENHA_RETRY_AFTER'] = 2 # Valor do cabeçalho Retry-After quando a fila está cheia
+# Arquivos estáticos servidos da memória, com nomes versionados pelo conteúdo e variantes comprimidas
+app.config['ASSETS_RECARREGAR'] = os.environ.get('TECHFLOW_ASSETS_RECARREGAR') == '1' # Reconstrói a cada página (desenvolvimento do frontend)
+app.config['ASSETS_CACHE_SEGUNDOS'] = 365 * 24 * 3600 # max-age dos arquivos versionados (imutáveis)
+# Logging: o modo 'estruturado' grava JSON por linha a partir de uma fila, em uma thread de fundo
+app.config['LOG_MODO'] = os.environ.get('TECHFLOW_LOG_MODO', 'texto') # 'texto' (síncrono, formato padrão) ou 'estruturado'
+app.config['LOG_FILA'] = 10000 # Registros aguardando a thread de escrita; com a fila cheia, novos registros são descartados
+app.config['LOG_ROTAS'] = { # Por endpoint, no modo estruturado: nível mínimo e fração amostrada dos registros INFO/DEBUG
+    'atualizar_tarefa': {'amostragem': 0.1},
+    'atualizar_status_tarefa': {'amostragem': 0.01},
+    'listar_tarefas': {'amostragem': 0.01},
+    'obter_tarefa_por_id': {'nivel': 'WARNING'},
+    'estatisticas_tarefas': {'nivel': 'WARNING'},
+}
+# Métricas (GET /metrics, formato Prometheus) e log de requisições lentas
+app.config['METRICAS_TOKEN'] = os.environ.get('TECHFLOW_METRICAS_TOKEN') # Se definido, /metrics exige 'Authorization: Bearer <token>'
+app.config['REQUISICAO_LENTA_MS'] = int(os.environ.get('TECHFLOW_REQUISICAO_LENTA_MS', 0)) # 0 desativa o log de requisições lentas
+# Limite de taxa (token bucket): por endpoint, a capacidade (rajada) e a reposição em requisições por segundo.
+# Regras com 'chave': 'ip' limitam pelo IP do cliente, antes de qualquer trabalho (rotas sem autenticação);
+# as demais, pelo usuário do token, em jwt_required. Rotas autenticadas sem regra própria usam LIMITE_TAXA_PADRAO.
+app.config['LIMITE_TAXA_ATIVO'] = os.environ.get('TECHFLOW_LIMITE_TAXA_ATIVO', '1') == '1'
+app.config['LIMITE_TAXA_ROTAS'] = {
+    'login_usuario': {'capacidade': 10, 'por_segundo': 10 / 60, 'chave': 'ip'},
+    'cadastrar_usuario': {'capacidade': 5, 'por_segundo': 5 / 3600, 'chave': 'ip'},
+    'transmitir_eventos_tarefas': {'capacidade': 10, 'por_segundo': 1 / 6},
+    'buscar_tarefas': {'capacidade': 30, 'por_segundo': 5},
+    'processar_lote_tarefas': {'capacidade': 10, 'por_segundo': 1},
+    'importar_tarefas': {'capacidade': 3, 'por_segundo': 1 / 60},
+    'exportar_tarefas': {'capacidade': 3, 'por_segundo': 1 / 60},
+}
+app.config['LIMITE_TAXA_PADRAO'] = {'capacidade': 120, 'por_segundo': 20} # Balde único por usuário para as demais rotas autenticadas
+app.config['LIMITE_TAXA_BACKEND'] = os.environ.get('TECHFLOW_LIMITE_TAXA_BACKEND', 'memoria') # 'memoria' (por processo) ou 'sqlite' (compartilhado entre os processos do host)
+app.config['LIMITE_TAXA_SQLITE_CAMINHO'] = os.environ.get('TECHFLOW_LIMITE_TAXA_SQLITE_CAMINHO', os.path.join(app.instance_path, 'limite_taxa.db'))
+app.config['LIMITE_TAXA_CHAVES_MAX'] = 100000 # Baldes mantidos em memória; além disso os menos usados são descartados
+app.config['LIMITE_TAXA_PROXIES'] = int(os.environ.get('TECHFLOW_LIMITE_TAXA_PROXIES', 0)) # Proxies reversos confiáveis à frente do app (IP do cliente via X-Forwarded-For)
+# Migrações do esquema: aplicadas no deploy ('flask --app backend/app.py migrar'), não a cada import
+app.config['MIGRAR_AO_INICIAR'] = os.environ.get('TECHFLOW_MIGRAR_AO_INICIAR') == '1' # Aplica as pendentes na primeira requisição (um único processo)
 
-# Inicialização do banco de dados SQLAlchemy
-db = SQLAlchemy(app)
+# Perfis de armazenamento do SQLite. O perfil 'producao' ativa WAL (leitores não bloqueiam
+# durante o commit de um escritor), pragmas de desempenho aplicados a cada conexão nova,
+# pool de conexões dimensionado explicitamente e serialização das escritas no processo.
+PERFIS_SQLITE = {
+    'padrao': {
+        'pragmas': {},
+        'engine': {},
+        'serializar_escritas': False
+    },
+    'producao': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000, # ms de espera por um lock de outro processo antes de falhar
+            'mmap_size': 268435456, # 256 MB de leitura via mmap
+            'cache_size': -65536, # 64 MB de cache de páginas por conexão (valor negativo = KiB)
+            'temp_store': 'MEMORY'
+        },
+        'engine': {
+            'pool_size': 10,
+            'max_overflow': 10,
+            'pool_timeout': 30
+        },
+        'serializar_escritas': True
+    }
+}
+if app.config['SQLITE_PERFIL'] not in PERFIS_SQLITE:
+    raise ValueError(f"Perfil de SQLite desconhecido: {app.config['SQLITE_PERFIL']}")
+perfil_sqlite = PERFIS_SQLITE[app.config['SQLITE_PERFIL']]
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(perfil_sqlite['engine'])
+app.config['SQLITE_ESPERA_ESCRITA'] = 30 # Segundos máximos aguardando a vez de escrever (perfil 'producao')
+
+# Inicialização do banco de dados SQLAlchemy (a engine é criada em inicializar_app, no primeiro uso)
+db = SQLAlchemy()
 
 # Configuração de logging para depuração
 logging.basicConfig(level=logging.INFO) # Nível de logging: INFO para mensagens gerais, DEBUG para detalhes
 logger = logging.getLogger(__name__)
 
+class FiltroLogRotas(logging.Filter):
+    """
+    Aplica as regras de LOG_ROTAS (nível mínimo e amostragem por endpoint) aos registros INFO/DEBUG
+    e anexa ao registro o contexto da requisição (endpoint e usuário), que não existe mais
+    quando a thread de escrita formata a mensagem. WARNING e acima sempre passam.
+    """
+    def __init__(self, regras):
+        super().__init__()
+        self.regras = {
+            endpoint: (logging.getLevelName(regra.get('nivel', 'DEBUG')), regra.get('amostragem', 1.0))
+            for endpoint, regra in regras.items()
+        }
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        record.endpoint = request.endpoint
+        record.usuario_id = getattr(request, 'user_id', None)
+        regra = self.regras.get(request.endpoint)
+        if regra is None or record.levelno >= logging.WARNING:
+            return True
+        nivel, amostragem = regra
+        if record.levelno < nivel:
+            return False
+        if amostragem < 1.0:
+            if random.random() >= amostragem:
+                return False
+            record.amostragem = amostragem # Permite ao consumidor extrapolar a contagem
+        return True
+
+class HandlerFilaLogs(QueueHandler):
+    """
+    Entrega os registros à thread de escrita sem formatá-los na thread da requisição (a mensagem
+    é montada a partir de msg e args só na escrita, então os args devem ser valores simples).
+    Nunca bloqueia: com a fila cheia, o registro é descartado e contado.
+    """
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        if record.exc_info:
+            # O traceback precisa virar texto aqui: o frame da exceção não deve sair desta thread
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+class FiltroSegredosUrl(logging.Filter):
+    """
+    Troca por '[removido]' o valor dos parâmetros 'token' e 'ticket' nas URLs das mensagens
+    (ex.: a linha de acesso do werkzeug de GET /tasks/events?ticket=...), para que credenciais
+    enviadas na query string não fiquem gravadas nos logs.
+    """
+    padrao = re.compile(r'([?&](?:token|ticket)=)[^&\s"]*')
+
+    def filter(self, record):
+        mensagem = record.getMessage()
+        if 'token=' in mensagem or 'ticket=' in mensagem:
+            record.msg = self.padrao.sub(r'\1[removido]', mensagem)
+            record.args = None
+        return True
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, com o contexto da requisição quando houver."""
+    def format(self, record):
+        dados = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage()
+        }
+        for campo in ('endpoint', 'usuario_id', 'amostragem'):
+            if getattr(record, campo, None) is not None:
+                dados[campo] = getattr(record, campo)
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+handler_fila_logs = None
+
+def configurar_logging_estruturado():
+    """Troca o handler síncrono do logger raiz pela fila + thread de escrita em JSON."""
+    global handler_fila_logs
+    destino = logging.StreamHandler()
+    destino.setFormatter(FormatadorJSON())
+    fila = queue.Queue(maxsize=app.config['LOG_FILA'])
+    handler_fila_logs = HandlerFilaLogs(fila)
+    handler_fila_logs.addFilter(FiltroLogRotas(app.config['LOG_ROTAS']))
+    logging.getLogger().handlers = [handler_fila_logs]
+    ouvinte = QueueListener(fila, destino)
+    ouvinte.start()
+    atexit.register(ouvinte.stop) # Escreve o que restou na fila ao encerrar o processo
+
+# O log de acesso do servidor de desenvolvimento inclui a query string de cada requisição
+logging.getLogger('werkzeug').addFilter(FiltroSegredosUrl())
+
+if app.config['LOG_MODO'] not in ('texto', 'estruturado'):
+    raise ValueError(f"Modo de log desconhecido: {app.config['LOG_MODO']}")
+
+# =============================================
+# MÉTRICAS E INSTRUMENTAÇÃO
+# =============================================
+BALDES_LATENCIA = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+BALDES_SQL = [0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1]
+BALDES_QUANTIDADE = [1, 2, 3, 5, 10, 20, 50, 100, 500]
+
+def formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    return '{' + ','.join(
+        f'{chave}="' + str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for chave, valor in rotulos
+    ) + '}'
+
+class RegistroMetricas:
+    """
+    Registro em memória de contadores, medidores e histogramas, exportados no formato
+    texto do Prometheus. Os rótulos de uma série são uma tupla de pares (nome, valor).
+    Coletores registrados geram amostras adicionais na hora da exportação (ex.: estado de caches).
+    """
+    def __init__(self):
+        self.definicoes = {} # nome -> (tipo, ajuda, baldes)
+        self.series = {} # nome -> {rotulos: valor} ou, em histogramas, {rotulos: [contagens por balde, soma, total]}
+        self.coletores = []
+        self.lock = threading.Lock()
+
+    def definir(self, nome, tipo, ajuda, baldes=None):
+        self.definicoes[nome] = (tipo, ajuda, baldes)
+        self.series[nome] = {}
+
+    def incrementar(self, nome, rotulos=(), valor=1):
+        with self.lock:
+            serie = self.series[nome]
+            serie[rotulos] = serie.get(rotulos, 0) + valor
+
+    def observar(self, nome, valor, rotulos=()):
+        baldes = self.definicoes[nome][2]
+        indice = bisect_left(baldes, valor) # Primeiro balde com limite >= valor ('le' do Prometheus)
+        with self.lock:
+            serie = self.series[nome].get(rotulos)
+            if serie is None:
+                serie = self.series[nome][rotulos] = [[0] * (len(baldes) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def cronometrar(self, nome, rotulos=()):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, rotulos)
+
+    def exportar(self):
+        with self.lock:
+            copia = {
+                nome: {rotulos: (list(valor[0]), valor[1], valor[2]) if isinstance(valor, list) else valor for rotulos, valor in serie.items()}
+                for nome, serie in self.series.items()
+            }
+        linhas = []
+        for nome, (tipo, ajuda, baldes) in self.definicoes.items():
+            linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+            for rotulos, valor in sorted(copia[nome].items()):
+                if tipo != 'histogram':
+                    linhas.append(f'{nome}{formatar_rotulos(rotulos)} {valor}')
+                    continue
+                contagens, soma, total = valor
+                acumulado = 0
+                for limite, quantidade in zip(baldes + ['+Inf'], contagens):
+                    acumulado += quantidade
+                    le = limite if isinstance(limite, str) else f'{limite:g}'
+                    linhas.append(f"{nome}_bucket{formatar_rotulos(rotulos + (('le', le),))} {acumulado}")
+                linhas.append(f'{nome}_sum{formatar_rotulos(rotulos)} {soma!r}')
+                linhas.append(f'{nome}_count{formatar_rotulos(rotulos)} {total}')
+        for coletor in self.coletores:
+            for nome, tipo, ajuda, amostras in coletor():
+                linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+                linhas += [f'{nome}{formatar_rotulos(rotulos)} {valor}' for rotulos, valor in amostras]
+        return '\n'.join(linhas) + '\n'
+
+metricas = RegistroMetricas()
+metricas.definir('techflow_requisicoes_total', 'counter', 'Requisições atendidas por endpoint, método e status.')
+metricas.definir('techflow_requisicao_segundos', 'histogram', 'Latência das requisições até a resposta ser gerada.', BALDES_LATENCIA)
+# O gauge é decrementado no teardown da requisição: a exportação (stream_with_context) conta até o fim
+# do envio, mas o stream SSE de GET /tasks/events não usa o contexto e sai logo depois da resposta inicial
+metricas.definir('techflow_requisicoes_em_andamento', 'gauge', 'Requisições em andamento (sem as conexões SSE, contadas em techflow_eventos_assinantes).')
+metricas.definir('techflow_sql_segundos', 'histogram', 'Duração dos comandos SQL por operação (inclui a espera pelo lock de escrita).', BALDES_SQL)
+metricas.definir('techflow_sql_por_requisicao', 'histogram', 'Quantidade de comandos SQL por requisição.', BALDES_QUANTIDADE)
+metricas.definir('techflow_sqlite_espera_escrita_segundos', 'histogram', 'Espera pelo lock de escrita do perfil producao.', BALDES_SQL)
+metricas.definir('techflow_jwt_decode_segundos', 'histogram', 'Tempo de jwt.decode (só nas falhas do cache de tokens).', BALDES_SQL)
+metricas.definir('techflow_senha_hash_segundos', 'histogram', 'Tempo de geração/verificação de hash de senha, incluindo a fila do pool.', BALDES_LATENCIA)
+metricas.definir('techflow_senha_pool_rejeicoes_total', 'counter', 'Pedidos de hash recusados pelo pool (fila cheia ou timeout).')
+metricas.definir('techflow_tarefas_arquivadas_total', 'counter', 'Tarefas concluídas movidas do quadro para o arquivo.')
+metricas.definir('techflow_limite_taxa_rejeicoes_total', 'counter', 'Requisições recusadas com 429 pelo limite de taxa, por regra.')
+metricas.definir('techflow_notificacoes_criadas_total', 'counter', 'Notificações de vencimento criadas pelo agendador de lembretes, por tipo.')
+metricas.definir('techflow_lembretes_verificacao_segundos', 'histogram', 'Duração de cada verificação de vencimentos do agendador de lembretes.', BALDES_LATENCIA)
+
+@app.before_request
+def iniciar_medicao_requisicao():
+    g.inicio_requisicao = time.perf_counter()
+    g.endpoint_metricas = request.endpoint or 'nao_encontrado'
+    g.sql_quantidade = 0
+    g.sql_segundos = 0.0
+    g.sql_detalhes = [] if app.config['REQUISICAO_LENTA_MS'] > 0 else None
+    metricas.incrementar('techflow_requisicoes_em_andamento', (('endpoint', g.endpoint_metricas),))
+
+@app.after_request
+def registrar_medicao_requisicao(resposta):
+    if 'inicio_requisicao' not in g:
+        return resposta
+    duracao = time.perf_counter() - g.inicio_requisicao
+    rotulos = (('endpoint', g.endpoint_metricas), ('metodo', request.method))
+    metricas.observar('techflow_requisicao_segundos', duracao, rotulos)
+    metricas.incrementar('techflow_requisicoes_total', rotulos + (('status', str(resposta.status_code)),))
+    metricas.observar('techflow_sql_por_requisicao', g.sql_quantidade)
+    g.medicao_registrada = True
+    limite_lenta = app.config['REQUISICAO_LENTA_MS']
+    if limite_lenta > 0 and duracao * 1000 >= limite_lenta:
+        registrar_requisicao_lenta(duracao)
+    return resposta
+
+@app.teardown_request
+def encerrar_medicao_requisicao(erro):
+    if 'inicio_requisicao' not in g:
+        return
+    if not g.get('medicao_registrada'):
+        # Exceção não tratada: after_request não foi chamado
+        rotulos = (('endpoint', g.endpoint_metricas), ('metodo', request.method))
+        metricas.observar('techflow_requisicao_segundos', time.perf_counter() - g.inicio_requisicao, rotulos)
+        metricas.incrementar('techflow_requisicoes_total', rotulos + (('status', '500'),))
+    metricas.incrementar('techflow_requisicoes_em_andamento', (('endpoint', g.endpoint_metricas),), -1)
+
+def registrar_requisicao_lenta(duracao):
+    """Loga a requisição lenta com os comandos SQL agrupados pelo texto, dos mais custosos aos mais baratos."""
+    agrupados = {}
+    for segundos, comando in g.sql_detalhes:
+        total = agrupados.setdefault(comando, [0, 0.0])
+        total[0] += 1
+        total[1] += segundos
+    detalhes = '; '.join(
+        f"{quantidade}x {segundos * 1000:.1f} ms: {comando}"
+        for comando, (quantidade, segundos) in sorted(agrupados.items(), key=lambda item: -item[1][1])[:10]
+    )
+    logger.warning(
+        f"Requisição lenta: {request.method} {request.path} em {duracao * 1000:.1f} ms, "
+        f"{g.sql_quantidade} comandos SQL em {g.sql_segundos * 1000:.1f} ms. {detalhes}"
+    )
+
+def iniciar_medicao_sql(conn, cursor, statement, parameters, context, executemany):
+    context.inicio_sql = time.perf_counter()
+
+def registrar_medicao_sql(conn, cursor, statement, parameters, context, executemany):
+    duracao = time.perf_counter() - context.inicio_sql
+    operacao = statement.lstrip()[:6].upper()
+    if operacao not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+        operacao = 'OUTRO'
+    metricas.observar('techflow_sql_segundos', duracao, (('operacao', operacao),))
+    if has_request_context() and 'sql_quantidade' in g:
+        g.sql_quantidade += 1
+        g.sql_segundos += duracao
+        if g.sql_detalhes is not None and len(g.sql_detalhes) < 1000:
+            g.sql_detalhes.append((duracao, ' '.join(statement.split())[:200]))
+
+def configurar_medicao_sql():
+    db.event.listen(db.engine, 'before_cursor_execute', iniciar_medicao_sql)
+    db.event.listen(db.engine, 'after_cursor_execute', registrar_medicao_sql)
+
+# =============================================
+# PERFIL DE ARMAZENAMENTO DO SQLITE
+# =============================================
+# Lock que serializa as transações de escrita deste processo. Com ele, os escritores
+# aguardam a vez aqui em vez de disputar o lock do SQLite e receber "database is locked".
+lock_escrita_sqlite = threading.Lock()
+escritor_sqlite = threading.local() # info da conexão que segura o lock, na thread que a usa
+COMANDOS_ESCRITA = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+def aplicar_pragmas_sqlite(conexao_dbapi, registro_conexao):
+    """Aplica os pragmas do perfil ativo a cada conexão nova do pool."""
+    cursor = conexao_dbapi.cursor()
+    for pragma, valor in perfil_sqlite['pragmas'].items():
+        cursor.execute(f"PRAGMA {pragma}={valor}")
+    cursor.close()
+
+def adquirir_lock_escrita(conn, cursor, statement, parameters, context, executemany):
+    """Obtém o lock de escrita antes do primeiro comando de escrita de uma transação."""
+    if conn.info.get('lock_escrita') or not statement.lstrip()[:7].upper().startswith(COMANDOS_ESCRITA):
+        return
+    with metricas.cronometrar('techflow_sqlite_espera_escrita_segundos'):
+        adquirido = lock_escrita_sqlite.acquire(timeout=app.config['SQLITE_ESPERA_ESCRITA'])
+    if not adquirido:
+        raise TimeoutError('Tempo esgotado aguardando a vez de escrever no banco de dados.')
+    conn.info['lock_escrita'] = True
+    escritor_sqlite.info = conn.info
+
+def liberar_lock_escrita(info):
+    """Libera o lock de escrita se a conexão o possuir (fim da transação)."""
+    if info.pop('lock_escrita', False):
+        lock_escrita_sqlite.release()
+
+def liberar_lock_escrita_sessao(sessao):
+    """
+    Libera o lock depois do COMMIT/ROLLBACK da sessão. Os eventos commit/rollback da engine
+    disparam antes do comando chegar ao SQLite; liberar neles deixaria o próximo escritor
+    disputar o lock do arquivo durante o COMMIT (e o fsync) do anterior.
+    """
+    info = getattr(escritor_sqlite, 'info', None)
+    if info is not None:
+        escritor_sqlite.info = None
+        liberar_lock_escrita(info)
+
+def configurar_perfil_sqlite():
+    """Registra na engine os pragmas e a serialização de escritas do perfil ativo."""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    if perfil_sqlite['pragmas']:
+        db.event.listen(db.engine, 'connect', aplicar_pragmas_sqlite)
+    if perfil_sqlite['serializar_escritas']:
+        db.event.listen(db.engine, 'before_cursor_execute', adquirir_lock_escrita)
+        db.event.listen(db.session, 'after_commit', liberar_lock_escrita_sessao)
+        db.event.listen(db.session, 'after_rollback', liberar_lock_escrita_sessao)
+        # Garantia extra: conexões devolvidas ao pool (já depois do COMMIT) nunca levam o lock junto
+        db.event.listen(db.engine.pool, 'checkin', lambda conexao_dbapi, registro: liberar_lock_escrita(registro.info))
+
 # =============================================
 # DECORADOR PARA PROTEÇÃO DE ROTAS COM JWT
 # =============================================
+class CacheTokensJWT:
+    """
+    Cache LRU limitado dos claims de tokens JWT já verificados.
+    A chave é o digest SHA-256 do token e cada entrada vale até o 'exp' do próprio token,
+    então um acerto dispensa a verificação HMAC e o parse do JSON feitos por jwt.decode.
+    Tokens inválidos nunca entram no cache e tokens expirados são descartados na consulta.
+    """
+    def __init__(self, tamanho_maximo):
+        self.tamanho_maximo = tamanho_maximo
+        self.entradas = OrderedDict() # digest -> (exp, claims)
+        self.lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def decodificar(self, token, chave, algoritmos):
+        """
+        Retorna os claims do token, consultando o cache antes de chamar jwt.decode.
+        Propaga as mesmas exceções de jwt.decode para tokens expirados ou inválidos.
+        """
+        if self.tamanho_maximo <= 0:
+            with metricas.cronometrar('techflow_jwt_decode_segundos'):
+                return jwt.decode(token, chave, algorithms=algoritmos)
+
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        with self.lock:
+            entrada = self.entradas.get(digest)
+            if entrada is not None:
+                if time.time() < entrada[0]:
+                    self.entradas.move_to_end(digest)
+                    self.acertos += 1
+                    return entrada[1]
+                # Expirou: remove e deixa jwt.decode lançar ExpiredSignatureError
+                del self.entradas[digest]
+            self.falhas += 1
+
+        with metricas.cronometrar('techflow_jwt_decode_segundos'):
+            claims = jwt.decode(token, chave, algorithms=algoritmos)
+        exp = claims.get('exp')
+        if exp is not None:
+            with self.lock:
+                self.entradas[digest] = (exp, claims)
+                self.entradas.move_to_end(digest)
+                while len(self.entradas) > self.tamanho_maximo:
+                    self.entradas.popitem(last=False)
+        return claims
+
+    def estatisticas(self):
+        """Retorna os contadores de acertos/falhas e o tamanho atual do cache."""
+        with self.lock:
+            return {'acertos': self.acertos, 'falhas': self.falhas, 'tamanho': len(self.entradas)}
+
+cache_tokens = CacheTokensJWT(app.config['JWT_CACHE_TAMANHO'])
+
+class CachePerfisUsuarios:
+    """
+    Cache read-through, LRU e com TTL, dos perfis de usuário (id, nome e email) usados por
+    GET /perfil: um acerto dispensa a consulta ao banco, e a senha nunca é lida nem guardada.
+    Cada processo tem o seu cache; as alterações de um usuário feitas pelo ORM invalidam a
+    entrada no commit (invalidar_perfis_alterados) e o TTL limita a defasagem nos outros processos.
+    """
+    def __init__(self, tamanho_maximo, ttl_segundos):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_segundos = ttl_segundos
+        self.entradas = OrderedDict() # usuario_id -> (expira_em, perfil)
+        self.lock = threading.Lock()
+        self.geracao = 0 # Incrementada a cada invalidação: uma leitura anterior a ela não é guardada
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, usuario_id):
+        """Retorna o perfil do usuário (dicionário) ou None se ele não existe, consultando o banco só na falta."""
+        agora = time.monotonic()
+        with self.lock:
+            entrada = self.entradas.get(usuario_id)
+            if entrada is not None and agora < entrada[0]:
+                self.entradas.move_to_end(usuario_id)
+                self.acertos += 1
+                return entrada[1]
+            self.falhas += 1
+            geracao = self.geracao
+
+        linha = db.session.query(Usuario.id, Usuario.nome, Usuario.email).filter(Usuario.id == usuario_id).first()
+        if linha is None:
+            return None
+        perfil = {'id': linha.id, 'nome': linha.nome, 'email': linha.email}
+        if self.tamanho_maximo > 0:
+            with self.lock:
+                if geracao == self.geracao:
+                    self.entradas[usuario_id] = (agora + self.ttl_segundos, perfil)
+                    self.entradas.move_to_end(usuario_id)
+                    while len(self.entradas) > self.tamanho_maximo:
+                        self.entradas.popitem(last=False)
+        return perfil
+
+    def invalidar(self, usuario_ids):
+        with self.lock:
+            self.geracao += 1
+            for usuario_id in usuario_ids:
+                self.entradas.pop(usuario_id, None)
+
+    def estatisticas(self):
+        """Retorna os contadores de acertos/falhas e o tamanho atual do cache."""
+        with self.lock:
+            return {'acertos': self.acertos, 'falhas': self.falhas, 'tamanho': len(self.entradas)}
+
+cache_perfis = CachePerfisUsuarios(app.config['PERFIL_CACHE_TAMANHO'], app.config['PERFIL_CACHE_TTL_SEGUNDOS'])
+
+FINALIDADE_TICKET_EVENTOS = 'eventos' # Claim 'finalidade' dos tickets de POST /tasks/events/ticket
+
+def autenticar_requisicao(aceitar_ticket_eventos=False):
+    """
+    Valida o token JWT da requisição atual e armazena o ID do usuário em request.user_id.
+    Retorna None se o token for válido ou a resposta de erro (401/500) caso contrário.
+    O token de sessão só é aceito no cabeçalho Authorization. Com aceitar_ticket_eventos, um
+    ticket de POST /tasks/events/ticket também é aceito no parâmetro 'ticket' da URL (EventSource
+    não permite enviar cabeçalhos); tickets nunca valem como token de sessão, e vice-versa.
+    """
+    auth_header = request.headers.get('Authorization')
+
+    # Verifica se o cabeçalho Authorization está presente e no formato correto
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split()[1] # Extrai o token da string "Bearer <token>"
+        finalidade = None
+    elif aceitar_ticket_eventos and request.args.get('ticket'):
+        token = request.args['ticket']
+        finalidade = FINALIDADE_TICKET_EVENTOS
+    else:
+        logger.warning("Tentativa de acesso não autorizado: Token não fornecido ou formato inválido.")
+        return jsonify({"erro": "Token não fornecido ou formato inválido"}), 401
+
+    try:
+        # Decodifica o token JWT usando a chave secreta e o algoritmo (com cache dos claims já verificados)
+        payload = cache_tokens.decodificar(token, app.config['JWT_SECRET_KEY'], ['HS256'])
+        if payload.get('finalidade') != finalidade:
+            raise jwt.InvalidTokenError('finalidade do token não permitida nesta rota')
+        # CORREÇÃO: Converte o 'sub' de volta para inteiro, pois ele é salvo como string no token
+        request.user_id = int(payload['sub']) # Armazena o ID do usuário (subject) na requisição como int
+        request.jwt_claims = payload
+    except jwt.ExpiredSignatureError:
+        logger.warning("Tentativa de acesso com token expirado.")
+        return jsonify({"erro": "Token expirado. Faça login novamente."}), 401
+    except jwt.InvalidTokenError as e:
+        logger.error(f"Tentativa de acesso com token inválido: {e}.")
+        return jsonify({"erro": f"Token inválido: {e}. Faça login novamente."}), 401
+    except Exception as e:
+        logger.error(f"Erro inesperado ao decodificar token: {e}.")
+        return jsonify({"erro": "Erro interno do servidor ao validar token."}), 500
+    return None
+
 def jwt_required(f):
     """
     Decorador para proteger rotas, exigindo um token JWT válido no cabeçalho Authorization.
@@ -51,31 +674,346 @@ def jwt_required(f):
     """
     @wraps(f) # Mantém os metadados da função original
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
+        erro = autenticar_requisicao() or limitar_taxa_usuario()
+        if erro:
+            return erro
+        return f(*args, **kwargs) # Continua para a função da rota se o token for válido
+    return decorated
+
+# =============================================
+# LIMITE DE TAXA (TOKEN BUCKET)
+# =============================================
+class BackendLimiteTaxa:
+    """
+    Interface dos armazenamentos de baldes do limite de taxa. Para um armazenamento
+    compartilhado entre servidores (ex.: Redis), basta uma subclasse com consumir()
+    atômico por chave, atribuída a 'backend_limite_taxa'.
+    """
+    def consumir(self, chave, capacidade, por_segundo):
+        """
+        Repõe o balde 'chave' pelo tempo decorrido desde o último uso (até a capacidade)
+        e tenta retirar um token. Um balde inexistente começa cheio.
+        Retorna (permitido, tokens restantes).
+        """
+        raise NotImplementedError
 
-        # Verifica se o cabeçalho Authorization está presente e no formato correto
-        if not auth_header or not auth_header.startswith('Bearer '):
-            logger.warning("Tentativa de acesso não autorizado: Token não fornecido ou formato inválido.")
-            return jsonify({"erro": "Token não fornecido ou formato inválido"}), 401
+    def quantidade_chaves(self):
+        """Baldes mantidos pelo armazenamento (None se ele não souber informar)."""
+        return None
 
-        token = auth_header.split()[1] # Extrai o token da string "Bearer <token>"
+class BackendLimiteTaxaMemoria(BackendLimiteTaxa):
+    """
+    Baldes em memória, por processo: O(1) por requisição. As chaves ficam em ordem de último
+    uso; um balde que já se encheu de novo equivale a um balde novo, então é descartado sem
+    efeito no limite. Acima de chaves_max, os baldes menos usados são descartados mesmo cheios.
+    """
+    def __init__(self, chaves_max):
+        self.chaves_max = chaves_max
+        self.baldes = OrderedDict() # chave -> (tokens, atualizado, cheio_em), com time.monotonic()
+        self.lock = threading.Lock()
+
+    def consumir(self, chave, capacidade, por_segundo):
+        agora = time.monotonic()
+        with self.lock:
+            balde = self.baldes.get(chave)
+            if balde is None:
+                tokens = capacidade
+            else:
+                tokens = min(capacidade, balde[0] + (agora - balde[1]) * por_segundo)
+                self.baldes.move_to_end(chave)
+            permitido = tokens >= 1
+            if permitido:
+                tokens -= 1
+            self.baldes[chave] = (tokens, agora, agora + (capacidade - tokens) / por_segundo)
+            # Cada chave entra e sai uma vez: o custo do descarte é O(1) amortizado
+            while self.baldes:
+                _, (_, _, cheio_em) = next(iter(self.baldes.items()))
+                if cheio_em > agora and len(self.baldes) <= self.chaves_max:
+                    break
+                self.baldes.popitem(last=False)
+            return permitido, tokens
+
+    def quantidade_chaves(self):
+        return len(self.baldes)
+
+class BackendLimiteTaxaSQLite(BackendLimiteTaxa):
+    """
+    Baldes em um arquivo SQLite próprio, compartilhado pelos processos do mesmo host (workers
+    do gunicorn). Fica fora do banco da aplicação para não disputar o lock de escrita dele.
+    Cada consumo é um único upsert atômico; os baldes ociosos há mais que o tempo de encher
+    o maior balde das regras são removidos de tempos em tempos.
+    """
+    COMANDO_CONSUMIR = """
+        INSERT INTO balde (chave, tokens, atualizado, permitido) VALUES (:chave, :capacidade - 1, :agora, 1)
+        ON CONFLICT (chave) DO UPDATE SET
+          tokens = MIN(:capacidade, tokens + MAX(:agora - atualizado, 0) * :por_segundo)
+                   - (MIN(:capacidade, tokens + MAX(:agora - atualizado, 0) * :por_segundo) >= 1),
+          permitido = MIN(:capacidade, tokens + MAX(:agora - atualizado, 0) * :por_segundo) >= 1,
+          atualizado = :agora
+        RETURNING permitido, tokens
+    """
+    LIMPAR_A_CADA = 1000 # Consumos (por processo) entre remoções dos baldes ociosos
+
+    def __init__(self, caminho, ocioso_segundos):
+        self.caminho = caminho
+        self.ocioso_segundos = ocioso_segundos
+        self.conexoes = threading.local()
+        self.consumos = count(1)
+
+    def conexao(self):
+        conexao = getattr(self.conexoes, 'conexao', None)
+        if conexao is None:
+            import sqlite3
+            conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=OFF') # Estado descartável: perder baldes só os reinicia cheios
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS balde (chave TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'atualizado REAL NOT NULL, permitido INTEGER NOT NULL) WITHOUT ROWID'
+            )
+            self.conexoes.conexao = conexao
+        return conexao
+
+    def consumir(self, chave, capacidade, por_segundo):
+        agora = time.time() # Relógio comum aos processos
+        conexao = self.conexao()
+        permitido, tokens = conexao.execute(self.COMANDO_CONSUMIR, {
+            'chave': chave, 'capacidade': capacidade, 'por_segundo': por_segundo, 'agora': agora
+        }).fetchone()
+        if next(self.consumos) % self.LIMPAR_A_CADA == 0:
+            conexao.execute('DELETE FROM balde WHERE atualizado < ?', (agora - self.ocioso_segundos,))
+        return bool(permitido), tokens
+
+    def quantidade_chaves(self):
+        return self.conexao().execute('SELECT COUNT(*) FROM balde').fetchone()[0]
+
+def criar_backend_limite_taxa():
+    regras = list(app.config['LIMITE_TAXA_ROTAS'].values()) + [app.config['LIMITE_TAXA_PADRAO']]
+    if app.config['LIMITE_TAXA_BACKEND'] == 'memoria':
+        return BackendLimiteTaxaMemoria(app.config['LIMITE_TAXA_CHAVES_MAX'])
+    if app.config['LIMITE_TAXA_BACKEND'] == 'sqlite':
+        ocioso_segundos = max(regra['capacidade'] / regra['por_segundo'] for regra in regras)
+        return BackendLimiteTaxaSQLite(app.config['LIMITE_TAXA_SQLITE_CAMINHO'], ocioso_segundos)
+    raise ValueError(f"Backend de limite de taxa desconhecido: {app.config['LIMITE_TAXA_BACKEND']}")
+
+backend_limite_taxa = criar_backend_limite_taxa()
+
+def ip_cliente():
+    """IP do cliente: o endereço da conexão ou, atrás de LIMITE_TAXA_PROXIES proxies, o adicionado pelo mais externo."""
+    proxies = app.config['LIMITE_TAXA_PROXIES']
+    if proxies:
+        encaminhados = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+        if len(encaminhados) >= proxies:
+            return encaminhados[-proxies]
+    return request.remote_addr or 'desconhecido'
+
+def limitar_taxa(nome_regra, regra, sujeito):
+    """
+    Consome um token do balde (regra, sujeito) e guarda em g os valores dos cabeçalhos
+    RateLimit-*, adicionados à resposta em after_request.
+    Retorna None ou a resposta 429 com Retry-After.
+    """
+    capacidade, por_segundo = regra['capacidade'], regra['por_segundo']
+    try:
+        permitido, tokens = backend_limite_taxa.consumir(f'{nome_regra}:{sujeito}', capacidade, por_segundo)
+    except Exception as e:
+        # Armazenamento indisponível: a requisição segue sem limite
+        logger.error(f"Erro no limite de taxa ({nome_regra}): {str(e)}")
+        return None
+    g.limite_taxa = (capacidade, int(tokens), math.ceil((capacidade - tokens) / por_segundo))
+    if permitido:
+        return None
+    metricas.incrementar('techflow_limite_taxa_rejeicoes_total', (('regra', nome_regra),))
+    logger.info("Limite de taxa excedido: regra %s, %s.", nome_regra, sujeito)
+    resposta = jsonify({'erro': 'Muitas requisições. Tente novamente em instantes.'})
+    resposta.headers['Retry-After'] = str(math.ceil((1 - tokens) / por_segundo))
+    return resposta, 429 # Too Many Requests
+
+def limitar_taxa_usuario():
+    """Limite por usuário das rotas autenticadas (chamado depois de autenticar_requisicao)."""
+    if not app.config['LIMITE_TAXA_ATIVO']:
+        return None
+    regra = app.config['LIMITE_TAXA_ROTAS'].get(request.endpoint)
+    if regra is None:
+        return limitar_taxa('padrao', app.config['LIMITE_TAXA_PADRAO'], f'u{request.user_id}')
+    if regra.get('chave') == 'ip':
+        return None # Já limitada por IP em limitar_taxa_por_ip
+    return limitar_taxa(request.endpoint, regra, f'u{request.user_id}')
+
+@app.before_request
+def limitar_taxa_por_ip():
+    """Limite por IP das rotas com 'chave': 'ip', antes de validar o corpo ou tocar no banco."""
+    if not app.config['LIMITE_TAXA_ATIVO']:
+        return None
+    regra = app.config['LIMITE_TAXA_ROTAS'].get(request.endpoint)
+    if regra is not None and regra.get('chave') == 'ip':
+        return limitar_taxa(request.endpoint, regra, ip_cliente())
+    return None
+
+@app.after_request
+def adicionar_cabecalhos_limite_taxa(resposta):
+    if 'limite_taxa' in g:
+        limite, restantes, reinicio = g.limite_taxa
+        resposta.headers['RateLimit-Limit'] = str(limite)
+        resposta.headers['RateLimit-Remaining'] = str(restantes)
+        resposta.headers['RateLimit-Reset'] = str(reinicio) # Segundos até o balde estar cheio de novo
+    return resposta
+
+# =============================================
+# EVENTOS DE TAREFAS EM TEMPO REAL (PUB/SUB)
+# =============================================
+class CanalEventosTarefas:
+    """
+    Pub/sub em processo dos eventos de tarefas, com uma fila limitada por assinante (conexão SSE).
+    Publicar nunca bloqueia: um assinante lento cuja fila enche é descartado e recebe o aviso
+    'reiniciar', para ressincronizar pelo GET /tasks/changes ao reconectar.
+    """
+    def __init__(self, tamanho_fila, max_assinantes):
+        self.tamanho_fila = tamanho_fila
+        self.max_assinantes = max_assinantes
+        self.assinantes = {} # usuario_id -> conjunto de filas
+        self.total = 0
+        self.descartados = 0
+        self.lock = threading.Lock()
+
+    def assinar(self, usuario_id):
+        """Cria a fila de um novo assinante, ou retorna None se o limite de conexões foi atingido."""
+        with self.lock:
+            if self.total >= self.max_assinantes:
+                return None
+            fila = queue.Queue(maxsize=self.tamanho_fila)
+            self.assinantes.setdefault(usuario_id, set()).add(fila)
+            self.total += 1
+            return fila
 
+    def cancelar(self, usuario_id, fila):
+        """Remove a assinatura. Retorna False se ela já havia sido removida."""
+        with self.lock:
+            filas = self.assinantes.get(usuario_id)
+            if not filas or fila not in filas:
+                return False
+            filas.discard(fila)
+            if not filas:
+                del self.assinantes[usuario_id]
+            self.total -= 1
+            return True
+
+    def publicar(self, usuario_id, evento):
+        with self.lock:
+            filas = list(self.assinantes.get(usuario_id, ()))
+        for fila in filas:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                if not self.cancelar(usuario_id, fila):
+                    continue
+                self.descartados += 1
+                # Esvazia a fila e deixa só o aviso de descarte (None) para o consumidor
+                while True:
+                    try:
+                        while True:
+                            fila.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        fila.put_nowait(None)
+                        break
+                    except queue.Full:
+                        continue # Uma publicação concorrente ocupou a vaga: esvazia de novo
+
+canal_eventos = CanalEventosTarefas(app.config['EVENTOS_FILA_ASSINANTE'], app.config['EVENTOS_MAX_ASSINANTES'])
+
+# Os eventos registrados durante uma transação só são publicados depois do commit,
+# para que nenhum cliente seja avisado de uma alteração que acabou desfeita.
+def publicar_eventos_pendentes(sessao):
+    for usuario_id, evento in sessao.info.pop('eventos_pendentes', ()):
+        canal_eventos.publicar(usuario_id, evento)
+
+def descartar_eventos_pendentes(sessao):
+    sessao.info.pop('eventos_pendentes', None)
+
+db.event.listen(db.session, 'after_commit', publicar_eventos_pendentes)
+db.event.listen(db.session, 'after_rollback', descartar_eventos_pendentes)
+
+# =============================================
+# POOL DE PROCESSOS PARA HASH DE SENHAS
+# =============================================
+class FilaHashCheiaError(Exception):
+    """Lançada quando o pool de hash de senhas não aceita mais pedidos."""
+
+class PoolHashSenhas:
+    """
+    Executa o scrypt (geração e verificação de hash) em um pool de processos dedicado,
+    para que rajadas de login/cadastro não ocupem as threads que atendem as demais rotas.
+    O número de pedidos em andamento é limitado a processos + profundidade_fila; acima
+    disso FilaHashCheiaError é lançada imediatamente, sem enfileirar.
+    """
+    def __init__(self, metodo, processos, profundidade_fila, timeout):
+        self.metodo = metodo
+        self.processos = processos
+        self.timeout = timeout
+        self.vagas = threading.BoundedSemaphore(processos + profundidade_fila) if processos > 0 else None
+        self.executor = None # Criado sob demanda no primeiro uso
+        self.lock = threading.Lock()
+
+    def obter_executor(self):
+        with self.lock:
+            if self.executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=self.processos)
+            return self.executor
+
+    def executar(self, funcao, *args):
+        """Executa funcao(*args) no pool respeitando o controle de admissão."""
+        if self.processos <= 0:
+            return funcao(*args)
+
+        if not self.vagas.acquire(blocking=False):
+            metricas.incrementar('techflow_senha_pool_rejeicoes_total', (('motivo', 'fila_cheia'),))
+            raise FilaHashCheiaError()
         try:
-            # Decodifica o token JWT usando a chave secreta e o algoritmo
-            payload = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            # CORREÇÃO: Converte o 'sub' de volta para inteiro, pois ele é salvo como string no token
-            request.user_id = int(payload['sub']) # Armazena o ID do usuário (subject) na requisição como int
-        except jwt.ExpiredSignatureError:
-            logger.warning(f"Tentativa de acesso com token expirado. Token: {token[:30]}...")
-            return jsonify({"erro": "Token expirado. Faça login novamente."}), 401
-        except jwt.InvalidTokenError as e:
-            logger.error(f"Tentativa de acesso com token inválido: {e}. Token: {token[:30]}...")
-            return jsonify({"erro": f"Token inválido: {e}. Faça login novamente."}), 401
-        except Exception as e:
-            logger.error(f"Erro inesperado ao decodificar token: {e}. Token: {token[:30]}...")
-            return jsonify({"erro": "Erro interno do servidor ao validar token."}), 500
-        return f(*args, **kwargs) # Continua para a função da rota se o token for válido
-    return decorated
+            futuro = self.obter_executor().submit(funcao, *args)
+        except BaseException:
+            self.vagas.release()
+            raise
+        # A vaga só é liberada quando o trabalho termina, mesmo que quem pediu desista antes
+        futuro.add_done_callback(lambda _: self.vagas.release())
+
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturoTimeoutError:
+            metricas.incrementar('techflow_senha_pool_rejeicoes_total', (('motivo', 'timeout'),))
+            raise FilaHashCheiaError()
+        except BrokenExecutor: # BrokenProcessPool
+            # Um processo filho morreu: descarta o pool para recriá-lo no próximo pedido
+            with self.lock:
+                self.executor = None
+            raise
+
+    def gerar_hash(self, senha):
+        with metricas.cronometrar('techflow_senha_hash_segundos', (('operacao', 'gerar'),)):
+            return self.executar(generate_password_hash, senha, self.metodo)
+
+    def verificar_hash(self, senha_hash, senha):
+        with metricas.cronometrar('techflow_senha_hash_segundos', (('operacao', 'verificar'),)):
+            return self.executar(check_password_hash, senha_hash, senha)
+
+    def precisa_rehash(self, senha_hash):
+        """Indica se o hash foi gerado com parâmetros diferentes dos configurados."""
+        return not senha_hash.startswith(self.metodo + '$')
+
+pool_senhas = PoolHashSenhas(
+    app.config['SENHA_HASH_METODO'],
+    app.config['SENHA_POOL_PROCESSOS'],
+    app.config['SENHA_POOL_FILA'],
+    app.config['SENHA_POOL_TIMEOUT']
+)
+
+def resposta_servidor_ocupado():
+    """Resposta rápida 503 com Retry-After usada quando o pool de hash está saturado."""
+    resposta = jsonify({'erro': 'Servidor ocupado. Tente novamente em instantes.'})
+    resposta.headers['Retry-After'] = str(app.config['SENHA_RETRY_AFTER'])
+    return resposta, 503
 
 # =============================================
 # MODELOS DE DADOS DO BANCO DE DADOS
@@ -89,6 +1027,12 @@ class Usuario(db.Model):
     nome = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     senha = db.Column(db.String(200), nullable=False)
+    # Versão do quadro de tarefas: incrementada na mesma transação de toda alteração
+    # de tarefas do usuário. É a base do ETag e do cache de snapshots de GET /tasks.
+    versao_tarefas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Maior versão cujos tombstones já foram compactados: sincronizações anteriores a ela
+    # não são mais possíveis e o cliente precisa recarregar o quadro completo.
+    versao_compactada = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     # Relação: um usuário pode ter muitas tarefas.
     # 'cascade="all, delete-orphan"' garante que tarefas são deletadas se o usuário for.
     tarefas = db.relationship('Tarefa', backref='usuario', lazy=True, cascade="all, delete-orphan")
@@ -96,22 +1040,93 @@ class Usuario(db.Model):
     def __repr__(self):
         return f'<Usuario {self.email}>'
 
+# Os perfis em cache (cache_perfis) de usuários alterados ou removidos pelo ORM são
+# invalidados depois do commit; um rollback descarta a marcação.
+@db.event.listens_for(Usuario, 'after_update')
+@db.event.listens_for(Usuario, 'after_delete')
+def marcar_perfil_alterado(mapper, conexao, usuario):
+    db.inspect(usuario).session.info.setdefault('perfis_alterados', set()).add(usuario.id)
+
+def invalidar_perfis_alterados(sessao):
+    alterados = sessao.info.pop('perfis_alterados', None)
+    if alterados:
+        cache_perfis.invalidar(alterados)
+
+def descartar_perfis_alterados(sessao):
+    sessao.info.pop('perfis_alterados', None)
+
+db.event.listen(db.session, 'after_commit', invalidar_perfis_alterados)
+db.event.listen(db.session, 'after_rollback', descartar_perfis_alterados)
+
+class Projeto(db.Model):
+    """
+    Modelo para a tabela 'projeto': os projetos de cada usuário, aos quais as tarefas e séries
+    se ligam por projeto_id. O nome é único por usuário sem diferenciar maiúsculas (NOCASE).
+    """
+    __table_args__ = (
+        # Também é o índice da listagem dos projetos do usuário e da busca por nome
+        db.UniqueConstraint('usuario_id', 'nome', name='uq_projeto_usuario_nome'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    nome = db.Column(db.String(100, collation='NOCASE'), nullable=False) # Ex: 'Familiar', 'Financeiro', 'Pessoal'
+    cor = db.Column(db.String(20), nullable=True) # Ex: '#3b82f6'
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<Projeto {self.nome}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nome': self.nome,
+            'cor': self.cor,
+            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
+            'usuario_id': self.usuario_id
+        }
+
 class Tarefa(db.Model):
     """
     Modelo para a tabela 'tarefa' no banco de dados.
     Armazena detalhes de cada tarefa associada a um usuário.
     """
+    __table_args__ = (
+        # Índice da listagem paginada do quadro: cada página por status vira uma
+        # varredura de intervalo em (usuario_id, status, data_vencimento, id), sem ordenação extra.
+        db.Index('ix_tarefa_usuario_status_vencimento', 'usuario_id', 'status', 'data_vencimento', 'id'),
+        # Quadro filtrado por projeto: como o índice acima, com o projeto antes do status
+        db.Index('ix_tarefa_usuario_projeto_status_vencimento', 'usuario_id', 'projeto_id', 'status', 'data_vencimento', 'id'),
+        # Uma linha no máximo por ocorrência de série (NULLs das tarefas avulsas não colidem)
+        db.Index('uq_tarefa_serie_ocorrencia', 'serie_id', 'ocorrencia', unique=True),
+        # Candidatas ao arquivamento: índice parcial, só com as tarefas concluídas
+        db.Index('ix_tarefa_concluidas_conclusao', 'data_conclusao', sqlite_where=db.text("status = 'concluido'")),
+        # Agendador de lembretes: tarefas abertas que vencem em uma janela de tempo, de todos os usuários
+        db.Index('ix_tarefa_status_vencimento', 'status', 'data_vencimento'),
+        # Ids nunca reaproveitados (nem os das tarefas arquivadas ou removidas): ver migração 7
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False)
     descricao = db.Column(db.Text, nullable=True)
     data_vencimento = db.Column(db.DateTime, nullable=False)
     prioridade = db.Column(db.String(50), nullable=False) # Ex: 'Baixa', 'Média', 'Alta'
-    projeto = db.Column(db.String(100), nullable=True) # Ex: 'Familiar', 'Financeiro', 'Pessoal'
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projeto.id'), nullable=True)
     status = db.Column(db.String(50), default='a fazer', nullable=False) # Ex: 'a fazer', 'fazendo', 'concluido'
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     data_conclusao = db.Column(db.DateTime, nullable=True) # Preenchida quando o status é 'concluido'
     # Chave estrangeira para ligar a tarefa a um usuário específico
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    # Ocorrência materializada de uma série recorrente (concluída ou editada): a série e a
+    # data original da ocorrência, que continua identificando-a mesmo se o vencimento mudar
+    serie_id = db.Column(db.Integer, db.ForeignKey('serie_tarefa.id'), nullable=True)
+    ocorrencia = db.Column(db.DateTime, nullable=True)
+    # Versão da linha para concorrência otimista (PATCH /tasks/<id>/status): incrementada em toda
+    # alteração da tarefa, pelo próprio UPDATE ou pelo gatilho tarefa_versao nos demais caminhos
+    versao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Carregado no mesmo SELECT da tarefa (LEFT JOIN pela chave primária do projeto)
+    projeto = db.relationship('Projeto', lazy='joined')
 
     def __repr__(self):
         return f'<Tarefa {self.titulo} ({self.status})>'
@@ -127,460 +1142,3443 @@ class Tarefa(db.Model):
             'descricao': self.descricao,
             'data_vencimento': self.data_vencimento.isoformat() if self.data_vencimento else None,
             'prioridade': self.prioridade,
-            'projeto': self.projeto,
+            'projeto': self.projeto.nome if self.projeto else None,
+            'projeto_id': self.projeto_id,
+            'serie_id': self.serie_id,
             'status': self.status,
             'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
             'data_conclusao': self.data_conclusao.isoformat() if self.data_conclusao else None,
-            'usuario_id': self.usuario_id
+            'usuario_id': self.usuario_id,
+            'versao': self.versao
         }
 
-# Cria as tabelas no banco de dados (se não existirem) ao iniciar o aplicativo.
-# Este bloco garante que o contexto da aplicação esteja ativo para operações de BD.
-with app.app_context():
-    db.create_all()
+class AlteracaoTarefa(db.Model):
+    """
+    Modelo para a tabela 'alteracao_tarefa': log de alterações usado pela sincronização incremental.
+    Guarda só a última alteração de cada tarefa, com a versão do quadro em que ocorreu:
+    'alterada' (criada, editada ou com status alterado) ou 'removida' (tombstone).
+    Assim o log cresce com as tarefas existentes mais os tombstones ainda retidos.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'tarefa_id', name='uq_alteracao_usuario_tarefa'),
+        # Busca das alterações posteriores a uma versão: varredura de intervalo por usuário
+        db.Index('ix_alteracao_usuario_versao', 'usuario_id', 'versao'),
+        # Compactação dos tombstones antigos
+        db.Index('ix_alteracao_tipo_data', 'tipo', 'data_alteracao'),
+    )
 
-# =============================================
-# FUNÇÕES AUXILIARES
-# =============================================
-def validar_email(email):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    tarefa_id = db.Column(db.Integer, nullable=False) # Sem chave estrangeira: a tarefa pode ter sido removida
+    versao = db.Column(db.Integer, nullable=False)
+    tipo = db.Column(db.String(10), nullable=False) # 'alterada' ou 'removida'
+    data_alteracao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<AlteracaoTarefa {self.tarefa_id} v{self.versao} ({self.tipo})>'
+
+class ContadorTarefa(db.Model):
     """
-    Valida o formato de um endereço de email usando uma expressão regular.
+    Modelo para a tabela 'contador_tarefa': contadores pré-calculados das tarefas de cada usuário,
+    por dimensão ('status', 'prioridade', 'projeto', 'projeto_aberto', 'vencimento_aberto', 'conclusao')
+    e valor (o projeto_id como texto, nas dimensões de projeto).
+    São mantidos pelos gatilhos da tabela 'tarefa' e reconciliados periodicamente com ela.
     """
-    try:
-        return re.match(r'^[\w\.-]+@[\w\.-]+\.\w{2,}$', email)
-    except Exception as e:
-        logger.error(f"Erro na validação de email: {str(e)}")
-        return False
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'dimensao', 'valor', name='uq_contador_usuario_dimensao_valor'),
+    )
 
-# =============================================
-# ROTAS PARA SERVIR ARQUIVOS DO FRONTEND (HTML, CSS, JS, IMAGENS)
-# =============================================
-@app.route('/')
-def index():
-    """Rota raiz que serve a página de login."""
-    return send_from_directory(app.template_folder, 'login.html')
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    dimensao = db.Column(db.String(20), nullable=False)
+    valor = db.Column(db.String(100), nullable=False) # '' para tarefas sem projeto
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    soma_segundos = db.Column(db.Float, nullable=False, default=0.0) # Tempo total até a conclusão ('conclusao')
 
-@app.route('/login.html')
-def serve_login():
-    """Rota para servir a página de login."""
-    return send_from_directory(app.template_folder, 'login.html')
+    def __repr__(self):
+        return f'<ContadorTarefa {self.usuario_id} {self.dimensao}={self.valor}: {self.quantidade}>'
 
-@app.route('/teladecadastro.html')
-def serve_cadastro_html():
-    """Rota para servir a página de cadastro de usuário."""
-    return send_from_directory(app.template_folder, 'teladecadastro.html')
+class SerieTarefa(db.Model):
+    """
+    Modelo para a tabela 'serie_tarefa': uma tarefa recorrente, guardada uma única vez.
+    As ocorrências são calculadas pela regra (frequência, intervalo, data de início e fim
+    ou quantidade) para a janela de datas pedida; só as concluídas ou editadas viram
+    linhas em 'tarefa' (serie_id + ocorrencia).
+    """
+    __table_args__ = (
+        db.Index('ix_serie_tarefa_usuario', 'usuario_id'),
+    )
 
-@app.route('/frontend/templates/inicial.html')
-def serve_inicial_html():
-    """Rota para servir a página inicial (principal) do aplicativo To-Do List."""
-    return send_from_directory(app.template_folder, 'inicial.html')
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    titulo = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text, nullable=True)
+    prioridade = db.Column(db.String(50), nullable=False)
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projeto.id'), nullable=True)
+    frequencia = db.Column(db.String(10), nullable=False) # 'diaria', 'semanal' ou 'mensal'
+    intervalo = db.Column(db.Integer, nullable=False, default=1) # A cada N dias/semanas/meses
+    data_inicio = db.Column(db.DateTime, nullable=False) # Vencimento da primeira ocorrência
+    data_fim = db.Column(db.DateTime, nullable=True) # Última data possível (inclusiva)
+    quantidade = db.Column(db.Integer, nullable=True) # Número máximo de ocorrências
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    projeto = db.relationship('Projeto', lazy='joined')
 
-# NOVA ROTA ADICIONADA/AJUSTADA PARA CRIARTAREFA.HTML
-@app.route('/frontend/templates/criartarefa.html')
-def serve_criar_tarefa_html():
-    """Rota para servir a página de criação de tarefas (criartarefa.html)."""
-    return send_from_directory(app.template_folder, 'criartarefa.html')
+    def __repr__(self):
+        return f'<SerieTarefa {self.titulo} ({self.frequencia}/{self.intervalo})>'
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'titulo': self.titulo,
+            'descricao': self.descricao,
+            'prioridade': self.prioridade,
+            'projeto': self.projeto.nome if self.projeto else None,
+            'projeto_id': self.projeto_id,
+            'frequencia': self.frequencia,
+            'intervalo': self.intervalo,
+            'data_inicio': self.data_inicio.isoformat(),
+            'data_fim': self.data_fim.isoformat() if self.data_fim else None,
+            'quantidade': self.quantidade,
+            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
+            'usuario_id': self.usuario_id
+        }
 
-@app.route('/frontend/static/<path:filename>')
-def serve_static_files(filename):
+class ExcecaoSerie(db.Model):
     """
-    Rota para servir arquivos estáticos (CSS, JS, imagens) do frontend.
-    O 'path:filename' permite que esta rota capture qualquer subcaminho após '/frontend/static/'.
+    Modelo para a tabela 'excecao_serie': ocorrências removidas de uma série, que não
+    devem voltar a ser geradas. Preenchida pelo gatilho de remoção de tarefas.
     """
-    return send_from_directory(app.static_folder, filename)
+    __table_args__ = (
+        db.UniqueConstraint('serie_id', 'ocorrencia', name='uq_excecao_serie_ocorrencia'),
+    )
 
-# =============================================
-# ROTAS DE AUTENTICAÇÃO DE USUÁRIOS
-# =============================================
-@app.route('/cadastro', methods=['POST'])
-def cadastrar_usuario():
+    id = db.Column(db.Integer, primary_key=True)
+    serie_id = db.Column(db.Integer, db.ForeignKey('serie_tarefa.id'), nullable=False)
+    ocorrencia = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<ExcecaoSerie {self.serie_id} {self.ocorrencia}>'
+
+class TarefaArquivada(db.Model):
     """
-    Rota para cadastrar um novo usuário.
-    Recebe nome, email, senha e confirmação de senha.
-    Retorna uma mensagem de sucesso e um token JWT para login automático.
+    Modelo para a tabela 'tarefa_arquivada': tarefas concluídas há mais de ARQUIVAMENTO_DIAS,
+    movidas para fora de 'tarefa' pelo arquivamento (mesmas colunas e mesmo id, mais a data
+    do arquivamento). Assim a tabela do quadro, seus índices e o cache de páginas do SQLite
+    ficam com as tarefas em uso, por mais antiga que seja a conta. Não entra na busca
+    textual; os gatilhos de contadores (migração 8) a mantêm em GET /tasks/stats.
     """
-    try:
-        dados = request.get_json()
+    __tablename__ = 'tarefa_arquivada'
+    __table_args__ = (
+        # GET /tasks/archive: das concluídas mais recentemente para as mais antigas, paginado por chave
+        db.Index('ix_tarefa_arquivada_usuario_conclusao', 'usuario_id', 'data_conclusao', 'id'),
+    )
 
-        # Validação de campos obrigatórios
-        campos_obrigatorios = ['nome', 'email', 'senha', 'confirmarSenha']
-        for campo in campos_obrigatorios:
-            if campo not in dados or not dados[campo]:
-                return jsonify({'erro': f'Campo obrigatório faltando ou vazio: {campo}'}), 400
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False) # O id que a tarefa tinha no quadro
+    titulo = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text, nullable=True)
+    data_vencimento = db.Column(db.DateTime, nullable=False)
+    prioridade = db.Column(db.String(50), nullable=False)
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projeto.id'), nullable=True)
+    status = db.Column(db.String(50), nullable=False)
+    data_criacao = db.Column(db.DateTime, nullable=False)
+    data_conclusao = db.Column(db.DateTime, nullable=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    serie_id = db.Column(db.Integer, db.ForeignKey('serie_tarefa.id'), nullable=True)
+    ocorrencia = db.Column(db.DateTime, nullable=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    data_arquivamento = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    projeto = db.relationship('Projeto', lazy='joined')
+
+    def __repr__(self):
+        return f'<TarefaArquivada {self.titulo} ({self.data_conclusao})>'
+
+    def to_dict(self):
+        """Como Tarefa.to_dict(), com a data do arquivamento."""
+        return {
+            'id': self.id,
+            'titulo': self.titulo,
+            'descricao': self.descricao,
+            'data_vencimento': self.data_vencimento.isoformat() if self.data_vencimento else None,
+            'prioridade': self.prioridade,
+            'projeto': self.projeto.nome if self.projeto else None,
+            'projeto_id': self.projeto_id,
+            'serie_id': self.serie_id,
+            'status': self.status,
+            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
+            'data_conclusao': self.data_conclusao.isoformat() if self.data_conclusao else None,
+            'data_arquivamento': self.data_arquivamento.isoformat() if self.data_arquivamento else None,
+            'usuario_id': self.usuario_id,
+            'versao': self.versao
+        }
+
+class Notificacao(db.Model):
+    """
+    Modelo para a tabela 'notificacao': avisos de vencimento gerados pelo agendador de lembretes.
+    Tipos: 'vence_em_breve' (vence nas próximas LEMBRETES_ANTECEDENCIA_HORAS) e 'atrasada'.
+    Guarda o título e o vencimento da tarefa no momento do aviso; uma tarefa recebe no máximo
+    um aviso de cada tipo por data de vencimento (um novo, se o vencimento for alterado).
+    """
+    __table_args__ = (
+        db.UniqueConstraint('tarefa_id', 'tipo', 'data_vencimento', name='uq_notificacao_tarefa_tipo_vencimento'),
+        # GET /notifications: das mais recentes para as mais antigas, paginado pelo id
+        db.Index('ix_notificacao_usuario_id', 'usuario_id', 'id'),
+        # Filtro e contagem das não lidas: índice parcial, só com elas
+        db.Index('ix_notificacao_nao_lidas', 'usuario_id', 'id', sqlite_where=db.text('lida = 0')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    tarefa_id = db.Column(db.Integer, nullable=False) # Sem chave estrangeira: a tarefa pode ter sido removida
+    tipo = db.Column(db.String(20), nullable=False) # 'vence_em_breve' ou 'atrasada'
+    titulo = db.Column(db.String(200), nullable=False)
+    data_vencimento = db.Column(db.DateTime, nullable=False)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    lida = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+
+    def __repr__(self):
+        return f'<Notificacao {self.tipo} tarefa {self.tarefa_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'tarefa_id': self.tarefa_id,
+            'titulo': self.titulo,
+            'data_vencimento': self.data_vencimento.isoformat(),
+            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
+            'lida': self.lida
+        }
+
+class MarcoLembretes(db.Model):
+    """
+    Modelo para a tabela 'marco_lembretes': até onde o agendador de lembretes já verificou os
+    vencimentos, por tipo de aviso. O marco é a posição (data_vencimento, tarefa_id) da última
+    tarefa verificada; cada verificação só lê as tarefas entre o marco e o instante atual
+    (mais a antecedência), e o avanço do marco é um UPDATE condicional, para que dois
+    processos não processem a mesma janela.
+    """
+    __tablename__ = 'marco_lembretes'
+
+    tipo = db.Column(db.String(20), primary_key=True)
+    verificado_ate = db.Column(db.DateTime, nullable=False)
+    ultimo_id = db.Column(db.Integer, nullable=False, default=0) # Desempate entre tarefas com o mesmo vencimento
+
+    def __repr__(self):
+        return f'<MarcoLembretes {self.tipo} {self.verificado_ate}>'
+
+def adicionar_colunas_faltantes():
+    """
+    create_all não altera tabelas que já existem: adiciona com ALTER TABLE as colunas
+    dos modelos que ainda não estão no banco (usando o server_default da coluna).
+    """
+    inspetor = db.inspect(db.engine)
+    for tabela in db.metadata.sorted_tables:
+        existentes = {coluna['name'] for coluna in inspetor.get_columns(tabela.name)}
+        for coluna in tabela.columns:
+            if coluna.name in existentes:
+                continue
+            tipo = coluna.type.compile(dialect=db.engine.dialect)
+            restricoes = '' if coluna.nullable else ' NOT NULL'
+            if coluna.server_default is not None:
+                restricoes += f" DEFAULT {coluna.server_default.arg}"
+            db.session.execute(db.text(f"ALTER TABLE {tabela.name} ADD COLUMN {coluna.name} {tipo}{restricoes}"))
+            logger.info(f"Coluna {tabela.name}.{coluna.name} adicionada ao banco de dados.")
+    db.session.commit()
+
+# Busca textual (SQLite FTS5). O índice 'tarefa_fts' usa como conteúdo externo uma view
+# sobre a tabela 'tarefa', então o texto não é duplicado; a coluna 'dono' ('u<usuario_id>')
+# restringe a busca às tarefas do usuário dentro do próprio índice. Gatilhos mantêm o
+# índice sincronizado em qualquer caminho de escrita (rotas individuais, lote, importação).
+COMANDOS_BUSCA_TEXTUAL = [
+    """CREATE VIEW IF NOT EXISTS tarefa_busca_origem AS
+       SELECT id, titulo, descricao, 'u' || usuario_id AS dono FROM tarefa""",
+    """CREATE TRIGGER IF NOT EXISTS tarefa_fts_insercao AFTER INSERT ON tarefa BEGIN
+         INSERT INTO tarefa_fts(rowid, titulo, descricao, dono)
+         VALUES (new.id, new.titulo, new.descricao, 'u' || new.usuario_id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS tarefa_fts_remocao AFTER DELETE ON tarefa BEGIN
+         INSERT INTO tarefa_fts(tarefa_fts, rowid, titulo, descricao, dono)
+         VALUES ('delete', old.id, old.titulo, old.descricao, 'u' || old.usuario_id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS tarefa_fts_edicao AFTER UPDATE OF titulo, descricao, usuario_id ON tarefa BEGIN
+         INSERT INTO tarefa_fts(tarefa_fts, rowid, titulo, descricao, dono)
+         VALUES ('delete', old.id, old.titulo, old.descricao, 'u' || old.usuario_id);
+         INSERT INTO tarefa_fts(rowid, titulo, descricao, dono)
+         VALUES (new.id, new.titulo, new.descricao, 'u' || new.usuario_id);
+       END"""
+]
+busca_textual = {'disponivel': False}
+
+def configurar_busca_textual():
+    """
+    Cria o índice FTS5 e os gatilhos de sincronização, se ainda não existirem.
+    Quando o índice é criado agora, as tarefas já existentes são indexadas (rebuild).
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+    existia = db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tarefa_fts'"
+    )).scalar() is not None
+    try:
+        if not existia:
+            db.session.execute(db.text(
+                "CREATE VIRTUAL TABLE tarefa_fts USING fts5("
+                "titulo, descricao, dono, content='tarefa_busca_origem', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+        for comando in COMANDOS_BUSCA_TEXTUAL:
+            db.session.execute(db.text(comando))
+        if not existia:
+            reconstruir_busca_textual()
+        db.session.commit()
+        busca_textual['disponivel'] = True
+    except db.exc.OperationalError as e:
+        # SQLite compilado sem FTS5: a aplicação funciona, só a busca fica indisponível
+        db.session.rollback()
+        logger.warning(f"Busca textual indisponível (FTS5 não suportado?): {str(e)}")
+
+def reconstruir_busca_textual():
+    """Reindexa todas as tarefas no índice FTS5 (uso em bancos já existentes ou após restauração)."""
+    db.session.execute(db.text("INSERT INTO tarefa_fts(tarefa_fts) VALUES ('rebuild')"))
+
+@app.cli.command('reconstruir-busca')
+def comando_reconstruir_busca():
+    """Reconstrói o índice de busca textual das tarefas."""
+    reconstruir_busca_textual()
+    db.session.commit()
+    print("Índice de busca textual reconstruído.")
+
+# Contadores de tarefas (GET /tasks/stats). Cada dimensão define, em função da linha da
+# tarefa ({t} = new, old ou tarefa): o valor contado, a condição para a tarefa entrar na
+# contagem, a parcela somada em 'soma_segundos' e as colunas das quais depende.
+# 'vencimento_aberto' conta as tarefas não concluídas por dia de vencimento: as atrasadas
+# são a soma dos dias anteriores a hoje, sem varrer as tarefas.
+DIMENSOES_CONTADORES = [
+    ('status', '{t}.status', '1', '0', ['status']),
+    ('prioridade', '{t}.prioridade', '1', '0', ['prioridade']),
+    ('projeto', "COALESCE(CAST({t}.projeto_id AS TEXT), '')", '1', '0', ['projeto_id']),
+    ('projeto_aberto', "COALESCE(CAST({t}.projeto_id AS TEXT), '')", "{t}.status != 'concluido'", '0', ['projeto_id', 'status']),
+    ('vencimento_aberto', 'date({t}.data_vencimento)', "{t}.status != 'concluido'", '0', ['data_vencimento', 'status']),
+    ('conclusao', "''", '{t}.data_conclusao IS NOT NULL',
+     '(julianday({t}.data_conclusao) - julianday({t}.data_criacao)) * 86400', ['data_conclusao', 'data_criacao']),
+]
+
+def comando_ajuste_contador(linha, sinal, dimensao, valor, condicao, soma):
+    """Upsert que soma (sinal '+') ou subtrai (sinal '-') a tarefa 'linha' do contador da dimensão."""
+    return (
+        f"INSERT INTO contador_tarefa (usuario_id, dimensao, valor, quantidade, soma_segundos) "
+        f"SELECT {linha}.usuario_id, '{dimensao}', {valor.format(t=linha)}, {sinal}1, {sinal}({soma.format(t=linha)}) "
+        f"WHERE {condicao.format(t=linha)} "
+        f"ON CONFLICT (usuario_id, dimensao, valor) DO UPDATE SET "
+        f"quantidade = quantidade + excluded.quantidade, soma_segundos = soma_segundos + excluded.soma_segundos;"
+    )
+
+def comandos_gatilhos_contadores(tabela='tarefa'):
+    """
+    Gatilhos que mantêm contador_tarefa em qualquer caminho de escrita (rotas, lote, SQL em massa).
+    Com tabela='tarefa_arquivada', os mesmos gatilhos no arquivo: arquivar ou desarquivar uma
+    tarefa remove a linha de uma tabela e a insere na outra, sem mudar os contadores.
+    """
+    comandos = [
+        f"CREATE TRIGGER IF NOT EXISTS {tabela}_contadores_insercao AFTER INSERT ON {tabela} BEGIN "
+        + " ".join(comando_ajuste_contador('new', '+', *dimensao[:4]) for dimensao in DIMENSOES_CONTADORES)
+        + " END",
+        f"CREATE TRIGGER IF NOT EXISTS {tabela}_contadores_remocao AFTER DELETE ON {tabela} BEGIN "
+        + " ".join(comando_ajuste_contador('old', '-', *dimensao[:4]) for dimensao in DIMENSOES_CONTADORES)
+        + " END"
+    ]
+    # Um gatilho de edição por dimensão, disparado só quando uma coluna da qual ela depende muda
+    for dimensao, valor, condicao, soma, colunas in DIMENSOES_CONTADORES:
+        colunas = colunas + ['usuario_id']
+        comandos.append(
+            f"CREATE TRIGGER IF NOT EXISTS {tabela}_contadores_{dimensao} AFTER UPDATE OF {', '.join(colunas)} ON {tabela} "
+            f"WHEN {' OR '.join(f'old.{coluna} IS NOT new.{coluna}' for coluna in colunas)} BEGIN "
+            f"{comando_ajuste_contador('old', '-', dimensao, valor, condicao, soma)} "
+            f"{comando_ajuste_contador('new', '+', dimensao, valor, condicao, soma)} END"
+        )
+    return comandos
+
+def configurar_contadores_tarefas():
+    """
+    Cria os gatilhos dos contadores de tarefas, se ainda não existirem.
+    Quando são criados agora, os contadores das tarefas já existentes são calculados.
+    """
+    existiam = db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'tarefa_contadores_insercao'"
+    )).scalar() is not None
+    for comando in comandos_gatilhos_contadores():
+        db.session.execute(db.text(comando))
+    db.session.commit()
+    if not existiam:
+        reconciliar_contadores_tarefas()
+
+def reconciliar_contadores_tarefas():
+    """
+    Recalcula os contadores a partir das tarefas do quadro e do arquivo e corrige os que
+    divergem (ex.: alterações feitas com os gatilhos desativados ou restauração de backup).
+    Processa os usuários em blocos, uma transação por bloco.
+    Retorna a quantidade de contadores corrigidos.
+    """
+    usuarios_por_bloco = app.config['CONTADORES_USUARIOS_POR_BLOCO']
+    maior_id = db.session.query(db.func.max(Usuario.id)).scalar() or 0
+    corrigidos = 0
+    for inicio in range(1, maior_id + 1, usuarios_por_bloco):
+        fim = inicio + usuarios_por_bloco - 1
+        # A limpeza dos contadores zerados vem primeiro: por ser uma escrita, ela abre a transação
+        # e segura o lock de escrita até o commit, então nenhuma alteração de tarefa entra
+        # entre a contagem abaixo e a correção.
+        db.session.execute(
+            db.delete(ContadorTarefa)
+            .where(ContadorTarefa.usuario_id.between(inicio, fim), ContadorTarefa.quantidade == 0)
+            .execution_options(synchronize_session=False)
+        )
+        esperados = {}
+        for dimensao, valor, condicao, soma, _ in DIMENSOES_CONTADORES:
+            # O SQLite leva o filtro por usuário para dentro de cada lado do UNION ALL (e dos índices)
+            linhas = db.session.execute(db.text(
+                f"SELECT usuario_id, {valor.format(t='tarefa')}, COUNT(*), TOTAL({soma.format(t='tarefa')}) "
+                f"FROM (SELECT {COLUNAS_ARQUIVAMENTO} FROM tarefa "
+                f"UNION ALL SELECT {COLUNAS_ARQUIVAMENTO} FROM tarefa_arquivada) AS tarefa "
+                f"WHERE usuario_id BETWEEN :inicio AND :fim AND {condicao.format(t='tarefa')} "
+                f"GROUP BY 1, 2"
+            ), {'inicio': inicio, 'fim': fim})
+            for usuario_id, valor_contado, quantidade, segundos in linhas:
+                esperados[(usuario_id, dimensao, valor_contado)] = (quantidade, segundos)
+        atuais = {
+            (usuario_id, dimensao, valor): (quantidade, segundos)
+            for usuario_id, dimensao, valor, quantidade, segundos in db.session.query(
+                ContadorTarefa.usuario_id, ContadorTarefa.dimensao, ContadorTarefa.valor,
+                ContadorTarefa.quantidade, ContadorTarefa.soma_segundos
+            ).filter(ContadorTarefa.usuario_id.between(inicio, fim))
+        }
+
+        correcoes = []
+        for chave in esperados.keys() | atuais.keys():
+            quantidade, segundos = esperados.get(chave, (0, 0.0))
+            quantidade_atual, segundos_atual = atuais.get(chave, (0, 0.0))
+            if quantidade != quantidade_atual or abs(segundos - segundos_atual) > 1.0:
+                usuario_id, dimensao, valor = chave
+                correcoes.append({
+                    'usuario_id': usuario_id, 'dimensao': dimensao, 'valor': valor,
+                    'quantidade': quantidade, 'soma_segundos': segundos
+                })
+        if correcoes:
+            comando = sqlite_insert(ContadorTarefa)
+            db.session.execute(comando.on_conflict_do_update(
+                index_elements=['usuario_id', 'dimensao', 'valor'],
+                set_={'quantidade': comando.excluded.quantidade, 'soma_segundos': comando.excluded.soma_segundos}
+            ), correcoes)
+        db.session.commit()
+        corrigidos += len(correcoes)
+    return corrigidos
+
+@app.cli.command('reconciliar-contadores')
+def comando_reconciliar_contadores():
+    """Recalcula os contadores de tarefas (GET /tasks/stats) a partir da tabela de tarefas."""
+    corrigidos = reconciliar_contadores_tarefas()
+    print(f"{corrigidos} contadores corrigidos.")
+
+# =============================================
+# INICIALIZAÇÃO DA APLICAÇÃO E MIGRAÇÕES DO ESQUEMA
+# =============================================
+# A versão do esquema fica no cabeçalho do arquivo SQLite (PRAGMA user_version). Cada
+# migração é aplicada uma única vez, em ordem, no deploy; os workers só conferem a versão.
+def sincronizar_tabelas_modelos():
+    """Cria as tabelas, colunas e índices dos modelos que ainda não existem no banco."""
+    db.create_all()
+    adicionar_colunas_faltantes()
+    # create_all não adiciona índices novos a tabelas que já existem, então
+    # os índices são criados explicitamente (se ainda não existirem).
+    for tabela in db.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(bind=db.engine, checkfirst=True)
+
+# Gatilhos de 'tarefa' criados pelas migrações 2 e 4 (e recriados quando a tabela é reconstruída)
+COMANDO_GATILHO_EXCECAO_SERIE = """CREATE TRIGGER IF NOT EXISTS tarefa_excecao_serie AFTER DELETE ON tarefa
+   WHEN old.serie_id IS NOT NULL BEGIN
+     INSERT OR IGNORE INTO excecao_serie (serie_id, ocorrencia) VALUES (old.serie_id, old.ocorrencia);
+   END"""
+COMANDO_GATILHO_VERSAO = """CREATE TRIGGER IF NOT EXISTS tarefa_versao AFTER UPDATE ON tarefa
+   WHEN new.versao IS old.versao BEGIN
+     UPDATE tarefa SET versao = old.versao + 1 WHERE id = new.id;
+   END"""
+
+def migracao_esquema_base():
+    """
+    Tabelas e colunas dos modelos, índices, busca textual e contadores. Idempotente:
+    também leva à versão 1 os bancos criados antes das migrações (pelo create_all no import).
+    """
+    sincronizar_tabelas_modelos()
+    configurar_busca_textual()
+    configurar_contadores_tarefas()
+
+def migracao_series_recorrentes():
+    """
+    Séries de tarefas recorrentes: tabelas serie_tarefa e excecao_serie, colunas
+    tarefa.serie_id/ocorrencia e o gatilho que registra como exceção a ocorrência
+    materializada que for removida (por qualquer caminho), para que não volte a ser gerada.
+    """
+    sincronizar_tabelas_modelos()
+    db.session.execute(db.text(COMANDO_GATILHO_EXCECAO_SERIE))
+    db.session.commit()
+
+def migracao_tabela_projetos():
+    """
+    Projetos como tabela: cria 'projeto' e as colunas projeto_id, transforma os nomes livres
+    distintos de tarefa.projeto e serie_tarefa.projeto de cada usuário em projetos (sem espaços
+    nas pontas e sem diferenciar maiúsculas: 'Pessoal' e 'pessoal ' viram um só), liga as linhas
+    a eles e remove as colunas de texto. O nome do projeto é a grafia (sem os espaços das pontas)
+    usada no maior número de tarefas e séries; no empate, a da linha criada primeiro. Os gatilhos
+    dos contadores, que usavam a coluna antiga, são recriados sobre projeto_id e os contadores, recalculados.
+    """
+    sincronizar_tabelas_modelos()
+    inspetor = db.inspect(db.engine)
+    tabelas = [
+        tabela for tabela in ('tarefa', 'serie_tarefa')
+        if 'projeto' in {coluna['name'] for coluna in inspetor.get_columns(tabela)}
+    ]
+    if tabelas:
+        origem = ' UNION ALL '.join(f"SELECT usuario_id, TRIM(projeto) AS nome, data_criacao FROM {tabela}" for tabela in tabelas)
+        # Grafias exatas (collation BINARY) e, entre as que só diferem em maiúsculas, a escolhida
+        db.session.execute(db.text(
+            f"WITH grafias AS ("
+            f"SELECT usuario_id, nome, COUNT(*) AS quantidade, MIN(data_criacao) AS primeira "
+            f"FROM ({origem}) WHERE nome != '' GROUP BY usuario_id, nome), "
+            f"ordenadas AS ("
+            f"SELECT usuario_id, nome, "
+            f"ROW_NUMBER() OVER (PARTITION BY usuario_id, nome COLLATE NOCASE ORDER BY quantidade DESC, primeira, nome) AS posicao, "
+            f"MIN(primeira) OVER (PARTITION BY usuario_id, nome COLLATE NOCASE) AS data_criacao FROM grafias) "
+            f"INSERT INTO projeto (usuario_id, nome, data_criacao) "
+            f"SELECT usuario_id, nome, data_criacao FROM ordenadas WHERE posicao = 1 "
+            f"ON CONFLICT (usuario_id, nome) DO NOTHING"
+        ))
+    for tabela in tabelas:
+        # A comparação usa a collation NOCASE de projeto.nome
+        db.session.execute(db.text(
+            f"UPDATE {tabela} SET projeto_id = ("
+            f"SELECT projeto.id FROM projeto WHERE projeto.usuario_id = {tabela}.usuario_id "
+            f"AND projeto.nome = TRIM({tabela}.projeto)) "
+            f"WHERE TRIM(projeto) != ''"
+        ))
+
+    if 'tarefa' in tabelas:
+        # O SQLite só remove a coluna sem índices nem gatilhos que a referenciem
+        db.session.execute(db.text("DROP INDEX IF EXISTS ix_tarefa_usuario_projeto"))
+        for nome in ('insercao', 'remocao', 'projeto'):
+            db.session.execute(db.text(f"DROP TRIGGER IF EXISTS tarefa_contadores_{nome}"))
+        db.session.execute(db.delete(ContadorTarefa).where(ContadorTarefa.dimensao == 'projeto'))
+    for tabela in tabelas:
+        db.session.execute(db.text(f"ALTER TABLE {tabela} DROP COLUMN projeto"))
+    db.session.commit()
+    logger.info("Projetos migrados: %s projetos.", db.session.query(db.func.count(Projeto.id)).scalar())
+    # Recria os gatilhos removidos acima; como o de inserção não existe mais, os contadores são recalculados
+    configurar_contadores_tarefas()
+
+def migracao_versao_tarefas():
+    """
+    Coluna tarefa.versao (concorrência otimista) e o gatilho que a incrementa em qualquer
+    UPDATE que não a altere por conta própria (edição, lote, importação, projetos, séries).
+    A mudança de status de PATCH /tasks/<id>/status incrementa a versão no próprio UPDATE
+    condicional, então o gatilho não dispara para ela.
+    """
+    sincronizar_tabelas_modelos()
+    db.session.execute(db.text(COMANDO_GATILHO_VERSAO))
+    db.session.commit()
+
+def migracao_arquivo_tarefas():
+    """
+    Arquivo das tarefas concluídas: tabela tarefa_arquivada e o índice parcial das tarefas
+    concluídas por data de conclusão, usado pelo arquivamento para achar as candidatas.
+    """
+    sincronizar_tabelas_modelos()
+
+def migracao_notificacoes_vencimento():
+    """
+    Lembretes de vencimento: tabelas notificacao e marco_lembretes e o índice
+    (status, data_vencimento) com que o agendador acha as tarefas de cada janela.
+    """
+    sincronizar_tabelas_modelos()
+
+def migracao_ids_tarefas_crescentes():
+    """
+    Ids de tarefa nunca reaproveitados: reconstrói 'tarefa' com AUTOINCREMENT, para que o
+    SQLite guarde em sqlite_sequence o maior id já usado. Sem isso, uma tarefa nova recebe o
+    maior id presente + 1, que pode ser o de uma tarefa arquivada (ou removida) e colidir com
+    ela no arquivo e no log de alterações. O marco começa no maior id de 'tarefa' e de
+    'tarefa_arquivada'. A reconstrução roda em uma transação; a view da busca textual, os
+    índices e os gatilhos da tabela são recriados em seguida.
+    """
+    sincronizar_tabelas_modelos()
+    definicao = db.session.execute(db.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tarefa'"
+    )).scalar()
+    if 'AUTOINCREMENT' not in definicao.upper():
+        conexao = db.session.connection()
+        # Cópia do modelo com outro nome; as tabelas referenciadas vão junto para as chaves estrangeiras
+        metadados = db.MetaData()
+        for modelo in (Usuario, Projeto, SerieTarefa):
+            modelo.__table__.to_metadata(metadados)
+        tabela_nova = Tarefa.__table__.to_metadata(metadados, name='tarefa_nova')
+        conexao.execute(CreateTable(tabela_nova))
+        conexao.execute(db.text(
+            f"INSERT INTO tarefa_nova ({COLUNAS_ARQUIVAMENTO}) SELECT {COLUNAS_ARQUIVAMENTO} FROM tarefa"
+        ))
+        # O RENAME valida as views do esquema, e a da busca textual ficaria sem a tabela;
+        # o DROP TABLE remove os índices e gatilhos de 'tarefa' sem disparar os gatilhos
+        tem_busca_textual = conexao.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'tarefa_busca_origem'"
+        )).scalar() is not None
+        conexao.execute(db.text("DROP VIEW IF EXISTS tarefa_busca_origem"))
+        conexao.execute(db.text("DROP TABLE tarefa"))
+        conexao.execute(db.text("ALTER TABLE tarefa_nova RENAME TO tarefa"))
+        for indice in Tarefa.__table__.indexes:
+            indice.create(bind=conexao)
+        # O índice FTS5 usa os mesmos rowids, então continua válido sem rebuild
+        if tem_busca_textual:
+            for comando in COMANDOS_BUSCA_TEXTUAL:
+                conexao.execute(db.text(comando))
+        for comando in comandos_gatilhos_contadores() + [COMANDO_GATILHO_EXCECAO_SERIE, COMANDO_GATILHO_VERSAO]:
+            conexao.execute(db.text(comando))
+    db.session.execute(db.text("DELETE FROM sqlite_sequence WHERE name = 'tarefa'"))
+    db.session.execute(db.text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tarefa', MAX("
+        "(SELECT COALESCE(MAX(id), 0) FROM tarefa), (SELECT COALESCE(MAX(id), 0) FROM tarefa_arquivada))"
+    ))
+    db.session.commit()
+
+def migracao_contadores_arquivo():
+    """
+    Contadores de GET /tasks/stats sobre o quadro e o arquivo: cria em 'tarefa_arquivada' os
+    mesmos gatilhos de contadores de 'tarefa' e recalcula os contadores, que até aqui perdiam
+    as tarefas arquivadas (o arquivamento disparava o gatilho de remoção de 'tarefa').
+    """
+    sincronizar_tabelas_modelos()
+    for comando in comandos_gatilhos_contadores('tarefa_arquivada'):
+        db.session.execute(db.text(comando))
+    db.session.commit()
+    reconciliar_contadores_tarefas()
+
+MIGRACOES = [
+    (1, migracao_esquema_base),
+    (2, migracao_series_recorrentes),
+    (3, migracao_tabela_projetos),
+    (4, migracao_versao_tarefas),
+    (5, migracao_arquivo_tarefas),
+    (6, migracao_notificacoes_vencimento),
+    (7, migracao_ids_tarefas_crescentes),
+    (8, migracao_contadores_arquivo),
+]
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+esquema = {'verificado': False}
+
+def versao_esquema():
+    return db.session.execute(db.text("PRAGMA user_version")).scalar()
+
+def migrar_banco():
+    """Aplica, em ordem, as migrações com versão maior que a do banco. Retorna quantas foram aplicadas."""
+    aplicadas = 0
+    with app.app_context():
+        atual = versao_esquema()
+        for versao, migracao in MIGRACOES:
+            if versao <= atual:
+                continue
+            logger.info("Aplicando migração %s (%s).", versao, migracao.__name__)
+            migracao()
+            db.session.execute(db.text(f"PRAGMA user_version = {int(versao)}"))
+            db.session.commit()
+            aplicadas += 1
+    esquema['verificado'] = True
+    return aplicadas
+
+@app.cli.command('migrar')
+def comando_migrar():
+    """Aplica as migrações pendentes do esquema do banco de dados (executar no deploy)."""
+    aplicadas = migrar_banco()
+    print(f"{aplicadas} migrações aplicadas. Esquema na versão {VERSAO_ESQUEMA}.")
+
+@app.before_request
+def verificar_esquema():
+    """Na primeira requisição do processo, confere a versão do esquema (e a busca textual)."""
+    if esquema['verificado']:
+        return
+    atual = versao_esquema()
+    if atual < VERSAO_ESQUEMA:
+        if app.config['MIGRAR_AO_INICIAR']:
+            migrar_banco()
+        else:
+            logger.error(
+                "Esquema do banco na versão %s, esperada %s: execute 'flask --app backend/app.py migrar'.",
+                atual, VERSAO_ESQUEMA
+            )
+    busca_textual['disponivel'] = db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tarefa_fts'"
+    )).scalar() is not None
+    db.session.rollback() # Não segura a transação de leitura aberta durante a rota
+    esquema['verificado'] = True
+
+lock_inicializacao = threading.Lock()
+
+def inicializar_app():
+    """
+    Inicialização do processo, feita uma vez no primeiro contexto de aplicação: cria a engine
+    (sem abrir conexão), registra os listeners de métricas e do perfil SQLite e o logging.
+    """
+    with lock_inicializacao:
+        if app.inicializada:
+            return
+        inicio = time.perf_counter()
+        db.init_app(app)
+        with Flask.app_context(app): # Contexto próprio, sem reentrar na inicialização
+            configurar_medicao_sql()
+            configurar_perfil_sqlite()
+        if app.config['LOG_MODO'] == 'estruturado':
+            configurar_logging_estruturado()
+        app.inicializada = True
+        logger.info("Aplicação inicializada em %.1f ms.", (time.perf_counter() - inicio) * 1000)
+
+def preparar_app(migrar=False):
+    """
+    Prepara o app único do módulo antes de atender: antecipa a inicialização do processo
+    (que, sem esta chamada, acontece no primeiro contexto de aplicação) e, se pedido, aplica
+    as migrações. Não cria uma aplicação nova: configuração, modelos e rotas são definidos no
+    import, e servidores WSGI usam o próprio 'app' (ex.: gunicorn --chdir backend app:app).
+    O agendador de lembretes de vencimento não é iniciado aqui, e sim na primeira requisição
+    de cada processo (garantir_agendador_lembretes), que já é o worker depois de um fork.
+    """
+    inicializar_app()
+    if migrar:
+        migrar_banco()
+    return app
+
+# =============================================
+# FUNÇÕES AUXILIARES
+# =============================================
+STATUS_VALIDOS = ['a fazer', 'fazendo', 'concluido']
+PRIORIDADES_VALIDAS = ['Baixa', 'Média', 'Alta']
+LIMITE_PAGINA_MAXIMO = 500 # Limite máximo de tarefas por status em uma página de GET /tasks
+LIMITE_ARQUIVO_PADRAO = 50 # Tarefas por página de GET /tasks/archive sem o parâmetro limite
+LIMITE_NOTIFICACOES_PADRAO = 50 # Notificações por página de GET /notifications sem o parâmetro limite
+LIMITE_BUSCA_MAXIMO = 100 # Resultados máximos por página de GET /tasks/search
+PESOS_BUSCA_BM25 = (10.0, 1.0, 0.0) # Pesos de bm25() para as colunas titulo, descricao e dono de tarefa_fts
+LIMITE_LOTE_MAXIMO = 5000 # Máximo de operações aceitas em uma requisição de POST /tasks/batch
+TAMANHO_BLOCO_SQL = 500 # Ids por cláusula IN, abaixo do limite de parâmetros do SQLite
+TAMANHO_BLOCO_EXPORTACAO = 1000 # Tarefas lidas do banco e enviadas por vez em GET /tasks/export
+TAMANHO_LOTE_IMPORTACAO = 1000 # Tarefas inseridas por transação em POST /tasks/import
+MAX_ERROS_IMPORTACAO = 1000 # Erros de linha detalhados na resposta da importação (os demais só são contados)
+FREQUENCIAS_RECORRENCIA = ['diaria', 'semanal', 'mensal']
+RECORRENCIA_INTERVALO_MAXIMO = 365 # Maior intervalo aceito (a cada N dias/semanas/meses)
+RECORRENCIA_JANELA_PADRAO_DIAS = 14 # Janela de ocorrências de GET /tasks sem vencimento_ate (a partir de hoje ou de vencimento_de)
+RECORRENCIA_JANELA_MAXIMA_DIAS = 366 # Maior janela de ocorrências geradas por consulta (limita o custo das séries)
+FORMATO_DATA_SQLITE = '%Y-%m-%d %H:%M:%S.%f' # Texto em que o SQLAlchemy grava DateTime no SQLite
+TAMANHO_NOME_PROJETO = 100 # Tamanho máximo do nome de um projeto (coluna projeto.nome)
+CAMPOS_EXPORTACAO = ['id', 'titulo', 'descricao', 'data_vencimento', 'prioridade', 'projeto', 'projeto_id', 'status', 'data_criacao', 'data_conclusao', 'usuario_id']
+
+def validar_email(email):
+    """
+    Valida o formato de um endereço de email usando uma expressão regular.
+    """
+    try:
+        return re.match(r'^[\w\.-]+@[\w\.-]+\.\w{2,}$', email)
+    except Exception as e:
+        logger.error(f"Erro na validação de email: {str(e)}")
+        return False
+
+contador_alteracoes = count(1) # Alterações registradas por este processo (dispara a compactação do log)
+lock_compactacao = threading.Lock()
+lock_reconciliacao = threading.Lock()
+lock_arquivamento = threading.Lock()
+lock_lembretes = threading.Lock()
+parada_lembretes = threading.Event()
+agendador_lembretes = {'pid': None, 'thread': None} # Processo em que o agendador de lembretes foi iniciado
+
+# 'WHERE true' desfaz a ambiguidade do parser do SQLite entre o SELECT e a cláusula ON CONFLICT
+COMANDO_REGISTRAR_ALTERACOES = db.text(
+    "INSERT INTO alteracao_tarefa (usuario_id, tarefa_id, versao, tipo, data_alteracao) "
+    "SELECT :usuario_id, value, :versao, :tipo, :agora FROM json_each(:ids) WHERE true "
+    "ON CONFLICT (usuario_id, tarefa_id) DO UPDATE SET "
+    "versao = excluded.versao, tipo = excluded.tipo, data_alteracao = excluded.data_alteracao"
+)
+
+def registrar_alteracao_tarefas(usuario_id, alteradas=(), removidas=(), evento='atualizada'):
+    """
+    Incrementa a versão do quadro de tarefas do usuário na transação atual e registra no
+    log de alterações os ids de tarefas alteradas (criadas/editadas/status) e removidas.
+    O evento ('criada', 'atualizada', 'status', 'removida', 'lote', 'serie', 'projeto', 'arquivada'
+    ou 'restaurada') é publicado aos assinantes de GET /tasks/events após o commit.
+    Retorna a nova versão. Toda rota que cria, altera ou remove tarefas deve chamá-la antes do commit.
+    """
+    versao = db.session.execute(
+        db.update(Usuario)
+        .where(Usuario.id == usuario_id)
+        .values(versao_tarefas=Usuario.versao_tarefas + 1)
+        .returning(Usuario.versao_tarefas)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+    agora = datetime.utcnow().strftime(FORMATO_DATA_SQLITE)
+    # Upsert: cada tarefa mantém uma única linha com a sua alteração mais recente.
+    # Um único comando por tipo, com os ids em um array JSON, em vez de um executemany por linha.
+    for tipo, ids in (('alterada', alteradas), ('removida', removidas)):
+        if ids:
+            db.session.execute(COMANDO_REGISTRAR_ALTERACOES, {
+                'usuario_id': usuario_id, 'versao': versao, 'tipo': tipo, 'agora': agora, 'ids': json.dumps(list(ids))
+            })
+
+    db.session.info.setdefault('eventos_pendentes', []).append((usuario_id, {
+        'evento': evento,
+        'versao': versao,
+        'alteradas': list(alteradas),
+        'removidas': list(removidas)
+    }))
+
+    numero_alteracao = next(contador_alteracoes)
+    if numero_alteracao % app.config['ALTERACOES_COMPACTAR_A_CADA'] == 0:
+        agendar_compactacao_alteracoes()
+    if numero_alteracao % app.config['CONTADORES_RECONCILIAR_A_CADA'] == 0:
+        agendar_reconciliacao_contadores()
+    if numero_alteracao % app.config['ARQUIVAMENTO_A_CADA'] == 0 and app.config['ARQUIVAMENTO_DIAS']:
+        agendar_arquivamento_tarefas()
+    return versao
+
+def compactar_log_alteracoes():
+    """
+    Política de compactação do log de alterações: descarta os tombstones mais antigos que
+    ALTERACOES_RETENCAO_DIAS e, por usuário, os que excedem ALTERACOES_MAX_REMOVIDAS_POR_USUARIO.
+    A maior versão descartada vira a 'versao_compactada' do usuário.
+    Retorna a quantidade de tombstones removidos.
+    """
+    data_limite = datetime.utcnow() - timedelta(days=app.config['ALTERACOES_RETENCAO_DIAS'])
+    maximo = app.config['ALTERACOES_MAX_REMOVIDAS_POR_USUARIO']
+    removidas = AlteracaoTarefa.tipo == 'removida'
+
+    # Versão de corte por usuário: maior versão entre os tombstones expirados...
+    cortes = dict(
+        db.session.query(AlteracaoTarefa.usuario_id, db.func.max(AlteracaoTarefa.versao))
+        .filter(removidas, AlteracaoTarefa.data_alteracao < data_limite)
+        .group_by(AlteracaoTarefa.usuario_id)
+        .all()
+    )
+    # ... ou a do tombstone que deixa o usuário exatamente no limite
+    excedentes = (
+        db.session.query(AlteracaoTarefa.usuario_id, db.func.count())
+        .filter(removidas)
+        .group_by(AlteracaoTarefa.usuario_id)
+        .having(db.func.count() > maximo)
+        .all()
+    )
+    for usuario_id, quantidade in excedentes:
+        versao_corte = (
+            db.session.query(AlteracaoTarefa.versao)
+            .filter(AlteracaoTarefa.usuario_id == usuario_id, removidas)
+            .order_by(AlteracaoTarefa.versao)
+            .offset(quantidade - maximo - 1)
+            .limit(1)
+            .scalar()
+        )
+        cortes[usuario_id] = max(cortes.get(usuario_id, 0), versao_corte)
+
+    total = 0
+    for usuario_id, versao_corte in cortes.items():
+        total += db.session.execute(
+            db.delete(AlteracaoTarefa)
+            .where(AlteracaoTarefa.usuario_id == usuario_id, removidas, AlteracaoTarefa.versao <= versao_corte)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.execute(
+            db.update(Usuario)
+            .where(Usuario.id == usuario_id, Usuario.versao_compactada < versao_corte)
+            .values(versao_compactada=versao_corte)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return total
+
+def agendar_compactacao_alteracoes():
+    """Executa compactar_log_alteracoes em uma thread de fundo, se nenhuma estiver em andamento."""
+    if not lock_compactacao.acquire(blocking=False):
+        return
+
+    def executar():
+        try:
+            with app.app_context():
+                total = compactar_log_alteracoes()
+            logger.info(f"Compactação do log de alterações concluída: {total} tombstones removidos.")
+        except Exception as e:
+            logger.error(f"Erro na compactação do log de alterações: {str(e)}")
+        finally:
+            lock_compactacao.release()
+
+    threading.Thread(target=executar, name='compactacao-alteracoes', daemon=True).start()
+
+def agendar_reconciliacao_contadores():
+    """Executa reconciliar_contadores_tarefas em uma thread de fundo, se nenhuma estiver em andamento."""
+    if not lock_reconciliacao.acquire(blocking=False):
+        return
+
+    def executar():
+        try:
+            with app.app_context():
+                corrigidos = reconciliar_contadores_tarefas()
+            if corrigidos:
+                logger.warning(f"Reconciliação dos contadores de tarefas: {corrigidos} contadores divergentes corrigidos.")
+        except Exception as e:
+            logger.error(f"Erro na reconciliação dos contadores de tarefas: {str(e)}")
+        finally:
+            lock_reconciliacao.release()
+
+    threading.Thread(target=executar, name='reconciliacao-contadores', daemon=True).start()
+
+@app.cli.command('compactar-alteracoes')
+def comando_compactar_alteracoes():
+    """Compacta o log de alterações de tarefas (tombstones antigos ou em excesso)."""
+    total = compactar_log_alteracoes()
+    print(f"{total} tombstones removidos.")
+
+# Colunas copiadas entre 'tarefa' e 'tarefa_arquivada' (as duas têm as mesmas)
+COLUNAS_ARQUIVAMENTO = (
+    'id, titulo, descricao, data_vencimento, prioridade, projeto_id, status, '
+    'data_criacao, data_conclusao, usuario_id, serie_id, ocorrencia, versao'
+)
+# Copia um lote de candidatas para o arquivo, das concluídas há mais tempo, pelo índice parcial
+# ix_tarefa_concluidas_conclusao. Os ids de 'tarefa' são AUTOINCREMENT, então o de uma tarefa
+# arquivada não volta a ser dado a uma tarefa nova.
+COMANDO_ARQUIVAR_TAREFAS = db.text(
+    f"INSERT INTO tarefa_arquivada ({COLUNAS_ARQUIVAMENTO}, data_arquivamento) "
+    f"SELECT {COLUNAS_ARQUIVAMENTO}, :agora FROM tarefa "
+    f"WHERE status = 'concluido' AND data_conclusao < :data_limite "
+    f"AND NOT EXISTS (SELECT 1 FROM tarefa_arquivada WHERE tarefa_arquivada.id = tarefa.id) "
+    f"ORDER BY data_conclusao LIMIT :lote "
+    f"RETURNING id, usuario_id"
+)
+
+def arquivar_tarefas_concluidas():
+    """
+    Move para 'tarefa_arquivada' as tarefas concluídas há mais de ARQUIVAMENTO_DIAS, em lotes
+    de ARQUIVAMENTO_LOTE, uma transação por lote. Cada lote é copiado e removido do quadro na
+    mesma transação; os gatilhos de remoção atualizam a busca textual e as exceções das
+    séries (a ocorrência arquivada não volta a ser gerada), os contadores ficam como estavam
+    (a remoção do quadro e a inserção no arquivo se anulam), e as tarefas entram
+    no log de alterações como removidas, com o evento 'arquivada'.
+    Retorna a quantidade de tarefas arquivadas.
+    """
+    dias = app.config['ARQUIVAMENTO_DIAS']
+    if not dias:
+        return 0
+    data_limite = (datetime.utcnow() - timedelta(days=dias)).strftime(FORMATO_DATA_SQLITE)
+    lote = app.config['ARQUIVAMENTO_LOTE']
+    total = 0
+    while True:
+        arquivadas = db.session.execute(COMANDO_ARQUIVAR_TAREFAS, {
+            'agora': datetime.utcnow().strftime(FORMATO_DATA_SQLITE), 'data_limite': data_limite, 'lote': lote
+        }).all()
+        ids_por_usuario = {}
+        for task_id, usuario_id in arquivadas:
+            ids_por_usuario.setdefault(usuario_id, []).append(task_id)
+        ids = [task_id for task_id, _ in arquivadas]
+        for inicio in range(0, len(ids), TAMANHO_BLOCO_SQL):
+            db.session.execute(
+                db.delete(Tarefa)
+                .where(Tarefa.id.in_(ids[inicio:inicio + TAMANHO_BLOCO_SQL]))
+                .execution_options(synchronize_session=False)
+            )
+        for usuario_id, ids_usuario in ids_por_usuario.items():
+            registrar_alteracao_tarefas(usuario_id, removidas=ids_usuario, evento='arquivada')
+        db.session.commit()
+        total += len(arquivadas)
+        if len(arquivadas) < lote:
+            break
+    if total:
+        metricas.incrementar('techflow_tarefas_arquivadas_total', valor=total)
+    return total
+
+def agendar_arquivamento_tarefas():
+    """Executa arquivar_tarefas_concluidas em uma thread de fundo, se nenhuma estiver em andamento."""
+    if not lock_arquivamento.acquire(blocking=False):
+        return
+
+    def executar():
+        try:
+            with app.app_context():
+                total = arquivar_tarefas_concluidas()
+            logger.info(f"Arquivamento de tarefas concluído: {total} tarefas arquivadas.")
+        except Exception as e:
+            logger.error(f"Erro no arquivamento de tarefas: {str(e)}")
+        finally:
+            lock_arquivamento.release()
+
+    threading.Thread(target=executar, name='arquivamento-tarefas', daemon=True).start()
+
+@app.cli.command('arquivar-tarefas')
+def comando_arquivar_tarefas():
+    """Arquiva as tarefas concluídas há mais de ARQUIVAMENTO_DIAS (para execução periódica, ex.: cron)."""
+    total = arquivar_tarefas_concluidas()
+    print(f"{total} tarefas arquivadas.")
+
+TIPOS_NOTIFICACAO = ['vence_em_breve', 'atrasada']
+# Tarefas abertas com vencimento depois do marco (data_vencimento, id) e antes do fim da janela,
+# pelo índice ix_tarefa_status_vencimento: duas varreduras de intervalo, uma por status aberto.
+# A janela é aberta no fim: o marco seguinte (fim, 0) começa nas tarefas que vencem exatamente nele.
+COMANDO_TAREFAS_JANELA_VENCIMENTO = db.text(
+    "SELECT id, usuario_id, titulo, data_vencimento FROM tarefa "
+    "WHERE status IN ('a fazer', 'fazendo') "
+    "AND data_vencimento >= :de AND (data_vencimento > :de OR id > :ultimo_id) AND data_vencimento < :ate "
+    "ORDER BY data_vencimento, id LIMIT :lote"
+)
+
+def verificar_vencimentos(agora=None):
+    """
+    Uma verificação do agendador de lembretes: para cada tipo de aviso, lê as tarefas abertas
+    cujo vencimento cruzou o limite desde o marco anterior ('vence_em_breve': vence antes de
+    agora + LEMBRETES_ANTECEDENCIA_HORAS; 'atrasada': venceu antes de agora -
+    LEMBRETES_ATRASO_APOS_HORAS), grava uma notificação para cada uma e avança o marco.
+    O custo é proporcional às tarefas que venceram na janela, não ao tamanho da tabela.
+    Lotes de LEMBRETES_LOTE tarefas, uma transação por lote.
+
+    Recuperação após uma parada: o marco de cada tipo continua de onde parou, em lotes, mas
+    o 'vence_em_breve' pula as tarefas que já ficaram atrasadas (recebem só o aviso
+    'atrasada'), e atrasos mais antigos que LEMBRETES_RECUPERACAO_MAXIMA_DIAS são ignorados.
+    Na primeira execução os marcos começam no instante atual, sem avisos das tarefas que já
+    estavam atrasadas. Retorna as notificações criadas por tipo.
+    """
+    agora = agora or datetime.utcnow()
+    fins = {
+        'vence_em_breve': agora + timedelta(hours=app.config['LEMBRETES_ANTECEDENCIA_HORAS']),
+        'atrasada': agora - timedelta(hours=app.config['LEMBRETES_ATRASO_APOS_HORAS'])
+    }
+    inicios_minimos = {
+        'vence_em_breve': fins['atrasada'],
+        'atrasada': fins['atrasada'] - timedelta(days=app.config['LEMBRETES_RECUPERACAO_MAXIMA_DIAS'])
+    }
+    lote = app.config['LEMBRETES_LOTE']
+    criadas = dict.fromkeys(TIPOS_NOTIFICACAO, 0)
+
+    db.session.execute(sqlite_insert(MarcoLembretes).on_conflict_do_nothing(), [
+        {'tipo': 'vence_em_breve', 'verificado_ate': agora, 'ultimo_id': 0},
+        {'tipo': 'atrasada', 'verificado_ate': fins['atrasada'], 'ultimo_id': 0}
+    ])
+    db.session.commit()
+
+    for tipo in TIPOS_NOTIFICACAO:
+        ate = fins[tipo].strftime(FORMATO_DATA_SQLITE)
+        while True:
+            marco = db.session.get(MarcoLembretes, tipo, populate_existing=True)
+            de, ultimo_id = marco.verificado_ate, marco.ultimo_id
+            inicio_janela = max(de, inicios_minimos[tipo])
+            if inicio_janela > de:
+                de_janela, ultimo_id_janela = inicio_janela.strftime(FORMATO_DATA_SQLITE), 0
+            else:
+                de_janela, ultimo_id_janela = de.strftime(FORMATO_DATA_SQLITE), ultimo_id
+            if de_janela >= ate:
+                db.session.rollback()
+                break
+
+            tarefas = db.session.execute(COMANDO_TAREFAS_JANELA_VENCIMENTO, {
+                'de': de_janela, 'ultimo_id': ultimo_id_janela, 'ate': ate, 'lote': lote
+            }).all()
+            completa = len(tarefas) < lote
+            if completa:
+                novo_marco = {'verificado_ate': fins[tipo], 'ultimo_id': 0}
+            else:
+                novo_marco = {
+                    'verificado_ate': datetime.strptime(tarefas[-1].data_vencimento, FORMATO_DATA_SQLITE),
+                    'ultimo_id': tarefas[-1].id
+                }
+            # Reivindica a janela: se outro processo já avançou o marco, desiste desta
+            reivindicada = db.session.execute(
+                db.update(MarcoLembretes)
+                .where(MarcoLembretes.tipo == tipo, MarcoLembretes.verificado_ate == de, MarcoLembretes.ultimo_id == ultimo_id)
+                .values(**novo_marco)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not reivindicada:
+                db.session.rollback()
+                break
+            if tarefas:
+                criadas[tipo] += len(db.session.execute(sqlite_insert(Notificacao).on_conflict_do_nothing().returning(Notificacao.id), [
+                    {
+                        'usuario_id': tarefa.usuario_id, 'tarefa_id': tarefa.id, 'tipo': tipo, 'titulo': tarefa.titulo,
+                        'data_vencimento': datetime.strptime(tarefa.data_vencimento, FORMATO_DATA_SQLITE),
+                        'data_criacao': agora, 'lida': False
+                    }
+                    for tarefa in tarefas
+                ]).all())
+            db.session.commit()
+            if completa:
+                break
+
+    for tipo, quantidade in criadas.items():
+        if quantidade:
+            metricas.incrementar('techflow_notificacoes_criadas_total', (('tipo', tipo),), quantidade)
+    return criadas
+
+def iniciar_agendador_lembretes():
+    """
+    Inicia a thread de fundo que executa verificar_vencimentos a cada LEMBRETES_INTERVALO_SEGUNDOS
+    (a primeira logo ao iniciar, recuperando o que venceu com o servidor parado). Uma por processo;
+    com vários workers, os marcos condicionais evitam que a mesma janela seja processada duas vezes.
+    Threads não sobrevivem ao fork, então o processo que a iniciou é guardado: um worker criado
+    por fork (ex.: gunicorn --preload) inicia a sua na primeira requisição.
+    """
+    intervalo = app.config['LEMBRETES_INTERVALO_SEGUNDOS']
+
+    def executar():
+        while True:
+            try:
+                with app.app_context(), metricas.cronometrar('techflow_lembretes_verificacao_segundos'):
+                    criadas = verificar_vencimentos()
+                if any(criadas.values()):
+                    logger.info("Verificação de vencimentos: %s notificações criadas (%s).", sum(criadas.values()), criadas)
+            except Exception as e:
+                logger.error(f"Erro na verificação de vencimentos: {str(e)}")
+            if parada_lembretes.wait(intervalo):
+                return
+
+    with lock_lembretes:
+        if agendador_lembretes['pid'] == os.getpid():
+            return
+        agendador_lembretes['pid'] = os.getpid()
+        agendador_lembretes['thread'] = None
+        if not app.config['LEMBRETES_ATIVO']:
+            logger.warning(
+                "Agendador de lembretes desativado (TECHFLOW_LEMBRETES_ATIVO=0): nenhuma notificação de vencimento "
+                "será criada por este processo. Use 'flask --app backend/app.py verificar-vencimentos' (ex.: cron)."
+            )
+            return
+        thread = threading.Thread(target=executar, name='agendador-lembretes', daemon=True)
+        thread.start()
+        agendador_lembretes['thread'] = thread
+    logger.info("Agendador de lembretes iniciado no processo %s.", os.getpid())
+
+def agendador_lembretes_rodando():
+    """Se a thread do agendador de lembretes está viva neste processo."""
+    thread = agendador_lembretes['thread']
+    return agendador_lembretes['pid'] == os.getpid() and thread is not None and thread.is_alive()
+
+@app.before_request
+def garantir_agendador_lembretes():
+    """
+    Inicia o agendador de lembretes na primeira requisição de cada processo. Quem atende
+    requisições é o worker: o mestre do gunicorn --preload (cuja thread não passaria ao fork)
+    e o processo vigia do recarregador do modo de depuração não ficam com uma thread.
+    """
+    if agendador_lembretes['pid'] != os.getpid():
+        iniciar_agendador_lembretes()
+
+@app.cli.command('verificar-vencimentos')
+def comando_verificar_vencimentos():
+    """Executa uma verificação de vencimentos e cria as notificações (sem o agendador, ex.: cron)."""
+    criadas = verificar_vencimentos()
+    print(f"{sum(criadas.values())} notificações criadas: {criadas}.")
+
+def obter_versao_tarefas(usuario_id):
+    """Lê a versão atual do quadro de tarefas do usuário (consulta pela chave primária)."""
+    return db.session.query(Usuario.versao_tarefas).filter(Usuario.id == usuario_id).scalar() or 0
+
+class CacheQuadros:
+    """
+    Cache LRU, limitado em bytes, das respostas JSON já serializadas de GET /tasks.
+    Cada entrada guarda a versão do quadro em que foi gerada (com o dia, em GET /tasks) e só
+    é servida enquanto essa versão for a atual, então nenhuma alteração precisa invalidar o cache.
+    """
+    def __init__(self, bytes_maximos):
+        self.bytes_maximos = bytes_maximos
+        self.bytes_usados = 0
+        self.entradas = OrderedDict() # chave -> (versao, corpo)
+        self.lock = threading.Lock()
+
+    def obter(self, chave, versao):
+        with self.lock:
+            entrada = self.entradas.get(chave)
+            if entrada is None or entrada[0] != versao:
+                return None
+            self.entradas.move_to_end(chave)
+            return entrada[1]
+
+    def guardar(self, chave, versao, corpo):
+        if len(corpo) > self.bytes_maximos:
+            return
+        with self.lock:
+            anterior = self.entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes_usados -= len(anterior[1])
+            self.entradas[chave] = (versao, corpo)
+            self.bytes_usados += len(corpo)
+            while self.bytes_usados > self.bytes_maximos:
+                _, (_, removido) = self.entradas.popitem(last=False)
+                self.bytes_usados -= len(removido)
+
+cache_quadros = CacheQuadros(app.config['QUADRO_CACHE_BYTES'])
+
+def resposta_quadro(corpo, etag, status=200):
+    """Monta a resposta de GET /tasks com ETag e revalidação obrigatória no cliente."""
+    resposta = app.response_class(corpo, status=status, mimetype=app.json.mimetype)
+    resposta.set_etag(etag)
+    resposta.headers['X-Versao-Tarefas'] = etag.rsplit('-', 1)[1] # Ponto de partida para GET /tasks/changes
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    resposta.vary.add('Authorization')
+    return resposta
+
+def codificar_cursor(data_vencimento, task_id):
+    """
+    Gera o cursor opaco da paginação por chave (data_vencimento, id) de GET /tasks
+    (ou (data_conclusao, id) de GET /tasks/archive).
+    """
+    bruto = f"{data_vencimento.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor):
+    """
+    Converte um cursor gerado por codificar_cursor de volta para (data_vencimento, id).
+    Lança ValueError se o cursor estiver malformado.
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento).decode('utf-8')
+        data_texto, id_texto = bruto.split('|')
+        return datetime.fromisoformat(data_texto), int(id_texto)
+    except Exception:
+        raise ValueError('Cursor inválido')
+
+# Serialização rápida das listas de tarefas (GET /tasks, GET /tasks/changes): as tarefas são
+# lidas como tuplas de colunas, sem objetos ORM, com as datas no texto em que o SQLite as guarda,
+# e cada linha é escrita direto em JSON. A saída é idêntica byte a byte à de jsonify sobre
+# to_dict(): chaves em ordem alfabética, separadores compactos e ensure_ascii.
+codificar_texto_json = json.encoder.encode_basestring_ascii # Mesmo codificador em C usado por json.dumps
+COLUNAS_JSON_TAREFA = ( # Na ordem alfabética das chaves de to_dict()
+    db.type_coerce(Tarefa.data_conclusao, db.String).label('data_conclusao'),
+    db.type_coerce(Tarefa.data_criacao, db.String).label('data_criacao'),
+    db.type_coerce(Tarefa.data_vencimento, db.String).label('data_vencimento'),
+    Tarefa.descricao,
+    Tarefa.id,
+    Tarefa.prioridade,
+    # Nome do projeto por busca na chave primária de 'projeto', correlacionada à linha da tarefa
+    db.select(Projeto.nome).where(Projeto.id == Tarefa.projeto_id).scalar_subquery().label('projeto'),
+    Tarefa.projeto_id,
+    Tarefa.serie_id,
+    Tarefa.status,
+    Tarefa.titulo,
+    Tarefa.usuario_id,
+    Tarefa.versao
+)
+
+def data_iso(valor):
+    """Converte a data como guardada pelo SQLite ('AAAA-MM-DD HH:MM:SS.ffffff') no formato de datetime.isoformat()."""
+    if valor is None:
+        return None
+    if len(valor) == 26 and valor[10] == ' ' and valor[19] == '.':
+        return valor[:10] + 'T' + valor[11:19] + ('' if valor[20:] == '000000' else valor[19:])
+    return datetime.fromisoformat(valor).isoformat() # Formatos gravados fora do SQLAlchemy
+
+def texto_json(valor):
+    return 'null' if valor is None else codificar_texto_json(valor)
+
+def data_json(valor):
+    return 'null' if valor is None else f'"{data_iso(valor)}"'
+
+def tarefa_json(linha):
+    """Serializa uma linha de COLUNAS_JSON_TAREFA como o JSON de to_dict()."""
+    conclusao, criacao, vencimento, descricao, task_id, prioridade, projeto, projeto_id, serie_id, status, titulo, usuario_id, versao = linha
+    return (
+        f'{{"data_conclusao":{data_json(conclusao)},"data_criacao":{data_json(criacao)},'
+        f'"data_vencimento":{data_json(vencimento)},"descricao":{texto_json(descricao)},"id":{task_id},'
+        f'"prioridade":{texto_json(prioridade)},"projeto":{texto_json(projeto)},'
+        f'"projeto_id":{"null" if projeto_id is None else projeto_id},'
+        f'"serie_id":{"null" if serie_id is None else serie_id},"status":{texto_json(status)},'
+        f'"titulo":{texto_json(titulo)},"usuario_id":{usuario_id},"versao":{versao}}}'
+    )
+
+def ocorrencia_json(linha):
+    """Serializa uma ocorrência virtual (de ocorrencias_virtuais): como uma tarefa, com id e versao null."""
+    _, criacao, vencimento, descricao, _, prioridade, projeto, projeto_id, serie_id, status, titulo, usuario_id, _ = linha
+    return (
+        f'{{"data_conclusao":null,"data_criacao":{data_json(criacao)},'
+        f'"data_vencimento":{data_json(vencimento)},"descricao":{texto_json(descricao)},"id":null,'
+        f'"prioridade":{texto_json(prioridade)},"projeto":{texto_json(projeto)},'
+        f'"projeto_id":{"null" if projeto_id is None else projeto_id},'
+        f'"serie_id":{serie_id},"status":{texto_json(status)},'
+        f'"titulo":{texto_json(titulo)},"usuario_id":{usuario_id},"versao":null}}'
+    )
+
+def lista_tarefas_json(linhas):
+    return '[' + ','.join(map(tarefa_json, linhas)) + ']'
+
+def lista_quadro_json(linhas):
+    """Como lista_tarefas_json, para listas com ocorrências virtuais (id negativo) misturadas."""
+    return '[' + ','.join(tarefa_json(linha) if linha[4] > 0 else ocorrencia_json(linha) for linha in linhas) + ']'
+
+def corpo_json(fragmentos):
+    """
+    Monta o corpo da resposta de um objeto cujos valores já estão serializados em JSON,
+    no mesmo formato de jsonify (chaves ordenadas e quebra de linha final).
+    """
+    corpo = '{' + ','.join(f'{codificar_texto_json(chave)}:{fragmentos[chave]}' for chave in sorted(fragmentos)) + '}'
+    if app.json.compact is False or (app.json.compact is None and app.debug):
+        # Modo de depuração: jsonify indenta a saída; reformata para manter o mesmo formato
+        return jsonify(json.loads(corpo)).get_data()
+    return (corpo + '\n').encode('ascii')
+
+def valor_json(valor):
+    """Serializa um valor comum (listas, dicionários, números) como jsonify no modo compacto."""
+    return json.dumps(valor, ensure_ascii=True, sort_keys=True, separators=(',', ':'))
+
+def validar_nova_tarefa(dados):
+    """
+    Valida os dados de criação de uma tarefa (regras de POST /tasks).
+    Retorna (valores, erro): 'valores' traz as colunas prontas para inserção
+    (exceto usuario_id) e 'erro' a mensagem de validação, se houver.
+    """
+    if not isinstance(dados, dict):
+        return None, 'Dados da tarefa ausentes ou em formato inválido.'
+
+    # Validação de campos obrigatórios
+    for campo in ['titulo', 'data_vencimento', 'prioridade']:
+        if campo not in dados or not dados[campo]:
+            return None, f'Campo obrigatório faltando ou vazio: {campo}'
+    if not isinstance(dados['titulo'], str) or not isinstance(dados.get('descricao') or '', str):
+        return None, 'Título e descrição devem ser texto.'
+
+    # Validação e conversão da data de vencimento
+    try:
+        data_vencimento = datetime.strptime(dados['data_vencimento'], '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return None, 'Formato de data de vencimento inválido. Use AAAA-MM-DD.'
+
+    # Validação da prioridade
+    if dados['prioridade'] not in PRIORIDADES_VALIDAS:
+        return None, 'Prioridade inválida. Use Baixa, Média ou Alta.'
+
+    # Validação do projeto (opcional): pelo nome ou pelo projeto_id
+    projeto, erro = validar_projeto_tarefa(dados)
+    if erro:
+        return None, erro
+
+    # Define o status inicial com base no checkbox 'concluida'
+    status_inicial = 'a fazer'
+    if dados.get('concluida') == True:
+        status_inicial = 'concluido'
+
+    return {
+        'titulo': dados['titulo'].strip(),
+        'descricao': (dados.get('descricao') or '').strip(),
+        'data_vencimento': data_vencimento,
+        'prioridade': dados['prioridade'],
+        'status': status_inicial,
+        **(projeto or {'projeto_id': None})
+    }, None
+
+def validar_tarefa_importada(dados):
+    """
+    Valida uma linha de POST /tasks/import com as regras de criação de tarefas e aceita também
+    os campos de um arquivo exportado: status, data_criacao e data_conclusao (ISO 8601).
+    A data de vencimento pode vir como AAAA-MM-DD ou no formato exportado (AAAA-MM-DDTHH:MM:SS).
+    Retorna (valores, erro) como validar_nova_tarefa.
+    """
+    if not isinstance(dados, dict):
+        return None, 'Cada linha deve ser um objeto JSON com os campos da tarefa.'
+    vencimento = dados.get('data_vencimento')
+    if isinstance(vencimento, str) and len(vencimento) > 10 and vencimento[10] == 'T':
+        dados = dict(dados, data_vencimento=vencimento[:10])
+
+    valores, erro = validar_nova_tarefa(dados)
+    if erro:
+        return None, erro
+
+    status = dados.get('status')
+    if status:
+        if status not in STATUS_VALIDOS:
+            return None, 'Status inválido fornecido.'
+        valores['status'] = status
+    for campo in ('data_criacao', 'data_conclusao'):
+        if dados.get(campo):
+            try:
+                valores[campo] = datetime.fromisoformat(dados[campo])
+            except (ValueError, TypeError):
+                return None, f'Formato de data inválido em {campo}. Use ISO 8601 (AAAA-MM-DDTHH:MM:SS).'
+    # A data de conclusão só existe para tarefas concluídas
+    if valores['status'] == 'concluido':
+        valores.setdefault('data_conclusao', datetime.utcnow())
+    else:
+        valores.pop('data_conclusao', None)
+    return valores, None
+
+def validar_atualizacao_tarefa(dados, status_atual):
+    """
+    Valida os dados de edição de uma tarefa (regras de PUT/PATCH /tasks/<id>).
+    Retorna (mudancas, erro): 'mudancas' contém apenas as colunas que devem ser alteradas.
+    """
+    if not isinstance(dados, dict):
+        return None, 'Dados da tarefa ausentes ou em formato inválido.'
+
+    mudancas = {}
+    # Atualiza os campos se eles estiverem presentes nos dados
+    if 'titulo' in dados and dados['titulo']:
+        if not isinstance(dados['titulo'], str):
+            return None, 'Título e descrição devem ser texto.'
+        mudancas['titulo'] = dados['titulo'].strip()
+    if 'descricao' in dados: # Permite descrição vazia
+        if not isinstance(dados['descricao'] or '', str):
+            return None, 'Título e descrição devem ser texto.'
+        mudancas['descricao'] = (dados['descricao'] or '').strip()
+    if 'data_vencimento' in dados and dados['data_vencimento']:
+        try:
+            mudancas['data_vencimento'] = datetime.strptime(dados['data_vencimento'], '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None, 'Formato de data de vencimento inválido. Use AAAA-MM-DD.'
+    if 'prioridade' in dados and dados['prioridade']:
+        if dados['prioridade'] not in PRIORIDADES_VALIDAS:
+            return None, 'Prioridade inválida. Use Baixa, Média ou Alta.'
+        mudancas['prioridade'] = dados['prioridade']
+    projeto, erro = validar_projeto_tarefa(dados) # Permite projeto vazio/nulo
+    if erro:
+        return None, erro
+    mudancas.update(projeto)
+
+    # Lógica para atualização de status (se vier no payload de edição)
+    # Isso é diferente do PATCH de drag-and-drop que só muda o status
+    if 'concluida' in dados:
+        if dados['concluida'] == True and status_atual != 'concluido':
+            mudancas['status'] = 'concluido'
+            mudancas['data_conclusao'] = datetime.utcnow()
+        elif dados['concluida'] == False and status_atual == 'concluido':
+            mudancas['status'] = 'a fazer' # Ou 'fazendo', dependendo da lógica
+            mudancas['data_conclusao'] = None
+
+    return mudancas, None
+
+def erro_status_na_edicao(task_id):
+    """Mensagem do 400 da edição de tarefa (PUT/PATCH /tasks/<id> e 'atualizar' do lote) com 'status' no corpo."""
+    return f'Para mudar o status da tarefa, use PATCH /tasks/{task_id}/status com {{"status": ..., "versao": N}}.'
+
+def validar_mudanca_status(novo_status, status_atual):
+    """
+    Valida a mudança de status de uma tarefa (regras do drag-and-drop do quadro).
+    Retorna (mudancas, erro), ajustando data_conclusao quando a tarefa entra ou sai de 'concluido'.
+    """
+    if not novo_status or novo_status not in STATUS_VALIDOS:
+        return None, 'Status inválido fornecido.'
+
+    mudancas = {'status': novo_status}
+    # Atualiza a data de conclusão se o status mudar para 'concluido'
+    if novo_status == 'concluido' and status_atual != 'concluido':
+        mudancas['data_conclusao'] = datetime.utcnow()
+    # Remove a data de conclusão se o status mudar de 'concluido' para outro
+    elif novo_status != 'concluido' and status_atual == 'concluido':
+        mudancas['data_conclusao'] = None
+    return mudancas, None
+
+def validar_projeto_tarefa(dados):
+    """
+    Valida o projeto de uma tarefa: pelo nome ('projeto', que tem precedência) ou pelo
+    'projeto_id'. Nome vazio ou nulo retira o projeto. Retorna (valores, erro), com
+    {'projeto': nome} ou {'projeto_id': id ou None} (ou {} se nenhum dos campos veio),
+    para resolver_projeto trocar o nome pelo id.
+    """
+    if 'projeto' in dados:
+        nome = dados['projeto']
+        if nome is not None and not isinstance(nome, str):
+            return None, 'O projeto deve ser informado pelo nome (texto).'
+        nome = (nome or '').strip()
+        if len(nome) > TAMANHO_NOME_PROJETO:
+            return None, f'O nome do projeto deve ter no máximo {TAMANHO_NOME_PROJETO} caracteres.'
+        return ({'projeto': nome} if nome else {'projeto_id': None}), None
+    if 'projeto_id' in dados:
+        if dados['projeto_id'] is not None and type(dados['projeto_id']) is not int:
+            return None, 'projeto_id deve ser um inteiro.'
+        return {'projeto_id': dados['projeto_id']}, None
+    return {}, None
+
+def carregar_projetos(usuario_id):
+    """Mapa nome -> id dos projetos do usuário (uma varredura do índice único (usuario_id, nome))."""
+    return dict(db.session.query(Projeto.nome, Projeto.id).filter(Projeto.usuario_id == usuario_id))
+
+def resolver_projeto(usuario_id, valores, projetos=None):
+    """
+    Troca, em 'valores' (de validar_projeto_tarefa), o nome do projeto pelo projeto_id, criando
+    o projeto na primeira vez que o nome aparece, e confere que um projeto_id informado é do
+    usuário. 'projetos' é o mapa de carregar_projetos (rotas com várias tarefas carregam uma vez
+    e reaproveitam); ele recebe os projetos criados. Retorna a mensagem de erro, se houver.
+    """
+    if 'projeto' not in valores and valores.get('projeto_id') is None:
+        return None
+    if projetos is None:
+        projetos = carregar_projetos(usuario_id)
+    if 'projeto' in valores:
+        nome = valores.pop('projeto')
+        if nome not in projetos:
+            # Upsert: se o nome já existe com outra grafia (NOCASE) ou foi criado por outra
+            # requisição, retorna o id do existente sem alterá-lo
+            comando = sqlite_insert(Projeto).values(usuario_id=usuario_id, nome=nome, data_criacao=datetime.utcnow())
+            projetos[nome] = db.session.execute(comando.on_conflict_do_update(
+                index_elements=['usuario_id', 'nome'], set_={'cor': Projeto.cor}
+            ).returning(Projeto.id)).scalar_one()
+        valores['projeto_id'] = projetos[nome]
+    elif valores['projeto_id'] not in projetos.values():
+        return 'Projeto não encontrado ou não pertence ao usuário.'
+    return None
+
+def validar_nova_serie(dados):
+    """
+    Valida os dados de criação de uma série recorrente (regras de POST /tasks/series): os campos
+    de uma tarefa (data_vencimento é a primeira ocorrência) e o objeto 'recorrencia', com
+    frequencia ('diaria', 'semanal' ou 'mensal'), intervalo (padrão 1) e, opcionalmente,
+    data_fim (AAAA-MM-DD, inclusiva) e/ou quantidade de ocorrências.
+    Retorna (valores, erro) como validar_nova_tarefa.
+    """
+    valores, erro = validar_nova_tarefa(dados)
+    if erro:
+        return None, erro
+    recorrencia = dados.get('recorrencia')
+    if not isinstance(recorrencia, dict):
+        return None, 'Campo obrigatório faltando ou vazio: recorrencia'
+
+    frequencia = recorrencia.get('frequencia')
+    if frequencia not in FREQUENCIAS_RECORRENCIA:
+        return None, 'Frequência inválida. Use diaria, semanal ou mensal.'
+    intervalo = recorrencia.get('intervalo', 1)
+    if type(intervalo) is not int or not 1 <= intervalo <= RECORRENCIA_INTERVALO_MAXIMO:
+        return None, f'Intervalo deve ser um inteiro entre 1 e {RECORRENCIA_INTERVALO_MAXIMO}.'
+    data_fim = recorrencia.get('data_fim')
+    if data_fim:
+        try:
+            data_fim = datetime.strptime(data_fim, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None, 'Formato de data de fim inválido. Use AAAA-MM-DD.'
+        if data_fim < valores['data_vencimento']:
+            return None, 'A data de fim deve ser igual ou posterior à primeira ocorrência.'
+    quantidade = recorrencia.get('quantidade')
+    if quantidade is not None and (type(quantidade) is not int or quantidade < 1):
+        return None, 'Quantidade de ocorrências deve ser um inteiro positivo.'
+
+    return {
+        'titulo': valores['titulo'],
+        'descricao': valores['descricao'],
+        'prioridade': valores['prioridade'],
+        **{campo: valores[campo] for campo in ('projeto', 'projeto_id') if campo in valores},
+        'frequencia': frequencia,
+        'intervalo': intervalo,
+        'data_inicio': valores['data_vencimento'],
+        'data_fim': data_fim or None,
+        'quantidade': quantidade
+    }, None
+
+def data_ocorrencia(serie, indice):
+    """Data da ocorrência de número 'indice' (a partir de 0) da série."""
+    inicio = serie.data_inicio
+    if serie.frequencia == 'mensal':
+        # Dias 29-31 caem no último dia dos meses mais curtos
+        meses = inicio.month - 1 + indice * serie.intervalo
+        ano, mes = inicio.year + meses // 12, meses % 12 + 1
+        return inicio.replace(year=ano, month=mes, day=min(inicio.day, calendar.monthrange(ano, mes)[1]))
+    dias = 7 if serie.frequencia == 'semanal' else 1
+    return inicio + timedelta(days=indice * serie.intervalo * dias)
+
+def ocorrencias_serie(serie, inicio, fim):
+    """
+    Datas das ocorrências da série no intervalo [inicio, fim), em ordem. O índice da primeira
+    ocorrência da janela é calculado diretamente, sem percorrer as anteriores: o custo depende
+    só do tamanho da janela, não de há quanto tempo a série existe.
+    """
+    if serie.frequencia == 'mensal':
+        meses = (inicio.year - serie.data_inicio.year) * 12 + inicio.month - serie.data_inicio.month
+        indice = max(0, meses // serie.intervalo)
+    else:
+        passo = serie.intervalo * (7 if serie.frequencia == 'semanal' else 1)
+        indice = max(0, (inicio - serie.data_inicio).days // passo)
+    datas = []
+    while serie.quantidade is None or indice < serie.quantidade:
+        try:
+            data = data_ocorrencia(serie, indice)
+        except (ValueError, OverflowError): # Além do ano 9999
+            break
+        if data >= fim or (serie.data_fim is not None and data > serie.data_fim):
+            break
+        if data >= inicio:
+            datas.append(data)
+        indice += 1
+    return datas
+
+def ocorrencias_virtuais(usuario_id, inicio, fim, prioridade=None, filtrar_projeto=False, projeto_id=None):
+    """
+    Ocorrências das séries do usuário no intervalo [inicio, fim) que não estão materializadas
+    nem foram removidas, como linhas no formato de COLUNAS_JSON_TAREFA com status 'a fazer'
+    e id = -serie_id. O id negativo é único por (vencimento, série) e ordena as ocorrências
+    junto das tarefas na paginação por chave (data_vencimento, id) de GET /tasks.
+    """
+    consulta = SerieTarefa.query.filter(
+        SerieTarefa.usuario_id == usuario_id,
+        SerieTarefa.data_inicio < fim,
+        db.or_(SerieTarefa.data_fim.is_(None), SerieTarefa.data_fim >= inicio)
+    )
+    if prioridade:
+        consulta = consulta.filter(SerieTarefa.prioridade == prioridade)
+    if filtrar_projeto:
+        consulta = consulta.filter(SerieTarefa.projeto_id == projeto_id)
+    series = consulta.all()
+    if not series:
+        return []
+
+    ocupadas = set() # (serie_id, ocorrencia) materializadas ou removidas dentro da janela
+    for i in range(0, len(series), TAMANHO_BLOCO_SQL):
+        ids = [serie.id for serie in series[i:i + TAMANHO_BLOCO_SQL]]
+        for modelo in (Tarefa, ExcecaoSerie):
+            ocupadas.update(db.session.query(modelo.serie_id, modelo.ocorrencia).filter(
+                modelo.serie_id.in_(ids), modelo.ocorrencia >= inicio, modelo.ocorrencia < fim
+            ).all())
+
+    linhas = []
+    for serie in series:
+        criacao = serie.data_criacao.strftime(FORMATO_DATA_SQLITE)
+        for data in ocorrencias_serie(serie, inicio, fim):
+            if (serie.id, data) not in ocupadas:
+                linhas.append((
+                    None, criacao, data.strftime(FORMATO_DATA_SQLITE), serie.descricao, -serie.id,
+                    serie.prioridade, serie.projeto.nome if serie.projeto else None, serie.projeto_id,
+                    serie.id, 'a fazer', serie.titulo, usuario_id, None
+                ))
+    return linhas
+
+# =============================================
+# PIPELINE DE ARQUIVOS ESTÁTICOS
+# =============================================
+TIPOS_COMPRIMIVEIS = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+REFERENCIA_ESTATICA = re.compile(r'/frontend/static/([^"\'()\s?#]+)')
+
+class PipelineAssets:
+    """
+    Carrega os arquivos do frontend para a memória no primeiro uso:
+    - cada arquivo estático recebe um nome versionado pelo hash do conteúdo
+      (css/inicial.css -> css/inicial.<hash>.css), servido com cache imutável de longa duração;
+    - as referências a /frontend/static/ nos templates HTML (e no CSS) são reescritas para os nomes versionados;
+    - textos ganham variantes gzip e, com o pacote brotli instalado, br.
+    As respostas saem do manifesto em memória, sem acessar o sistema de arquivos por requisição.
+    """
+    def __init__(self, pasta_estaticos, pasta_templates):
+        self.pasta_estaticos = pasta_estaticos
+        self.pasta_templates = pasta_templates
+        self.lock = threading.Lock()
+        self.lock_construcao = threading.Lock()
+        self.construido = False # O manifesto é montado na primeira página ou arquivo pedido
+        self.brotli = None
+
+    def garantir_construido(self, recarregar=False):
+        if self.construido and not recarregar:
+            return
+        with self.lock_construcao:
+            if not self.construido or recarregar:
+                self.construir()
+
+    def construir(self):
+        try:
+            import brotli # Opcional ('pip install brotli'): variantes .br dos arquivos estáticos
+            self.brotli = brotli
+        except ImportError:
+            self.brotli = None
+        versionados = {} # nome lógico -> nome versionado
+        arquivos = {} # nome versionado (ou do template) -> entrada
+        nomes = []
+        for raiz, _, arquivos_pasta in os.walk(self.pasta_estaticos):
+            for arquivo in arquivos_pasta:
+                nomes.append(os.path.relpath(os.path.join(raiz, arquivo), self.pasta_estaticos).replace(os.sep, '/'))
+        # CSS por último: o conteúdo reescrito (e o hash) depende dos nomes versionados dos demais
+        for nome in sorted(nomes, key=lambda nome: (nome.endswith('.css'), nome)):
+            with open(os.path.join(self.pasta_estaticos, nome), 'rb') as arquivo:
+                conteudo = arquivo.read()
+            if nome.endswith('.css'):
+                conteudo = self.reescrever_referencias(conteudo, versionados)
+            resumo = hashlib.sha256(conteudo).hexdigest()[:12]
+            base, extensao = os.path.splitext(nome)
+            versionados[nome] = f'{base}.{resumo}{extensao}'
+            arquivos[versionados[nome]] = self.criar_entrada(nome, conteudo, resumo)
+
+        paginas = {}
+        for nome in os.listdir(self.pasta_templates):
+            if nome.endswith('.html'):
+                with open(os.path.join(self.pasta_templates, nome), 'rb') as arquivo:
+                    conteudo = self.reescrever_referencias(arquivo.read(), versionados)
+                paginas[nome] = self.criar_entrada(nome, conteudo, hashlib.sha256(conteudo).hexdigest()[:12])
+
+        with self.lock:
+            self.versionados = versionados
+            self.arquivos = arquivos
+            self.paginas = paginas
+            self.construido = True
+        logger.info(f"Pipeline de assets: {len(arquivos)} arquivos estáticos e {len(paginas)} páginas carregados (brotli {'ativo' if self.brotli else 'indisponível'}).")
+
+    def reescrever_referencias(self, conteudo, versionados):
+        def substituir(correspondencia):
+            nome = unquote(correspondencia.group(1))
+            if nome not in versionados:
+                return correspondencia.group(0)
+            return '/frontend/static/' + quote(versionados[nome])
+        return REFERENCIA_ESTATICA.sub(substituir, conteudo.decode('utf-8')).encode('utf-8')
+
+    def criar_entrada(self, nome, conteudo, resumo):
+        """Conteúdo e variantes comprimidas (só as que ficam menores) de um arquivo."""
+        import gzip
+        import mimetypes
+        mimetype = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+        variantes = {'identity': conteudo}
+        if mimetype.startswith(TIPOS_COMPRIMIVEIS):
+            comprimidos = {'gzip': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+            if self.brotli is not None:
+                comprimidos['br'] = self.brotli.compress(conteudo, quality=11)
+            for codificacao, dados in comprimidos.items():
+                if len(dados) < len(conteudo) * 0.9:
+                    variantes[codificacao] = dados
+        return {'mimetype': mimetype, 'etag': resumo, 'variantes': variantes}
+
+    def responder(self, entrada, cache_control):
+        """Escolhe a variante pelo Accept-Encoding (br > gzip > identity) e monta a resposta."""
+        codificacao = 'identity'
+        qualidade = 0
+        for candidata in ('br', 'gzip'):
+            if candidata in entrada['variantes'] and request.accept_encodings[candidata] > qualidade:
+                codificacao, qualidade = candidata, request.accept_encodings[candidata]
+        etag = entrada['etag'] if codificacao == 'identity' else f"{entrada['etag']}-{codificacao}"
+        if request.if_none_match.contains(etag):
+            resposta = app.response_class(status=304)
+        else:
+            resposta = app.response_class(entrada['variantes'][codificacao], mimetype=entrada['mimetype'])
+            if codificacao != 'identity':
+                resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = cache_control
+        if len(entrada['variantes']) > 1:
+            resposta.vary.add('Accept-Encoding')
+        return resposta
+
+    def servir_pagina(self, nome):
+        self.garantir_construido(recarregar=app.config['ASSETS_RECARREGAR'])
+        entrada = self.paginas.get(nome)
+        if entrada is None:
+            abort(404)
+        # O HTML é sempre revalidado (ETag), para que nomes versionados novos sejam vistos após um deploy
+        return self.responder(entrada, 'no-cache')
+
+    def servir_estatico(self, nome):
+        self.garantir_construido()
+        entrada = self.arquivos.get(nome)
+        if entrada is not None:
+            return self.responder(entrada, f"public, max-age={app.config['ASSETS_CACHE_SEGUNDOS']}, immutable")
+        # Nome sem versão (links antigos ou scripts externos): conteúdo atual, com revalidação
+        versionado = self.versionados.get(nome)
+        if versionado is None:
+            abort(404)
+        return self.responder(self.arquivos[versionado], 'no-cache')
+
+pipeline_assets = PipelineAssets(app.static_folder, app.template_folder)
+
+# =============================================
+# ROTAS PARA SERVIR ARQUIVOS DO FRONTEND (HTML, CSS, JS, IMAGENS)
+# =============================================
+@app.route('/')
+def index():
+    """Rota raiz que serve a página de login."""
+    return pipeline_assets.servir_pagina('login.html')
+
+@app.route('/login.html')
+def serve_login():
+    """Rota para servir a página de login."""
+    return pipeline_assets.servir_pagina('login.html')
+
+@app.route('/teladecadastro.html')
+def serve_cadastro_html():
+    """Rota para servir a página de cadastro de usuário."""
+    return pipeline_assets.servir_pagina('teladecadastro.html')
+
+@app.route('/frontend/templates/inicial.html')
+def serve_inicial_html():
+    """Rota para servir a página inicial (principal) do aplicativo To-Do List."""
+    return pipeline_assets.servir_pagina('inicial.html')
+
+# NOVA ROTA ADICIONADA/AJUSTADA PARA CRIARTAREFA.HTML
+@app.route('/frontend/templates/criartarefa.html')
+def serve_criar_tarefa_html():
+    """Rota para servir a página de criação de tarefas (criartarefa.html)."""
+    return pipeline_assets.servir_pagina('criartarefa.html')
+
+
+@app.route('/frontend/static/<path:filename>')
+def serve_static_files(filename):
+    """
+    Rota para servir arquivos estáticos (CSS, JS, imagens) do frontend.
+    O 'path:filename' permite que esta rota capture qualquer subcaminho após '/frontend/static/'.
+    Nomes versionados (referenciados pelas páginas) são servidos com cache imutável.
+    """
+    return pipeline_assets.servir_estatico(filename)
+
+# =============================================
+# ROTAS DE AUTENTICAÇÃO DE USUÁRIOS
+# =============================================
+@app.route('/cadastro', methods=['POST'])
+def cadastrar_usuario():
+    """
+    Rota para cadastrar um novo usuário.
+    Recebe nome, email, senha e confirmação de senha.
+    Retorna uma mensagem de sucesso e um token JWT para login automático.
+    """
+    try:
+        dados = request.get_json()
+
+        # Validação de campos obrigatórios
+        campos_obrigatorios = ['nome', 'email', 'senha', 'confirmarSenha']
+        for campo in campos_obrigatorios:
+            if campo not in dados or not dados[campo]:
+                return jsonify({'erro': f'Campo obrigatório faltando ou vazio: {campo}'}), 400
+
+        # Validações específicas do email e senha
+        if not validar_email(dados['email']):
+            return jsonify({'erro': 'Formato de email inválido'}), 400
+
+        if len(dados['senha']) < 8:
+            return jsonify({'erro': 'Senha deve ter pelo menos 8 caracteres'}), 400
+
+        if dados['senha'] != dados['confirmarSenha']:
+            return jsonify({'erro': 'As senhas não coincidem'}), 400
+
+        # Verifica se o email já está cadastrado no sistema
+        if Usuario.query.filter_by(email=dados['email'].lower()).first():
+            return jsonify({'erro': 'Email já cadastrado'}), 409 # Conflict
+
+        # Cria um novo objeto Usuario e faz o hash da senha
+        novo_usuario = Usuario(
+            nome=dados['nome'].strip(),
+            email=dados['email'].lower().strip(),
+            senha=pool_senhas.gerar_hash(dados['senha'])
+        )
+
+        db.session.add(novo_usuario)
+        db.session.commit()
+
+        # CORREÇÃO: Converte o ID do usuário para string antes de incluí-lo no token
+        token = jwt.encode({
+            'sub': str(novo_usuario.id), # <<< AQUI: ID do usuário como STRING
+            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+            'nome': novo_usuario.nome,
+            'email': novo_usuario.email
+        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+        logger.info("Usuário %s cadastrado com sucesso.", novo_usuario.email)
+        return jsonify({
+            'mensagem': 'Cadastro realizado com sucesso!',
+            'token': token,
+            'usuario': {
+                'id': novo_usuario.id,
+                'nome': novo_usuario.nome,
+                'email': novo_usuario.email
+            }
+        }), 201 # Created
+
+    except FilaHashCheiaError:
+        logger.warning("Cadastro recusado: pool de hash de senhas saturado.")
+        return resposta_servidor_ocupado()
+    except Exception as e:
+        logger.error(f"Erro no cadastro de usuário: {str(e)}")
+        db.session.rollback() # Desfaz a transação em caso de erro
+        return jsonify({'erro': 'Erro interno no servidor ao cadastrar usuário.'}), 500
+
+@app.route('/login', methods=['POST'])
+def login_usuario():
+    """
+    Rota para autenticar um usuário.
+    Recebe email e senha.
+    Retorna um token JWT se as credenciais forem válidas.
+    """
+    try:
+        dados = request.get_json()
+
+        # Validação básica de campos obrigatórios
+        if not dados or 'email' not in dados or 'senha' not in dados:
+            return jsonify({"erro": "Email e senha são obrigatórios"}), 400
+
+        # Busca o usuário pelo email no banco de dados
+        usuario = Usuario.query.filter_by(
+            email=dados['email'].lower().strip()
+        ).first()
+
+        # Verifica se o usuário existe e se a senha fornecida corresponde ao hash
+        if not usuario or not pool_senhas.verificar_hash(usuario.senha, dados['senha']):
+            return jsonify({"erro": "Credenciais inválidas"}), 401 # Unauthorized
+
+        # Refaz o hash de forma transparente se os parâmetros do scrypt mudaram
+        if pool_senhas.precisa_rehash(usuario.senha):
+            try:
+                usuario.senha = pool_senhas.gerar_hash(dados['senha'])
+                db.session.commit()
+                logger.info("Hash de senha do usuário %s atualizado para %s.", usuario.email, pool_senhas.metodo)
+            except FilaHashCheiaError:
+                pass # Tenta novamente em um próximo login
+            except Exception as e:
+                logger.error(f"Erro ao atualizar hash de senha do usuário {usuario.email}: {str(e)}")
+                db.session.rollback()
+
+        # CORREÇÃO: Converte o ID do usuário para string antes de incluí-lo no token
+        token = jwt.encode({
+            'sub': str(usuario.id), # <<< AQUI: ID do usuário como STRING
+            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES'], # Tempo de expiração
+            'nome': usuario.nome, # Adiciona o nome do usuário ao payload do token
+            'email': usuario.email # Permite a introspecção do token sem consultar o banco (GET /perfil?modo=token)
+        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+        logger.info("Usuário %s logado com sucesso.", usuario.email)
+        return jsonify({
+            "mensagem": "Login realizado com sucesso!",
+            "token": token,
+            "usuario": {
+                "id": usuario.id,
+                "nome": usuario.nome,
+                "email": usuario.email
+            }
+        }), 200 # OK
+
+    except FilaHashCheiaError:
+        logger.warning("Login recusado: pool de hash de senhas saturado.")
+        return resposta_servidor_ocupado()
+    except Exception as e:
+        logger.error(f"Erro no login de usuário: {str(e)}")
+        return jsonify({"erro": "Erro interno no servidor ao fazer login."}), 500
+
+@app.route('/logout', methods=['POST'])
+def logout_usuario():
+    """
+    Rota para fazer logout. Em sistemas baseados em token, o logout é
+    principalmente uma ação do lado do cliente (removendo o token do localStorage).
+    Esta rota serve como um endpoint de confirmação ou para futuras invalidações de token.
+    """
+    logger.info("Requisição de logout recebida.")
+    return jsonify({"mensagem": "Logout realizado com sucesso."}), 200
 
-        # Validações específicas do email e senha
-        if not validar_email(dados['email']):
-            return jsonify({'erro': 'Formato de email inválido'}), 400
+@app.route('/perfil', methods=['GET'])
+@jwt_required # Protege esta rota, exigindo um token JWT válido
+def perfil_usuario():
+    """
+    Rota protegida para obter os dados do perfil do usuário logado.
+    O ID do usuário é obtido do token JWT decodificado por jwt_required.
 
-        if len(dados['senha']) < 8:
-            return jsonify({'erro': 'Senha deve ter pelo menos 8 caracteres'}), 400
+    O perfil vem do cache de perfis (cache_perfis), que só consulta o banco na falta.
+    Com modo=token, a rota faz só a introspecção do token: responde com os claims já
+    verificados (id, nome, email e expiração), sem nenhum acesso ao banco. É o modo
+    usado para validar a sessão a cada página.
+    """
+    try:
+        if request.args.get('modo') == 'token':
+            claims = request.jwt_claims
+            return jsonify({
+                "ativo": True,
+                "id": request.user_id,
+                "nome": claims.get('nome'),
+                "email": claims.get('email'), # Ausente em tokens emitidos antes deste claim
+                "exp": claims.get('exp')
+            }), 200
 
-        if dados['senha'] != dados['confirmarSenha']:
-            return jsonify({'erro': 'As senhas não coincidem'}), 400
+        # O ID do usuário é acessado via request.user_id, definido pelo decorador jwt_required
+        perfil = cache_perfis.obter(request.user_id)
 
-        # Verifica se o email já está cadastrado no sistema
-        if Usuario.query.filter_by(email=dados['email'].lower()).first():
-            return jsonify({'erro': 'Email já cadastrado'}), 409 # Conflict
+        if not perfil:
+            logger.warning("Perfil solicitado para user_id %s não encontrado.", request.user_id)
+            return jsonify({"erro": "Usuário não encontrado"}), 404
 
-        # Cria um novo objeto Usuario e faz o hash da senha
-        novo_usuario = Usuario(
-            nome=dados['nome'].strip(),
-            email=dados['email'].lower().strip(),
-            senha=generate_password_hash(dados['senha'], method='scrypt')
+        logger.info("Perfil do usuário %s solicitado com sucesso.", perfil['email'])
+        return jsonify(perfil), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar perfil do usuário {request.user_id}: {str(e)}")
+        return jsonify({"erro": "Erro interno do servidor ao buscar perfil."}), 500
+
+# =============================================
+# ROTAS DE GERENCIAMENTO DE TAREFAS
+# =============================================
+@app.route('/tasks', methods=['POST'])
+@jwt_required # Protege esta rota, garantindo que apenas usuários logados podem criar tarefas
+def criar_tarefa():
+    """
+    Cria uma nova tarefa para o usuário logado.
+    Recebe título, descrição, data de vencimento, prioridade, projeto e status inicial.
+    """
+    try:
+        dados = request.get_json()
+
+        valores, erro = validar_nova_tarefa(dados)
+        if not erro:
+            erro = resolver_projeto(request.user_id, valores)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        nova_tarefa = Tarefa(
+            usuario_id=request.user_id, # Associa a tarefa ao usuário logado
+            **valores
         )
 
-        db.session.add(novo_usuario)
+        db.session.add(nova_tarefa)
+        db.session.flush() # Gera o id da tarefa para o log de alterações
+        registrar_alteracao_tarefas(request.user_id, alteradas=[nova_tarefa.id], evento='criada')
         db.session.commit()
 
-        # CORREÇÃO: Converte o ID do usuário para string antes de incluí-lo no token
-        token = jwt.encode({
-            'sub': str(novo_usuario.id), # <<< AQUI: ID do usuário como STRING
-            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES'],
-            'nome': novo_usuario.nome
-        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+        logger.info("Tarefa '%s' criada para o usuário %s.", nova_tarefa.titulo, request.user_id)
+        return jsonify({
+            'mensagem': 'Tarefa criada com sucesso!',
+            'tarefa': nova_tarefa.to_dict()
+        }), 201 # Created
+
+    except Exception as e:
+        logger.error(f"Erro ao criar tarefa para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao criar tarefa.'}), 500
+
+# Rota para obter uma tarefa específica por ID (para edição)
+@app.route('/tasks/<int:task_id>', methods=['GET'])
+@jwt_required
+def obter_tarefa_por_id(task_id):
+    """
+    Obtém os detalhes de uma tarefa específica do usuário logado.
+    """
+    try:
+        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+        if not tarefa:
+            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+        return jsonify(tarefa.to_dict()), 200
+    except Exception as e:
+        logger.error(f"Erro ao obter tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno do servidor ao obter tarefa.'}), 500
+
+
+# Rota para atualizar uma tarefa existente (para edição)
+@app.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
+@jwt_required
+def atualizar_tarefa(task_id):
+    """
+    Atualiza uma tarefa existente do usuário logado.
+    Pode ser usado para atualização completa (PUT) ou parcial (PATCH).
+    O status só muda por 'concluida' (formulário de edição); {"status": ...} é recusado com 400,
+    em vez de ser ignorado, e deve ir para PATCH /tasks/<id>/status.
+    """
+    try:
+        dados = request.get_json()
+        if isinstance(dados, dict) and 'status' in dados:
+            return jsonify({'erro': erro_status_na_edicao(task_id)}), 400
+        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+
+        if not tarefa:
+            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+
+        status_anterior = tarefa.status
+        logger.debug("Atualizando tarefa %s. Dados recebidos: %s", task_id, dados)
+
+        mudancas, erro = validar_atualizacao_tarefa(dados, tarefa.status)
+        if not erro:
+            erro = resolver_projeto(request.user_id, mudancas)
+        if erro:
+            return jsonify({'erro': erro}), 400
+        for coluna, valor in mudancas.items():
+            setattr(tarefa, coluna, valor)
+
+        registrar_alteracao_tarefas(request.user_id, alteradas=[task_id], evento='atualizada')
+        db.session.commit() # <<< AQUI: Garante que as mudanças são salvas no banco de dados
+
+        logger.info("Tarefa %s atualizada pelo usuário %s. Status: '%s' -> '%s'.", task_id, request.user_id, status_anterior, tarefa.status)
+        return jsonify({'mensagem': 'Tarefa atualizada com sucesso!', 'tarefa': tarefa.to_dict()}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao atualizar tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao atualizar tarefa.'}), 500
+
+
+@app.route('/tasks', methods=['GET'])
+@jwt_required # Protege esta rota
+def listar_tarefas():
+    """
+    Lista as tarefas do usuário logado, agrupadas por status e ordenadas por data de vencimento.
+
+    Parâmetros opcionais de query string:
+    - status: restringe a resposta a uma coluna ('a fazer', 'fazendo' ou 'concluido')
+    - prioridade: filtro exato
+    - projeto_id ou projeto (nome): filtro por projeto; vazio filtra as tarefas sem projeto
+    - vencimento_de, vencimento_ate: intervalo de vencimento (AAAA-MM-DD, inclusivo)
+    - limite: tamanho máximo da página por status (ativa a paginação)
+    - cursor: continua a página de um status a partir do 'proximo_cursor' anterior (exige status)
+
+    Cada status é buscado com uma varredura limitada do índice
+    (usuario_id, status, data_vencimento, id), ou (usuario_id, projeto_id, status,
+    data_vencimento, id) com o filtro de projeto. Sem 'limite', todas as tarefas
+    filtradas são retornadas no formato original.
+
+    A coluna 'a fazer' inclui as ocorrências ainda não materializadas das séries recorrentes
+    (id null, com serie_id) que vencem na janela [vencimento_de ou hoje, vencimento_ate ou
+    RECORRENCIA_JANELA_PADRAO_DIAS depois), limitada a RECORRENCIA_JANELA_MAXIMA_DIAS.
+    """
+    try:
+        argumentos = request.args
+
+        status_pedido = argumentos.get('status')
+        if status_pedido is not None and status_pedido not in STATUS_VALIDOS:
+            return jsonify({'erro': 'Status inválido fornecido.'}), 400
+        status_listados = [status_pedido] if status_pedido else STATUS_VALIDOS
+
+        prioridade = argumentos.get('prioridade')
+        if prioridade is not None and prioridade not in PRIORIDADES_VALIDAS:
+            return jsonify({'erro': 'Prioridade inválida. Use Baixa, Média ou Alta.'}), 400
+
+        try:
+            vencimento_de = argumentos.get('vencimento_de')
+            if vencimento_de:
+                vencimento_de = datetime.strptime(vencimento_de, '%Y-%m-%d')
+            vencimento_ate = argumentos.get('vencimento_ate')
+            if vencimento_ate:
+                # Inclusivo: considera o dia inteiro informado
+                vencimento_ate = datetime.strptime(vencimento_ate, '%Y-%m-%d') + timedelta(days=1)
+        except ValueError:
+            return jsonify({'erro': 'Formato de data inválido. Use AAAA-MM-DD.'}), 400
+
+        limite = argumentos.get('limite')
+        if limite is not None:
+            try:
+                limite = int(limite)
+            except ValueError:
+                return jsonify({'erro': 'Limite inválido.'}), 400
+            if limite < 1 or limite > LIMITE_PAGINA_MAXIMO:
+                return jsonify({'erro': f'Limite deve estar entre 1 e {LIMITE_PAGINA_MAXIMO}.'}), 400
+
+        filtrar_projeto = 'projeto_id' in argumentos or 'projeto' in argumentos
+        projeto_id = None
+        if argumentos.get('projeto_id'):
+            try:
+                projeto_id = int(argumentos['projeto_id'])
+            except ValueError:
+                return jsonify({'erro': 'projeto_id inválido.'}), 400
+
+        cursor = argumentos.get('cursor')
+        if cursor:
+            if not status_pedido or limite is None:
+                return jsonify({'erro': 'O cursor exige os parâmetros status e limite.'}), 400
+            try:
+                cursor = decodificar_cursor(cursor)
+            except ValueError:
+                return jsonify({'erro': 'Cursor inválido.'}), 400
+
+        # A versão do quadro identifica o conteúdo: serve 304 ou o snapshot em cache
+        # sem consultar nem serializar as tarefas quando nada mudou. O dia entra no ETag
+        # e na versão do snapshot porque a janela padrão das ocorrências recorrentes começa hoje.
+        hoje = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        versao = obter_versao_tarefas(request.user_id)
+        etag = f"{request.user_id}-{hoje:%Y%m%d}-{versao}"
+        if request.if_none_match.contains(etag):
+            return resposta_quadro(b'', etag, status=304)
+        chave_cache = (request.user_id, request.query_string)
+        versao_cache = (versao, hoje)
+        corpo = cache_quadros.obter(chave_cache, versao_cache)
+        if corpo is not None:
+            return resposta_quadro(corpo, etag)
+
+        if 'projeto_id' not in argumentos and (argumentos.get('projeto') or '').strip():
+            # Nome pelo índice único (usuario_id, nome); um nome inexistente não casa com nenhuma tarefa
+            projeto_id = db.session.query(Projeto.id).filter(
+                Projeto.usuario_id == request.user_id, Projeto.nome == argumentos['projeto'].strip()
+            ).scalar() or 0
+
+        consulta_base = db.session.query(*COLUNAS_JSON_TAREFA).filter(Tarefa.usuario_id == request.user_id)
+        if prioridade:
+            consulta_base = consulta_base.filter(Tarefa.prioridade == prioridade)
+        if filtrar_projeto:
+            consulta_base = consulta_base.filter(Tarefa.projeto_id == projeto_id) # IS NULL quando vazio
+        if vencimento_de:
+            consulta_base = consulta_base.filter(Tarefa.data_vencimento >= vencimento_de)
+        if vencimento_ate:
+            consulta_base = consulta_base.filter(Tarefa.data_vencimento < vencimento_ate)
+
+        virtuais = []
+        if 'a fazer' in status_listados:
+            inicio_janela = vencimento_de or hoje
+            fim_janela = min(
+                vencimento_ate or inicio_janela + timedelta(days=RECORRENCIA_JANELA_PADRAO_DIAS),
+                inicio_janela + timedelta(days=RECORRENCIA_JANELA_MAXIMA_DIAS)
+            )
+            virtuais = ocorrencias_virtuais(
+                request.user_id, inicio_janela, fim_janela, prioridade, filtrar_projeto, projeto_id
+            )
+            if cursor:
+                chave_cursor = (cursor[0].strftime(FORMATO_DATA_SQLITE), cursor[1])
+                virtuais = [linha for linha in virtuais if (linha[2], linha[4]) > chave_cursor]
+
+        tarefas_por_status = {}
+        quantidades = {}
+        paginacao = {}
+        for status in status_listados:
+            consulta = consulta_base.filter(Tarefa.status == status)
+            if cursor:
+                consulta = consulta.filter(db.tuple_(Tarefa.data_vencimento, Tarefa.id) > cursor)
+            consulta = consulta.order_by(Tarefa.data_vencimento, Tarefa.id)
+
+            # Busca um item a mais para saber se existe uma próxima página
+            tarefas = consulta.all() if limite is None else consulta.limit(limite + 1).all()
+            if status == 'a fazer' and virtuais:
+                tarefas = sorted(tarefas + virtuais, key=lambda linha: (linha[2], linha[4]))
+            if limite is not None:
+                proximo_cursor = None
+                if len(tarefas) > limite:
+                    tarefas = tarefas[:limite]
+                    # Por posição: as ocorrências virtuais são tuplas simples (vencimento, id = -serie_id)
+                    proximo_cursor = codificar_cursor(datetime.fromisoformat(data_iso(tarefas[-1][2])), tarefas[-1][4])
+                paginacao[status] = {'limite': limite, 'proximo_cursor': proximo_cursor}
+
+            tarefas_por_status[status] = lista_quadro_json(tarefas) if status == 'a fazer' and virtuais else lista_tarefas_json(tarefas)
+            quantidades[status] = len(tarefas)
+
+        if limite is not None:
+            tarefas_por_status['paginacao'] = valor_json(paginacao)
+
+        logger.info("Tarefas listadas para o usuário %s. Quantidade: %s", request.user_id, quantidades)
+        corpo = corpo_json(tarefas_por_status)
+        cache_quadros.guardar(chave_cache, versao_cache, corpo)
+        return resposta_quadro(corpo, etag)
+
+    except Exception as e:
+        logger.error(f"Erro ao listar tarefas para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar tarefas.'}), 500
+
+# ... (código anterior permanece igual)
+
+@app.route('/tasks/<int:task_id>/status', methods=['PATCH'])
+@jwt_required
+def atualizar_status_tarefa(task_id):
+    """
+    Move uma tarefa de coluna no quadro (drag-and-drop). Corpo: {"status": ..., "versao": N}.
+
+    A mudança é um único UPDATE condicional (id, dono e, se informada, a versão lida pelo
+    cliente) que também ajusta data_conclusao no próprio SQL e incrementa a versão: sem SELECT
+    prévio nem objeto ORM, e o lock de escrita só é segurado durante o UPDATE e o commit.
+    Se outra aba ou dispositivo alterou a tarefa depois da leitura, nada é gravado e a
+    resposta é 409 com o status e a versão atuais, para o cliente refazer o movimento.
+    Responde só com id, status, data_conclusao e a nova versão.
+    """
+    try:
+        dados = request.get_json(silent=True)
+        if not isinstance(dados, dict):
+            return jsonify({'erro': 'Dados ausentes ou em formato inválido.'}), 400
+        novo_status = dados.get('status')
+        versao = dados.get('versao')
+
+        # Validação do novo status e da versão (opcional: sem ela, a última escrita prevalece)
+        if not novo_status or novo_status not in STATUS_VALIDOS:
+            return jsonify({'erro': 'Status inválido fornecido.'}), 400
+        if versao is not None and type(versao) is not int:
+            return jsonify({'erro': 'Versão inválida.'}), 400
+
+        condicoes = [Tarefa.id == task_id, Tarefa.usuario_id == request.user_id]
+        if versao is not None:
+            condicoes.append(Tarefa.versao == versao)
+        # Mesmas regras de validar_mudanca_status: a data de conclusão é preenchida ao entrar
+        # em 'concluido', mantida se a tarefa já estava concluída e limpa ao sair
+        data_conclusao = db.case(
+            (db.literal(novo_status) != 'concluido', db.null()),
+            (Tarefa.status == 'concluido', Tarefa.data_conclusao),
+            else_=db.literal(datetime.utcnow(), Tarefa.data_conclusao.type)
+        )
+        linha = db.session.execute(
+            db.update(Tarefa)
+            .where(*condicoes)
+            .values(status=novo_status, data_conclusao=data_conclusao, versao=Tarefa.versao + 1)
+            .returning(Tarefa.versao, db.type_coerce(Tarefa.data_conclusao, db.String))
+            .execution_options(synchronize_session=False)
+        ).first()
+
+        if linha is None:
+            db.session.rollback()
+            atual = (
+                db.session.query(Tarefa.status, Tarefa.versao)
+                .filter(Tarefa.id == task_id, Tarefa.usuario_id == request.user_id)
+                .first()
+            )
+            if not atual:
+                logger.warning("Tentativa de mover tarefa %s não encontrada ou não pertencente ao usuário %s.", task_id, request.user_id)
+                return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+            logger.info("Movimento da tarefa %s recusado (versão %s, atual %s).", task_id, versao, atual.versao)
+            return jsonify({
+                'erro': 'A tarefa foi alterada em outro lugar. Recarregue o quadro.',
+                'id': task_id,
+                'status': atual.status,
+                'versao': atual.versao
+            }), 409 # Conflict
+
+        registrar_alteracao_tarefas(request.user_id, alteradas=[task_id], evento='status')
+        db.session.commit()
+
+        logger.info("Status da tarefa %s alterado para '%s' pelo usuário %s.", task_id, novo_status, request.user_id)
+        return jsonify({'id': task_id, 'status': novo_status, 'data_conclusao': data_iso(linha[1]), 'versao': linha[0]}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao atualizar status da tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao atualizar tarefa.'}), 500
+
+@app.route('/tasks/<int:task_id>', methods=['DELETE'])
+@jwt_required # Protege esta rota
+def deletar_tarefa(task_id):
+    """
+    Deleta uma tarefa específica do usuário logado.
+    """
+    try:
+        # Busca a tarefa pelo ID e garante que ela pertence ao usuário logado
+        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+
+        if not tarefa:
+            logger.warning("Tentativa de deletar tarefa %s não encontrada ou não pertencente ao usuário %s.", task_id, request.user_id)
+            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+
+        db.session.delete(tarefa)
+        registrar_alteracao_tarefas(request.user_id, removidas=[task_id], evento='removida')
+        db.session.commit()
+
+        logger.info("Tarefa %s deletada pelo usuário %s.", task_id, request.user_id)
+        return jsonify({'mensagem': 'Tarefa deletada com sucesso!'}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao deletar tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao deletar tarefa.'}), 500
+
+def normalizar_palavra(palavra):
+    """Minúsculas e sem acentos, como o tokenizador unicode61 (remove_diacritics) do índice."""
+    return ''.join(c for c in unicodedata.normalize('NFKD', palavra.lower()) if not unicodedata.combining(c))
+
+def palavra_casa(palavra, termos, prefixo_final):
+    """Indica se a palavra (já normalizada) casa com algum termo; o último termo pode casar por prefixo."""
+    for posicao, termo in enumerate(termos):
+        if palavra == termo or (prefixo_final and posicao == len(termos) - 1 and palavra.startswith(termo)):
+            return True
+    return False
+
+def destacar_termos(texto, termos, prefixo_final, janela=None):
+    """
+    Envolve em <mark></mark> as palavras do texto que casam com os termos da busca.
+    Com 'janela', retorna só um trecho de até esse número de palavras em volta do
+    primeiro termo encontrado (com '…' nas pontas cortadas). O texto da tarefa é escapado
+    (html.escape): o resultado é HTML seguro, em que só as marcações <mark> são tags.
+    """
+    if not texto:
+        return texto
+    ocorrencias = list(re.finditer(r'\w+', texto))
+    if not ocorrencias:
+        return html.escape(texto)
+    inicio_trecho, fim_trecho = 0, len(ocorrencias)
+    if janela and len(ocorrencias) > janela:
+        primeira = next((i for i, o in enumerate(ocorrencias) if palavra_casa(normalizar_palavra(o.group()), termos, prefixo_final)), 0)
+        inicio_trecho = max(0, min(primeira - janela // 4, len(ocorrencias) - janela))
+        fim_trecho = inicio_trecho + janela
+
+    partes = []
+    cursor = ocorrencias[inicio_trecho].start() if inicio_trecho > 0 else 0
+    fim_texto = ocorrencias[fim_trecho - 1].end() if fim_trecho < len(ocorrencias) else len(texto)
+    for ocorrencia in ocorrencias[inicio_trecho:fim_trecho]:
+        if palavra_casa(normalizar_palavra(ocorrencia.group()), termos, prefixo_final):
+            partes.append(html.escape(texto[cursor:ocorrencia.start()]))
+            partes.append(f"<mark>{html.escape(ocorrencia.group())}</mark>")
+            cursor = ocorrencia.end()
+    partes.append(html.escape(texto[cursor:fim_texto]))
+    return ('…' if inicio_trecho > 0 else '') + ''.join(partes) + ('…' if fim_trecho < len(ocorrencias) else '')
+
+@app.route('/tasks/search', methods=['GET'])
+@jwt_required
+def buscar_tarefas():
+    """
+    Busca textual nas tarefas do usuário logado (título e descrição), via índice FTS5.
+    Parâmetros: q (todos os termos precisam aparecer; o último também casa por prefixo,
+    a menos que q termine com espaço), limite (padrão 20) e pagina (a partir de 1).
+
+    O índice FTS5 encontra todas as tarefas do usuário que casam e as ordena por relevância
+    (bm25() do FTS5, com peso maior para o título); a página é recortada no próprio SQL.
+    Cada resultado traz o título destacado e um trecho da descrição com os termos entre
+    <mark></mark>, em HTML escapado.
+    """
+    try:
+        if not busca_textual['disponivel']:
+            return jsonify({'erro': 'Busca textual indisponível neste servidor.'}), 501
+
+        consulta = request.args.get('q', '')
+        # Cada palavra vira um termo entre aspas: a sintaxe do FTS5 nunca é exposta ao
+        # usuário, então nenhuma entrada gera erro de consulta.
+        termos = [normalizar_palavra(termo) for termo in re.findall(r'\w+', consulta)[:10]]
+        if not termos:
+            return jsonify({'erro': 'Informe os termos da busca no parâmetro q.'}), 400
+        prefixo_final = not consulta[-1:].isspace()
+        try:
+            limite = int(request.args.get('limite', 20))
+            pagina = int(request.args.get('pagina', 1))
+        except ValueError:
+            return jsonify({'erro': 'Parâmetros limite e pagina devem ser inteiros.'}), 400
+        if limite < 1 or limite > LIMITE_BUSCA_MAXIMO or pagina < 1:
+            return jsonify({'erro': f'Limite deve estar entre 1 e {LIMITE_BUSCA_MAXIMO} e pagina deve ser positiva.'}), 400
 
-        logger.info(f"Usuário {novo_usuario.email} cadastrado com sucesso.")
+        # Termos exatos são buscas por chave no índice; só o último (digitação em andamento)
+        # usa prefixo, que obriga o FTS5 a combinar as listas de todos os termos com esse início.
+        expressao_termos = " ".join(
+            f'"{termo}"' + ('*' if prefixo_final and posicao == len(termos) - 1 else '')
+            for posicao, termo in enumerate(termos)
+        )
+        # bm25() é negativo (menor = mais relevante); busca um item a mais para saber se há outra página
+        pesos = ', '.join(str(peso) for peso in PESOS_BUSCA_BM25)
+        pagina_ranking = db.session.execute(db.text(
+            f"SELECT -bm25(tarefa_fts, {pesos}) AS relevancia, rowid FROM tarefa_fts WHERE tarefa_fts MATCH :expressao "
+            f"ORDER BY bm25(tarefa_fts, {pesos}), rowid DESC LIMIT :limite OFFSET :deslocamento"
+        ), {
+            'expressao': f"dono:u{request.user_id} AND {{titulo descricao}}: ({expressao_termos})",
+            'limite': limite + 1,
+            'deslocamento': (pagina - 1) * limite
+        }).all()
+        tem_mais = len(pagina_ranking) > limite
+        pagina_ranking = pagina_ranking[:limite]
+        tarefas = {
+            tarefa.id: tarefa for tarefa in
+            Tarefa.query.filter(Tarefa.usuario_id == request.user_id, Tarefa.id.in_([task_id for _, task_id in pagina_ranking]))
+        }
+        resultados = []
+        for relevancia, task_id in pagina_ranking:
+            tarefa = tarefas.get(task_id)
+            if tarefa is None:
+                continue
+            resultado = tarefa.to_dict()
+            resultado['relevancia'] = float(f'{relevancia:.4g}') # Termos muito comuns têm IDF (e relevância) próximo de zero
+            resultado['titulo_destacado'] = destacar_termos(tarefa.titulo, termos, prefixo_final)
+            resultado['trecho_descricao'] = destacar_termos(tarefa.descricao, termos, prefixo_final, janela=16)
+            resultados.append(resultado)
+
+        logger.info("Busca de tarefas para o usuário %s: %s resultados na página %s.", request.user_id, len(resultados), pagina)
+        return jsonify({'pagina': pagina, 'limite': limite, 'tem_mais': tem_mais, 'resultados': resultados}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar tarefas para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao buscar tarefas.'}), 500
+
+@app.route('/tasks/stats', methods=['GET'])
+@jwt_required
+def estatisticas_tarefas():
+    """
+    Estatísticas do quadro do usuário logado: totais por status, prioridade e projeto,
+    tarefas atrasadas e que vencem hoje, e o tempo médio até a conclusão. Os totais incluem
+    as tarefas arquivadas, como se ainda estivessem no quadro.
+    Lê só os contadores pré-calculados do usuário, sem consultar as tarefas.
+    """
+    try:
+        contadores = (
+            db.session.query(ContadorTarefa.dimensao, ContadorTarefa.valor, ContadorTarefa.quantidade, ContadorTarefa.soma_segundos)
+            .filter(ContadorTarefa.usuario_id == request.user_id, ContadorTarefa.quantidade != 0)
+            .all()
+        )
+        por_status = dict.fromkeys(STATUS_VALIDOS, 0)
+        por_prioridade = dict.fromkeys(PRIORIDADES_VALIDAS, 0)
+        por_projeto = {}
+        sem_projeto = 0
+        atrasadas = 0
+        vencem_hoje = 0
+        concluidas = 0
+        segundos_conclusao = 0.0
+        hoje = datetime.utcnow().date().isoformat()
+        for dimensao, valor, quantidade, soma_segundos in contadores:
+            if dimensao == 'status':
+                por_status[valor] = quantidade
+            elif dimensao == 'prioridade':
+                por_prioridade[valor] = quantidade
+            elif dimensao == 'projeto':
+                if valor:
+                    por_projeto[int(valor)] = quantidade
+                else:
+                    sem_projeto = quantidade
+            elif dimensao == 'vencimento_aberto':
+                if valor < hoje:
+                    atrasadas += quantidade
+                elif valor == hoje:
+                    vencem_hoje += quantidade
+            elif dimensao == 'conclusao':
+                concluidas = quantidade
+                segundos_conclusao = soma_segundos
+
+        if por_projeto:
+            # Os contadores guardam o projeto_id; a resposta continua por nome do projeto
+            nomes = {projeto_id: nome for nome, projeto_id in carregar_projetos(request.user_id).items()}
+            por_projeto = {nomes[projeto_id]: quantidade for projeto_id, quantidade in por_projeto.items() if projeto_id in nomes}
+
+        logger.info("Estatísticas de tarefas consultadas pelo usuário %s.", request.user_id)
         return jsonify({
-            'mensagem': 'Cadastro realizado com sucesso!',
-            'token': token,
-            'usuario': {
-                'id': novo_usuario.id,
-                'nome': novo_usuario.nome,
-                'email': novo_usuario.email
+            'total': sum(por_status.values()),
+            'por_status': por_status,
+            'por_prioridade': por_prioridade,
+            'por_projeto': por_projeto,
+            'sem_projeto': sem_projeto,
+            'atrasadas': atrasadas,
+            'vencem_hoje': vencem_hoje,
+            'conclusao': {
+                'concluidas': concluidas,
+                'tempo_medio_horas': round(segundos_conclusao / concluidas / 3600, 2) if concluidas else None
             }
-        }), 201 # Created
+        }), 200
 
     except Exception as e:
-        logger.error(f"Erro no cadastro de usuário: {str(e)}")
-        db.session.rollback() # Desfaz a transação em caso de erro
-        return jsonify({'erro': 'Erro interno no servidor ao cadastrar usuário.'}), 500
+        logger.error(f"Erro ao obter estatísticas de tarefas para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao obter estatísticas.'}), 500
+
+@app.route('/tasks/changes', methods=['GET'])
+@jwt_required
+def listar_alteracoes_tarefas():
+    """
+    Sincronização incremental do quadro: retorna as tarefas criadas, editadas ou com status
+    alterado e os ids das tarefas removidas desde a versão 'since' (lida do cabeçalho
+    X-Versao-Tarefas de GET /tasks ou do campo 'versao' de uma sincronização anterior).
+    Se os tombstones necessários já foram compactados, responde 410 e o cliente deve
+    recarregar o quadro completo com GET /tasks.
+    """
+    try:
+        try:
+            desde = int(request.args.get('since', ''))
+            if desde < 0:
+                raise ValueError()
+        except ValueError:
+            return jsonify({'erro': 'Parâmetro since obrigatório (versão inteira não negativa).'}), 400
+
+        versao_atual, versao_compactada = (
+            db.session.query(Usuario.versao_tarefas, Usuario.versao_compactada)
+            .filter(Usuario.id == request.user_id)
+            .one()
+        )
+        if desde < versao_compactada:
+            return jsonify({
+                'erro': 'Versão muito antiga para sincronização incremental. Recarregue o quadro.',
+                'versao': versao_atual
+            }), 410 # Gone
+
+        alteradas = []
+        removidas = []
+        if desde < versao_atual:
+            # Limita à versão lida acima: alterações posteriores ficam para a próxima sincronização
+            linhas = (
+                db.session.query(AlteracaoTarefa.tarefa_id, AlteracaoTarefa.tipo)
+                .filter(
+                    AlteracaoTarefa.usuario_id == request.user_id,
+                    AlteracaoTarefa.versao > desde,
+                    AlteracaoTarefa.versao <= versao_atual
+                )
+                .all()
+            )
+            ids_alterados = [tarefa_id for tarefa_id, tipo in linhas if tipo == 'alterada']
+            removidas = [tarefa_id for tarefa_id, tipo in linhas if tipo == 'removida']
+            for inicio in range(0, len(ids_alterados), TAMANHO_BLOCO_SQL):
+                bloco = ids_alterados[inicio:inicio + TAMANHO_BLOCO_SQL]
+                alteradas.extend(
+                    db.session.query(*COLUNAS_JSON_TAREFA)
+                    .filter(Tarefa.usuario_id == request.user_id, Tarefa.id.in_(bloco))
+                )
+
+        logger.info("Sincronização incremental para o usuário %s: versão %s -> %s, %s alteradas, %s removidas.", request.user_id, desde, versao_atual, len(alteradas), len(removidas))
+        corpo = corpo_json({
+            'versao': valor_json(versao_atual),
+            'alteradas': lista_tarefas_json(alteradas),
+            'removidas': valor_json(removidas)
+        })
+        return app.response_class(corpo, status=200, mimetype=app.json.mimetype)
+
+    except Exception as e:
+        logger.error(f"Erro ao listar alterações de tarefas para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar alterações de tarefas.'}), 500
+
+@app.route('/tasks/events/ticket', methods=['POST'])
+@jwt_required
+def emitir_ticket_eventos():
+    """
+    Emite um ticket de curta duração para abrir GET /tasks/events?ticket=..., de modo que o
+    token de sessão não precise ir na URL (onde ficaria em logs de acesso e no histórico).
+    O ticket é um JWT com o claim 'finalidade' = 'eventos': só é aceito por GET /tasks/events
+    e vale por EVENTOS_TICKET_SEGUNDOS; uma reconexão após esse prazo pede um ticket novo.
+    """
+    validade = app.config['EVENTOS_TICKET_SEGUNDOS']
+    ticket = jwt.encode({
+        'sub': str(request.user_id),
+        'finalidade': FINALIDADE_TICKET_EVENTOS,
+        'exp': datetime.utcnow() + timedelta(seconds=validade)
+    }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    return jsonify({'ticket': ticket, 'expira_em_segundos': validade}), 201
+
+@app.route('/tasks/events', methods=['GET'])
+def transmitir_eventos_tarefas():
+    """
+    Canal Server-Sent Events com os eventos de tarefas do usuário logado (criada, atualizada,
+    status, removida e lote). Cada evento traz a nova versão do quadro e os ids afetados.
+    Como EventSource não envia cabeçalhos, a conexão é autenticada pelo parâmetro 'ticket'
+    da URL, obtido em POST /tasks/events/ticket (o cabeçalho Authorization também é aceito).
+    O primeiro evento, 'conectado', informa a versão atual; o evento 'reiniciar' indica que
+    a conexão foi descartada por lentidão e o cliente deve sincronizar via GET /tasks/changes.
+    """
+    erro = autenticar_requisicao(aceitar_ticket_eventos=True) or limitar_taxa_usuario()
+    if erro:
+        return erro
+
+    usuario_id = request.user_id
+    versao = obter_versao_tarefas(usuario_id)
+    fila = canal_eventos.assinar(usuario_id)
+    if fila is None:
+        logger.warning("Conexão de eventos recusada para o usuário %s: limite de assinantes atingido.", usuario_id)
+        resposta = jsonify({'erro': 'Servidor ocupado. Tente novamente em instantes.'})
+        resposta.headers['Retry-After'] = str(app.config['EVENTOS_HEARTBEAT_SEGUNDOS'])
+        return resposta, 503
+    intervalo_heartbeat = app.config['EVENTOS_HEARTBEAT_SEGUNDOS']
+
+    def gerar_eventos():
+        try:
+            yield f"retry: 5000\nid: {versao}\nevent: conectado\ndata: {json.dumps({'versao': versao})}\n\n"
+            while True:
+                try:
+                    evento = fila.get(timeout=intervalo_heartbeat)
+                except queue.Empty:
+                    # Mantém a conexão viva e detecta clientes que já desconectaram
+                    yield ": heartbeat\n\n"
+                    continue
+                if evento is None:
+                    yield "event: reiniciar\ndata: {}\n\n"
+                    return
+                yield f"id: {evento['versao']}\nevent: {evento['evento']}\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+        finally:
+            canal_eventos.cancelar(usuario_id, fila)
+
+    logger.info("Conexão de eventos aberta para o usuário %s (versão %s).", usuario_id, versao)
+    return app.response_class(gerar_eventos(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no' # Evita que proxies reversos acumulem o stream
+    })
 
-@app.route('/login', methods=['POST'])
-def login_usuario():
+@app.route('/tasks/batch', methods=['POST'])
+@jwt_required
+def processar_lote_tarefas():
     """
-    Rota para autenticar um usuário.
-    Recebe email e senha.
-    Retorna um token JWT se as credenciais forem válidas.
+    Aplica uma lista de operações mistas sobre as tarefas do usuário logado em uma única transação.
+
+    Corpo esperado:
+        {"operacoes": [
+            {"op": "criar", "dados": {...}},
+            {"op": "atualizar", "id": 1, "dados": {...}},
+            {"op": "status", "id": 1, "status": "fazendo"},
+            {"op": "deletar", "id": 1}
+        ]}
+
+    Cada operação é validada com as mesmas regras das rotas individuais. As operações válidas
+    são aplicadas com INSERT/UPDATE/DELETE em massa e um único commit, e o resultado é
+    informado por item, na mesma ordem do pedido.
     """
     try:
-        dados = request.get_json()
+        dados = request.get_json(silent=True)
+        operacoes = dados.get('operacoes') if isinstance(dados, dict) else None
+        if not isinstance(operacoes, list) or not operacoes:
+            return jsonify({'erro': 'Envie uma lista não vazia de operações em "operacoes".'}), 400
+        if len(operacoes) > LIMITE_LOTE_MAXIMO:
+            return jsonify({'erro': f'O lote aceita no máximo {LIMITE_LOTE_MAXIMO} operações.'}), 400
 
-        # Validação básica de campos obrigatórios
-        if not dados or 'email' not in dados or 'senha' not in dados:
-            return jsonify({"erro": "Email e senha são obrigatórios"}), 400
+        # 1) Carrega de uma vez o status atual das tarefas referenciadas (e confirma o dono)
+        ids_referenciados = list({
+            operacao['id'] for operacao in operacoes
+            if isinstance(operacao, dict) and type(operacao.get('id')) is int
+        })
+        status_atual = {}
+        for inicio in range(0, len(ids_referenciados), TAMANHO_BLOCO_SQL):
+            bloco = ids_referenciados[inicio:inicio + TAMANHO_BLOCO_SQL]
+            status_atual.update(
+                db.session.query(Tarefa.id, Tarefa.status)
+                .filter(Tarefa.usuario_id == request.user_id, Tarefa.id.in_(bloco))
+                .all()
+            )
 
-        # Busca o usuário pelo email no banco de dados
-        usuario = Usuario.query.filter_by(
-            email=dados['email'].lower().strip()
-        ).first()
+        # 2) Valida as operações em ordem, acumulando os comandos em massa
+        projetos = carregar_projetos(request.user_id)
+        resultados = []
+        insercoes = [] # (posição em resultados, valores)
+        atualizacoes = {} # id -> colunas alteradas, mescladas na ordem do lote
+        delecoes = []
+        for indice, operacao in enumerate(operacoes):
+            tipo = operacao.get('op') if isinstance(operacao, dict) else None
+            resultado = {'indice': indice, 'op': tipo}
+            resultados.append(resultado)
 
-        # Verifica se o usuário existe e se a senha fornecida corresponde ao hash
-        if not usuario or not check_password_hash(usuario.senha, dados['senha']):
-            return jsonify({"erro": "Credenciais inválidas"}), 401 # Unauthorized
+            if tipo not in ('criar', 'atualizar', 'status', 'deletar'):
+                resultado.update(codigo=400, erro='Operação inválida. Use criar, atualizar, status ou deletar.')
+                continue
 
-        # CORREÇÃO: Converte o ID do usuário para string antes de incluí-lo no token
-        token = jwt.encode({
-            'sub': str(usuario.id), # <<< AQUI: ID do usuário como STRING
-            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES'], # Tempo de expiração
-            'nome': usuario.nome # Adiciona o nome do usuário ao payload do token
-        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+            if tipo == 'criar':
+                valores, erro = validar_nova_tarefa(operacao.get('dados'))
+                if not erro:
+                    erro = resolver_projeto(request.user_id, valores, projetos)
+                if erro:
+                    resultado.update(codigo=400, erro=erro)
+                    continue
+                valores['usuario_id'] = request.user_id
+                insercoes.append((indice, valores))
+                resultado['codigo'] = 201
+                continue
+
+            task_id = operacao.get('id')
+            resultado['id'] = task_id
+            if type(task_id) is not int or task_id not in status_atual:
+                resultado.update(codigo=404, erro='Tarefa não encontrada ou não pertence ao usuário.')
+                continue
 
-        logger.info(f"Usuário {usuario.email} logado com sucesso.")
+            if tipo == 'deletar':
+                del status_atual[task_id]
+                atualizacoes.pop(task_id, None)
+                delecoes.append(task_id)
+                resultado['codigo'] = 200
+                continue
+
+            if tipo == 'atualizar':
+                dados_atualizacao = operacao.get('dados')
+                if isinstance(dados_atualizacao, dict) and 'status' in dados_atualizacao:
+                    resultado.update(codigo=400, erro=erro_status_na_edicao(task_id))
+                    continue
+                mudancas, erro = validar_atualizacao_tarefa(dados_atualizacao, status_atual[task_id])
+            else:
+                mudancas, erro = validar_mudanca_status(operacao.get('status'), status_atual[task_id])
+            if not erro:
+                erro = resolver_projeto(request.user_id, mudancas, projetos)
+            if erro:
+                resultado.update(codigo=400, erro=erro)
+                continue
+            if 'status' in mudancas:
+                status_atual[task_id] = mudancas['status']
+            atualizacoes.setdefault(task_id, {}).update(mudancas)
+            resultado['codigo'] = 200
+
+        # 3) Aplica tudo em uma única transação
+        novos_ids = []
+        if insercoes:
+            # INSERT de várias linhas por comando (insertmanyvalues). Sem coluna sentinela, o SQLite
+            # não garante a ordem do RETURNING, mas os ids AUTOINCREMENT crescem na ordem de inserção
+            # e a transação segura o lock de escrita: ordenados, seguem a ordem das operações.
+            novos_ids = sorted(db.session.scalars(
+                db.insert(Tarefa).returning(Tarefa.id),
+                [valores for _, valores in insercoes]
+            ).all())
+            for (indice, _), novo_id in zip(insercoes, novos_ids):
+                resultados[indice]['id'] = novo_id
+
+        # O UPDATE em massa por chave primária exige o mesmo conjunto de colunas em cada grupo.
+        # A versão é incrementada no próprio UPDATE, então o gatilho tarefa_versao não dispara.
+        grupos_atualizacao = {}
+        for task_id, mudancas in atualizacoes.items():
+            if mudancas:
+                grupos_atualizacao.setdefault(tuple(sorted(mudancas)), []).append(
+                    {'id_tarefa': task_id, **{f'novo_{coluna}': valor for coluna, valor in mudancas.items()}}
+                )
+        for colunas, parametros in grupos_atualizacao.items():
+            db.session.connection().execute(
+                db.update(Tarefa)
+                .where(Tarefa.id == db.bindparam('id_tarefa'))
+                .values(versao=Tarefa.versao + 1, **{coluna: db.bindparam(f'novo_{coluna}') for coluna in colunas}),
+                parametros
+            )
+
+        for inicio in range(0, len(delecoes), TAMANHO_BLOCO_SQL):
+            bloco = delecoes[inicio:inicio + TAMANHO_BLOCO_SQL]
+            db.session.execute(
+                db.delete(Tarefa)
+                .where(Tarefa.usuario_id == request.user_id, Tarefa.id.in_(bloco))
+                .execution_options(synchronize_session=False)
+            )
+
+        if insercoes or atualizacoes or delecoes:
+            registrar_alteracao_tarefas(request.user_id, alteradas=novos_ids + list(atualizacoes), removidas=delecoes, evento='lote')
+        db.session.commit()
+
+        aplicadas = sum(1 for resultado in resultados if 'erro' not in resultado)
+        logger.info("Lote de tarefas processado para o usuário %s: %s aplicadas, %s com erro.", request.user_id, aplicadas, len(resultados) - aplicadas)
         return jsonify({
-            "mensagem": "Login realizado com sucesso!",
-            "token": token,
-            "usuario": {
-                "id": usuario.id,
-                "nome": usuario.nome,
-                "email": usuario.email
-            }
-        }), 200 # OK
+            'mensagem': 'Lote processado.',
+            'aplicadas': aplicadas,
+            'falhas': len(resultados) - aplicadas,
+            'resultados': resultados
+        }), 200
 
     except Exception as e:
-        logger.error(f"Erro no login de usuário: {str(e)}")
-        return jsonify({"erro": "Erro interno no servidor ao fazer login."}), 500
+        logger.error(f"Erro ao processar lote de tarefas para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao processar lote de tarefas.'}), 500
 
-@app.route('/logout', methods=['POST'])
-def logout_usuario():
+@app.route('/tasks/export', methods=['GET'])
+@jwt_required
+def exportar_tarefas():
     """
-    Rota para fazer logout. Em sistemas baseados em token, o logout é
-    principalmente uma ação do lado do cliente (removendo o token do localStorage).
-    Esta rota serve como um endpoint de confirmação ou para futuras invalidações de token.
+    Exporta todas as tarefas do usuário logado como NDJSON (padrão, um objeto de to_dict() por linha)
+    ou CSV (parâmetro formato=csv), em ordem de status e vencimento.
+    A resposta é gerada aos poucos (transferência em chunks): as tarefas são lidas em blocos de
+    TAMANHO_BLOCO_EXPORTACAO pela paginação por chave do índice do quadro, e a conexão volta ao
+    pool entre os blocos, então nem a memória nem os locks de leitura crescem com o tamanho da exportação.
     """
-    logger.info("Requisição de logout recebida.")
-    return jsonify({"mensagem": "Logout realizado com sucesso."}), 200
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({'erro': 'Formato inválido. Use ndjson ou csv.'}), 400
+    import csv
+    usuario_id = request.user_id
 
-@app.route('/perfil', methods=['GET'])
-@jwt_required # Protege esta rota, exigindo um token JWT válido
-def perfil_usuario():
+    def blocos_de_tarefas():
+        for status in STATUS_VALIDOS:
+            cursor = None
+            while True:
+                consulta = db.session.query(*COLUNAS_JSON_TAREFA).filter(Tarefa.usuario_id == usuario_id, Tarefa.status == status)
+                if cursor:
+                    consulta = consulta.filter(db.tuple_(Tarefa.data_vencimento, Tarefa.id) > cursor)
+                linhas = consulta.order_by(Tarefa.data_vencimento, Tarefa.id).limit(TAMANHO_BLOCO_EXPORTACAO).all()
+                db.session.rollback() # Encerra a leitura e devolve a conexão enquanto o bloco é enviado
+                if not linhas:
+                    break
+                yield linhas
+                cursor = (datetime.fromisoformat(data_iso(linhas[-1].data_vencimento)), linhas[-1].id)
+
+    def gerar_ndjson():
+        for linhas in blocos_de_tarefas():
+            yield ''.join(tarefa_json(linha) + '\n' for linha in linhas)
+
+    def gerar_csv():
+        saida = io.StringIO()
+        escritor = csv.writer(saida)
+        escritor.writerow(CAMPOS_EXPORTACAO)
+        for linhas in blocos_de_tarefas():
+            for linha in linhas:
+                valores = linha._mapping
+                escritor.writerow([
+                    data_iso(valores[campo]) if campo.startswith('data_') else valores[campo]
+                    for campo in CAMPOS_EXPORTACAO
+                ])
+            yield saida.getvalue()
+            saida.seek(0)
+            saida.truncate()
+        if saida.tell():
+            yield saida.getvalue()
+
+    def gerar():
+        total = 0
+        try:
+            for bloco in (gerar_csv() if formato == 'csv' else gerar_ndjson()):
+                total += 1
+                yield bloco
+            logger.info("Exportação %s concluída para o usuário %s (%s blocos).", formato, usuario_id, total)
+        except Exception as e:
+            # O status 200 já foi enviado: o cliente percebe a falha pela conexão interrompida
+            logger.error(f"Erro ao exportar tarefas do usuário {usuario_id}: {str(e)}")
+            raise
+
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    resposta = app.response_class(stream_with_context(gerar()), mimetype=mimetype)
+    resposta.headers['Content-Disposition'] = f'attachment; filename=tarefas.{formato}'
+    return resposta
+
+@app.route('/tasks/import', methods=['POST'])
+@jwt_required
+def importar_tarefas():
     """
-    Rota protegida para obter os dados do perfil do usuário logado.
-    O ID do usuário é obtido do token JWT decodificado por jwt_required.
+    Importa tarefas para o usuário logado a partir do corpo da requisição, em NDJSON (um objeto
+    por linha) ou CSV com cabeçalho (formato=csv ou Content-Type text/csv), como gerados por
+    GET /tasks/export. O corpo é lido incrementalmente; cada linha é validada com as regras de
+    criação de tarefas e as válidas são inseridas em transações de TAMANHO_LOTE_IMPORTACAO.
+    Os erros por linha são informados no final (os MAX_ERROS_IMPORTACAO primeiros em detalhe).
     """
+    formato = request.args.get('formato') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({'erro': 'Formato inválido. Use ndjson ou csv.'}), 400
+    import csv
+
+    importadas = 0
+    falhas = 0
+    erros = []
+    lote = []
+    projetos = None
+
+    def registrar_erro(numero_linha, mensagem):
+        nonlocal falhas
+        falhas += 1
+        if len(erros) < MAX_ERROS_IMPORTACAO:
+            erros.append({'linha': numero_linha, 'erro': mensagem})
+
+    def gravar_lote():
+        nonlocal importadas
+        # A ordem dos ids não importa aqui: sem sort_by_parameter_order o INSERT em massa é mais barato
+        novos_ids = db.session.scalars(db.insert(Tarefa).returning(Tarefa.id), lote).all()
+        registrar_alteracao_tarefas(request.user_id, alteradas=novos_ids, evento='lote')
+        db.session.commit()
+        importadas += len(novos_ids)
+        lote.clear()
+
     try:
-        # O ID do usuário é acessado via request.user_id, definido pelo decorador jwt_required
-        usuario = Usuario.query.get(request.user_id)
+        texto = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+        if formato == 'csv':
+            # Linha 1 é o cabeçalho; campos vazios equivalem a campos ausentes
+            leitor = csv.DictReader(texto)
+            linhas = (
+                (leitor.line_num, {campo: valor for campo, valor in registro.items() if campo and valor != ''})
+                for registro in leitor
+            )
+        else:
+            linhas = ((numero, linha) for numero, linha in enumerate(texto, start=1) if linha.strip())
 
-        if not usuario:
-            logger.warning(f"Perfil solicitado para user_id {request.user_id} não encontrado.")
-            return jsonify({"erro": "Usuário não encontrado"}), 404
+        try:
+            for numero_linha, registro in linhas:
+                if formato == 'ndjson':
+                    try:
+                        registro = json.loads(registro)
+                    except ValueError:
+                        registrar_erro(numero_linha, 'JSON inválido.')
+                        continue
+                valores, erro = validar_tarefa_importada(registro)
+                if not erro:
+                    if projetos is None:
+                        projetos = carregar_projetos(request.user_id)
+                    erro = resolver_projeto(request.user_id, valores, projetos)
+                if erro:
+                    registrar_erro(numero_linha, erro)
+                    continue
+                valores['usuario_id'] = request.user_id
+                lote.append(valores)
+                if len(lote) >= TAMANHO_LOTE_IMPORTACAO:
+                    gravar_lote()
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Arquivo corrompido: o que já foi lido é gravado e a importação para aqui
+            registrar_erro(None, f'Arquivo mal formado, importação interrompida: {str(e)}')
+        if lote:
+            gravar_lote()
 
-        logger.info(f"Perfil do usuário {usuario.email} solicitado com sucesso.")
+        logger.info("Importação %s para o usuário %s: %s tarefas importadas, %s linhas com erro.", formato, request.user_id, importadas, falhas)
         return jsonify({
-            "id": usuario.id,
-            "nome": usuario.nome,
-            "email": usuario.email
+            'mensagem': 'Importação concluída.',
+            'importadas': importadas,
+            'falhas': falhas,
+            'erros': erros,
+            'erros_omitidos': falhas - len(erros)
         }), 200
 
     except Exception as e:
-        logger.error(f"Erro ao buscar perfil do usuário {request.user_id}: {str(e)}")
-        return jsonify({"erro": "Erro interno do servidor ao buscar perfil."}), 500
+        logger.error(f"Erro ao importar tarefas para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao importar tarefas.', 'importadas': importadas}), 500
 
 # =============================================
-# ROTAS DE GERENCIAMENTO DE TAREFAS
+# ROTAS DE TAREFAS RECORRENTES
 # =============================================
-@app.route('/tasks', methods=['POST'])
-@jwt_required # Protege esta rota, garantindo que apenas usuários logados podem criar tarefas
-def criar_tarefa():
+@app.route('/tasks/series', methods=['POST'])
+@jwt_required
+def criar_serie():
     """
-    Cria uma nova tarefa para o usuário logado.
-    Recebe título, descrição, data de vencimento, prioridade, projeto e status inicial.
+    Cria uma série de tarefas recorrentes para o usuário logado. Nenhuma tarefa é inserida:
+    as ocorrências aparecem em GET /tasks dentro da janela pedida.
     """
     try:
-        dados = request.get_json()
+        valores, erro = validar_nova_serie(request.get_json(silent=True))
+        if not erro:
+            erro = resolver_projeto(request.user_id, valores)
+        if erro:
+            return jsonify({'erro': erro}), 400
 
-        # Validação de campos obrigatórios
-        campos_obrigatorios = ['titulo', 'data_vencimento', 'prioridade']
-        for campo in campos_obrigatorios:
-            if campo not in dados or not dados[campo]:
-                return jsonify({'erro': f'Campo obrigatório faltando ou vazio: {campo}'}), 400
+        serie = SerieTarefa(usuario_id=request.user_id, **valores)
+        db.session.add(serie)
+        db.session.flush()
+        registrar_alteracao_tarefas(request.user_id, evento='serie') # O quadro muda sem nenhuma linha de tarefa alterada
+        db.session.commit()
 
-        # Validação e conversão da data de vencimento
-        try:
-            data_vencimento = datetime.strptime(dados['data_vencimento'], '%Y-%m-%d')
-        except ValueError:
-            return jsonify({'erro': 'Formato de data de vencimento inválido. Use AAAA-MM-DD.'}), 400
+        logger.info("Série %s (%s) criada para o usuário %s.", serie.id, serie.frequencia, request.user_id)
+        return jsonify({'mensagem': 'Série criada com sucesso!', 'serie': serie.to_dict()}), 201
 
-        # Validação da prioridade
-        prioridades_validas = ['Baixa', 'Média', 'Alta']
-        if dados['prioridade'] not in prioridades_validas:
-            return jsonify({'erro': 'Prioridade inválida. Use Baixa, Média ou Alta.'}), 400
+    except Exception as e:
+        logger.error(f"Erro ao criar série para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao criar série.'}), 500
 
-        # Validação do projeto (opcional, trata string vazia como None)
-        projeto_associado = dados.get('projeto')
-        if projeto_associado == '':
-            projeto_associado = None
+@app.route('/tasks/series', methods=['GET'])
+@jwt_required
+def listar_series():
+    """Lista as séries recorrentes do usuário logado."""
+    try:
+        series = SerieTarefa.query.filter_by(usuario_id=request.user_id).order_by(SerieTarefa.id).all()
+        return jsonify({'series': [serie.to_dict() for serie in series]}), 200
+    except Exception as e:
+        logger.error(f"Erro ao listar séries para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar séries.'}), 500
 
-        # Define o status inicial com base no checkbox 'concluida'
-        status_inicial = 'a fazer'
-        if dados.get('concluida') == True:
-            status_inicial = 'concluido'
+@app.route('/tasks/series/<int:serie_id>', methods=['DELETE'])
+@jwt_required
+def deletar_serie(serie_id):
+    """
+    Encerra uma série: as ocorrências futuras deixam de ser geradas e as já materializadas
+    (concluídas ou editadas) continuam no quadro, ou no arquivo, como tarefas avulsas.
+    """
+    try:
+        serie = SerieTarefa.query.filter_by(id=serie_id, usuario_id=request.user_id).first()
+        if not serie:
+            return jsonify({'erro': 'Série não encontrada ou não pertence ao usuário.'}), 404
 
-        nova_tarefa = Tarefa(
-            titulo=dados['titulo'].strip(),
-            descricao=dados.get('descricao', '').strip(),
-            data_vencimento=data_vencimento,
-            prioridade=dados['prioridade'],
-            projeto=projeto_associado,
-            status=status_inicial,
-            usuario_id=request.user_id # Associa a tarefa ao usuário logado
+        desvinculadas = db.session.scalars(
+            db.update(Tarefa)
+            .where(Tarefa.serie_id == serie_id)
+            .values(serie_id=None, ocorrencia=None)
+            .returning(Tarefa.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.execute(
+            db.update(TarefaArquivada)
+            .where(TarefaArquivada.serie_id == serie_id)
+            .values(serie_id=None, ocorrencia=None)
+            .execution_options(synchronize_session=False)
         )
-
-        db.session.add(nova_tarefa)
+        db.session.execute(db.delete(ExcecaoSerie).where(ExcecaoSerie.serie_id == serie_id))
+        db.session.delete(serie)
+        registrar_alteracao_tarefas(request.user_id, alteradas=desvinculadas, evento='serie')
         db.session.commit()
 
-        logger.info(f"Tarefa '{nova_tarefa.titulo}' criada para o usuário {request.user_id}.")
-        return jsonify({
-            'mensagem': 'Tarefa criada com sucesso!',
-            'tarefa': nova_tarefa.to_dict()
-        }), 201 # Created
+        logger.info("Série %s removida pelo usuário %s (%s tarefas desvinculadas).", serie_id, request.user_id, len(desvinculadas))
+        return jsonify({'mensagem': 'Série removida com sucesso!', 'desvinculadas': len(desvinculadas)}), 200
 
     except Exception as e:
-        logger.error(f"Erro ao criar tarefa para o usuário {request.user_id}: {str(e)}")
+        logger.error(f"Erro ao remover série {serie_id} para o usuário {request.user_id}: {str(e)}")
         db.session.rollback()
-        return jsonify({'erro': 'Erro interno no servidor ao criar tarefa.'}), 500
+        return jsonify({'erro': 'Erro interno no servidor ao remover série.'}), 500
 
-# Rota para obter uma tarefa específica por ID (para edição)
-@app.route('/tasks/<int:task_id>', methods=['GET'])
+def obter_ocorrencia(serie_id, data_texto):
+    """
+    Localiza a ocorrência AAAA-MM-DD de uma série do usuário logado.
+    Retorna (serie, data, erro), com erro = (mensagem, código HTTP) quando não existe.
+    """
+    try:
+        data = datetime.strptime(data_texto, '%Y-%m-%d')
+    except ValueError:
+        return None, None, ('Formato de data inválido. Use AAAA-MM-DD.', 400)
+    serie = SerieTarefa.query.filter_by(id=serie_id, usuario_id=request.user_id).first()
+    if not serie:
+        return None, None, ('Série não encontrada ou não pertence ao usuário.', 404)
+    removida = db.session.query(ExcecaoSerie.id).filter_by(serie_id=serie_id, ocorrencia=data).first()
+    if removida or data not in ocorrencias_serie(serie, data, data + timedelta(days=1)):
+        return None, None, ('Ocorrência não encontrada nesta série.', 404)
+    return serie, data, None
+
+@app.route('/tasks/series/<int:serie_id>/ocorrencias/<data_texto>', methods=['PATCH'])
 @jwt_required
-def obter_tarefa_por_id(task_id):
+def materializar_ocorrencia(serie_id, data_texto):
     """
-    Obtém os detalhes de uma tarefa específica do usuário logado.
+    Conclui ou edita uma ocorrência ainda virtual: a ocorrência vira uma linha em 'tarefa'
+    (com os campos da série e vencimento na data da ocorrência) e recebe as alterações,
+    com as regras de PATCH /tasks/<id> ('status' também é aceito, como no drag-and-drop).
+    A partir daí a tarefa é alterada pelas rotas comuns, pelo id retornado.
     """
     try:
-        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
-        if not tarefa:
-            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
-        return jsonify(tarefa.to_dict()), 200
-    except Exception as e:
-        logger.error(f"Erro ao obter tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
-        return jsonify({'erro': 'Erro interno do servidor ao obter tarefa.'}), 500
+        serie, data, erro = obter_ocorrencia(serie_id, data_texto)
+        if erro:
+            return jsonify({'erro': erro[0]}), erro[1]
+        existente = Tarefa.query.filter_by(serie_id=serie_id, ocorrencia=data).first()
+        if existente:
+            return jsonify({'erro': 'Ocorrência já materializada: altere a tarefa pelo id.', 'tarefa': existente.to_dict()}), 409
 
+        dados = request.get_json(silent=True)
+        mudancas, erro = validar_atualizacao_tarefa(dados, 'a fazer')
+        if not erro and 'status' in dados: # Prevalece sobre 'concluida'
+            mudancas_status, erro = validar_mudanca_status(dados['status'], 'a fazer')
+            if not erro:
+                mudancas.pop('data_conclusao', None) # A data vem de 'status', não de 'concluida'
+                mudancas.update(mudancas_status)
+        if not erro:
+            erro = resolver_projeto(request.user_id, mudancas)
+        if erro:
+            return jsonify({'erro': erro}), 400
 
-# Rota para atualizar uma tarefa existente (para edição)
-@app.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
+        tarefa = Tarefa(
+            usuario_id=request.user_id, serie_id=serie_id, ocorrencia=data,
+            titulo=serie.titulo, descricao=serie.descricao, data_vencimento=data,
+            prioridade=serie.prioridade, projeto_id=serie.projeto_id, status='a fazer'
+        )
+        for coluna, valor in mudancas.items():
+            setattr(tarefa, coluna, valor)
+        db.session.add(tarefa)
+        db.session.flush()
+        registrar_alteracao_tarefas(request.user_id, alteradas=[tarefa.id], evento='atualizada')
+        db.session.commit()
+
+        logger.info("Ocorrência %s da série %s materializada como tarefa %s (status '%s').", data_texto, serie_id, tarefa.id, tarefa.status)
+        return jsonify({'mensagem': 'Ocorrência atualizada com sucesso!', 'tarefa': tarefa.to_dict()}), 201
+
+    except db.exc.IntegrityError:
+        # Outra requisição materializou a mesma ocorrência (índice único serie_id + ocorrencia)
+        db.session.rollback()
+        return jsonify({'erro': 'Ocorrência já materializada: altere a tarefa pelo id.'}), 409
+    except Exception as e:
+        logger.error(f"Erro ao materializar ocorrência {data_texto} da série {serie_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao atualizar ocorrência.'}), 500
+
+@app.route('/tasks/series/<int:serie_id>/ocorrencias/<data_texto>', methods=['DELETE'])
 @jwt_required
-def atualizar_tarefa(task_id):
+def deletar_ocorrencia(serie_id, data_texto):
     """
-    Atualiza uma tarefa existente do usuário logado.
-    Pode ser usado para atualização completa (PUT) ou parcial (PATCH).
+    Remove uma ocorrência da série (virtual ou materializada); ela não volta a ser gerada.
+    Remover pela rota DELETE /tasks/<id> tem o mesmo efeito (gatilho tarefa_excecao_serie).
     """
     try:
-        dados = request.get_json()
-        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+        serie, data, erro = obter_ocorrencia(serie_id, data_texto)
+        if erro:
+            return jsonify({'erro': erro[0]}), erro[1]
 
-        if not tarefa:
-            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+        existente = Tarefa.query.filter_by(serie_id=serie_id, ocorrencia=data).first()
+        if existente:
+            db.session.delete(existente) # O gatilho registra a exceção
+        else:
+            db.session.add(ExcecaoSerie(serie_id=serie_id, ocorrencia=data))
+        registrar_alteracao_tarefas(request.user_id, removidas=[existente.id] if existente else (), evento='removida')
+        db.session.commit()
+
+        logger.info("Ocorrência %s da série %s removida pelo usuário %s.", data_texto, serie_id, request.user_id)
+        return jsonify({'mensagem': 'Ocorrência removida com sucesso!'}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao remover ocorrência {data_texto} da série {serie_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao remover ocorrência.'}), 500
+
+# =============================================
+# ROTAS DO ARQUIVO DE TAREFAS
+# =============================================
+@app.route('/tasks/archive', methods=['GET'])
+@jwt_required
+def listar_tarefas_arquivadas():
+    """
+    Lista as tarefas arquivadas do usuário logado, das concluídas mais recentemente para as
+    mais antigas. Consulta só a tabela de arquivo, pelo índice (usuario_id, data_conclusao, id),
+    sem tocar no quadro.
 
-        logger.info(f"Atualizando tarefa {task_id}. Dados recebidos: {dados}")
-        logger.info(f"Status atual da tarefa {task_id} antes da atualização: {tarefa.status}")
+    Parâmetros opcionais de query string:
+    - limite: tamanho da página (padrão LIMITE_ARQUIVO_PADRAO, máximo LIMITE_PAGINA_MAXIMO)
+    - cursor: continua a partir do 'proximo_cursor' da página anterior
+    """
+    try:
+        try:
+            limite = int(request.args.get('limite', LIMITE_ARQUIVO_PADRAO))
+        except ValueError:
+            return jsonify({'erro': 'Limite inválido.'}), 400
+        if limite < 1 or limite > LIMITE_PAGINA_MAXIMO:
+            return jsonify({'erro': f'Limite deve estar entre 1 e {LIMITE_PAGINA_MAXIMO}.'}), 400
 
-        # Atualiza os campos se eles estiverem presentes nos dados
-        if 'titulo' in dados and dados['titulo']:
-            tarefa.titulo = dados['titulo'].strip()
-        if 'descricao' in dados: # Permite descrição vazia
-            tarefa.descricao = dados['descricao'].strip()
-        if 'data_vencimento' in dados and dados['data_vencimento']:
+        consulta = TarefaArquivada.query.filter(TarefaArquivada.usuario_id == request.user_id)
+        cursor = request.args.get('cursor')
+        if cursor:
             try:
-                tarefa.data_vencimento = datetime.strptime(dados['data_vencimento'], '%Y-%m-%d')
+                cursor = decodificar_cursor(cursor)
             except ValueError:
-                return jsonify({'erro': 'Formato de data de vencimento inválido. Use AAAA-MM-DD.'}), 400
-        if 'prioridade' in dados and dados['prioridade']:
-            prioridades_validas = ['Baixa', 'Média', 'Alta']
-            if dados['prioridade'] not in prioridades_validas:
-                return jsonify({'erro': 'Prioridade inválida. Use Baixa, Média ou Alta.'}), 400
-            tarefa.prioridade = dados['prioridade']
-        if 'projeto' in dados: # Permite projeto vazio/nulo
-            tarefa.projeto = dados['projeto'] if dados['projeto'] != '' else None
-
-        # Lógica para atualização de status (se vier no payload de edição)
-        # Isso é diferente do PATCH de drag-and-drop que só muda o status
-        if 'concluida' in dados:
-            if dados['concluida'] == True and tarefa.status != 'concluido':
-                tarefa.status = 'concluido'
-                tarefa.data_conclusao = datetime.utcnow()
-            elif dados['concluida'] == False and tarefa.status == 'concluido':
-                tarefa.status = 'a fazer' # Ou 'fazendo', dependendo da lógica
-                tarefa.data_conclusao = None
-            # Se o status vier explicitamente, mas não for 'concluida', atualiza
-            elif 'status' in dados and dados['status'] in ['a fazer', 'fazendo', 'concluido']:
-                tarefa.status = dados['status']
-                if tarefa.status != 'concluido':
-                    tarefa.data_conclusao = None
-
-        logger.info(f"Status da tarefa {task_id} APÓS atualização de campos: {tarefa.status}")
-        db.session.commit() # <<< AQUI: Garante que as mudanças são salvas no banco de dados
+                return jsonify({'erro': 'Cursor inválido.'}), 400
+            consulta = consulta.filter(db.tuple_(TarefaArquivada.data_conclusao, TarefaArquivada.id) < cursor)
 
-        logger.info(f"Tarefa {task_id} atualizada e commitada pelo usuário {request.user_id}. Novo status: {tarefa.status}")
-        return jsonify({'mensagem': 'Tarefa atualizada com sucesso!', 'tarefa': tarefa.to_dict()}), 200
+        # Busca um item a mais para saber se existe uma próxima página
+        tarefas = consulta.order_by(
+            TarefaArquivada.data_conclusao.desc(), TarefaArquivada.id.desc()
+        ).limit(limite + 1).all()
+        proximo_cursor = None
+        if len(tarefas) > limite:
+            tarefas = tarefas[:limite]
+            proximo_cursor = codificar_cursor(tarefas[-1].data_conclusao, tarefas[-1].id)
 
-    except Exception as e:
-        logger.error(f"Erro ao atualizar tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
-        db.session.rollback()
-        return jsonify({'erro': 'Erro interno no servidor ao atualizar tarefa.'}), 500
+        logger.info("Tarefas arquivadas listadas para o usuário %s. Quantidade: %s", request.user_id, len(tarefas))
+        return jsonify({
+            'tarefas': [tarefa.to_dict() for tarefa in tarefas],
+            'paginacao': {'limite': limite, 'proximo_cursor': proximo_cursor}
+        }), 200
 
+    except Exception as e:
+        logger.error(f"Erro ao listar tarefas arquivadas para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar tarefas arquivadas.'}), 500
 
-@app.route('/tasks', methods=['GET'])
-@jwt_required # Protege esta rota
-def listar_tarefas():
+@app.route('/tasks/archive/<int:task_id>/unarchive', methods=['POST'])
+@jwt_required
+def desarquivar_tarefa(task_id):
     """
-    Lista todas as tarefas do usuário logado, agrupadas por status.
-    As tarefas são ordenadas pela data de vencimento.
+    Devolve uma tarefa arquivada ao quadro, com o mesmo id (ids de tarefa não são
+    reaproveitados, então ele continua livre). Por padrão ela volta reaberta ('a fazer', sem data de
+    conclusão); o corpo opcional {"status": ...} escolhe a coluna. Uma tarefa devolvida como
+    'concluido' mantém a data de conclusão e volta ao arquivo no próximo arquivamento.
     """
     try:
-        todas_tarefas = Tarefa.query.filter_by(usuario_id=request.user_id).order_by(Tarefa.data_vencimento).all()
+        dados = request.get_json(silent=True) or {}
+        mudancas, erro = validar_mudanca_status(dados.get('status', 'a fazer'), 'concluido')
+        if erro:
+            return jsonify({'erro': erro}), 400
 
-        tarefas_por_status = {
-            'a fazer': [],
-            'fazendo': [],
-            'concluido': []
-        }
+        arquivada = TarefaArquivada.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+        if not arquivada:
+            return jsonify({'erro': 'Tarefa arquivada não encontrada ou não pertence ao usuário.'}), 404
 
-        for tarefa in todas_tarefas:
-            if tarefa.status in tarefas_por_status:
-                tarefas_por_status[tarefa.status].append(tarefa.to_dict())
+        tarefa = Tarefa(
+            id=task_id,
+            titulo=arquivada.titulo, descricao=arquivada.descricao, data_vencimento=arquivada.data_vencimento,
+            prioridade=arquivada.prioridade, projeto_id=arquivada.projeto_id, status=arquivada.status,
+            data_criacao=arquivada.data_criacao, data_conclusao=arquivada.data_conclusao,
+            usuario_id=request.user_id, serie_id=arquivada.serie_id, ocorrencia=arquivada.ocorrencia,
+            versao=arquivada.versao + 1
+        )
+        for coluna, valor in mudancas.items():
+            setattr(tarefa, coluna, valor)
+        if arquivada.serie_id is not None:
+            # O arquivamento registrou a ocorrência como exceção da série; com a tarefa de volta,
+            # a ocorrência volta a ser a materializada (e a remoção dela a registra de novo)
+            db.session.execute(db.delete(ExcecaoSerie).where(
+                ExcecaoSerie.serie_id == arquivada.serie_id, ExcecaoSerie.ocorrencia == arquivada.ocorrencia
+            ))
+        db.session.delete(arquivada)
+        db.session.add(tarefa)
+        db.session.flush()
+        registrar_alteracao_tarefas(request.user_id, alteradas=[tarefa.id], evento='restaurada')
+        db.session.commit()
 
-        logger.info(f"Tarefas listadas para o usuário {request.user_id}. Quantidade: A Fazer={len(tarefas_por_status['a fazer'])}, Fazendo={len(tarefas_por_status['fazendo'])}, Concluído={len(tarefas_por_status['concluido'])}")
-        return jsonify(tarefas_por_status), 200
+        logger.info("Tarefa arquivada %s devolvida ao quadro pelo usuário %s (status '%s').", task_id, request.user_id, tarefa.status)
+        return jsonify({'mensagem': 'Tarefa desarquivada com sucesso!', 'tarefa': tarefa.to_dict()}), 200
 
     except Exception as e:
-        logger.error(f"Erro ao listar tarefas para o usuário {request.user_id}: {str(e)}")
-        return jsonify({'erro': 'Erro interno no servidor ao listar tarefas.'}), 500
+        logger.error(f"Erro ao desarquivar tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao desarquivar tarefa.'}), 500
 
-# ... (código anterior permanece igual)
+# =============================================
+# ROTAS DE NOTIFICAÇÕES
+# =============================================
+@app.route('/notifications', methods=['GET'])
+@jwt_required
+def listar_notificacoes():
+    """
+    Lista as notificações de vencimento do usuário logado, das mais recentes para as mais
+    antigas, com o total de não lidas. Pelo índice (usuario_id, id), ou pelo índice parcial
+    das não lidas com nao_lidas=1.
+
+    Parâmetros opcionais de query string:
+    - limite: tamanho da página (padrão LIMITE_NOTIFICACOES_PADRAO, máximo LIMITE_PAGINA_MAXIMO)
+    - cursor: continua a partir do 'proximo_cursor' da página anterior
+    - nao_lidas: '1' para listar só as não lidas
+    """
+    try:
+        try:
+            limite = int(request.args.get('limite', LIMITE_NOTIFICACOES_PADRAO))
+            cursor = request.args.get('cursor')
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'erro': 'Limite ou cursor inválido.'}), 400
+        if limite < 1 or limite > LIMITE_PAGINA_MAXIMO:
+            return jsonify({'erro': f'Limite deve estar entre 1 e {LIMITE_PAGINA_MAXIMO}.'}), 400
 
-@app.route('/tasks/<int:task_id>', methods=['PATCH'])
+        nao_lidas = db.and_(Notificacao.usuario_id == request.user_id, Notificacao.lida == db.false())
+        consulta = Notificacao.query.filter(nao_lidas if request.args.get('nao_lidas') == '1' else Notificacao.usuario_id == request.user_id)
+        if cursor is not None:
+            consulta = consulta.filter(Notificacao.id < cursor)
+
+        # Busca um item a mais para saber se existe uma próxima página
+        notificacoes = consulta.order_by(Notificacao.id.desc()).limit(limite + 1).all()
+        proximo_cursor = None
+        if len(notificacoes) > limite:
+            notificacoes = notificacoes[:limite]
+            proximo_cursor = str(notificacoes[-1].id)
+        total_nao_lidas = db.session.query(db.func.count(Notificacao.id)).filter(nao_lidas).scalar()
+
+        logger.info("Notificações listadas para o usuário %s. Quantidade: %s", request.user_id, len(notificacoes))
+        return jsonify({
+            'notificacoes': [notificacao.to_dict() for notificacao in notificacoes],
+            'nao_lidas': total_nao_lidas,
+            'paginacao': {'limite': limite, 'proximo_cursor': proximo_cursor}
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao listar notificações para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar notificações.'}), 500
+
+@app.route('/notifications/read', methods=['POST'])
 @jwt_required
-def atualizar_status_tarefa(task_id):
+def marcar_notificacoes_lidas():
+    """
+    Marca notificações do usuário logado como lidas: as do corpo {"ids": [...]} ou, sem ids,
+    todas as não lidas. Retorna quantas foram marcadas.
+    """
     try:
-        dados = request.get_json()
-        novo_status = dados.get('status')
-        
-        # Log detalhado para depuração
-        app.logger.info(f"PATCH /tasks/{task_id} - Novo status: {novo_status}")
-        app.logger.info(f"Payload recebido: {dados}")
+        dados = request.get_json(silent=True) or {}
+        ids = dados.get('ids')
+        if ids is not None and (
+            not isinstance(ids, list) or len(ids) > LIMITE_PAGINA_MAXIMO
+            or not all(isinstance(notificacao_id, int) and not isinstance(notificacao_id, bool) for notificacao_id in ids)
+        ):
+            return jsonify({'erro': f'O campo ids deve ser uma lista de até {LIMITE_PAGINA_MAXIMO} ids.'}), 400
 
-        # LOG ADICIONAL PARA DEPURAÇÃO:
-        logger.info(f"Recebida requisição PATCH para tarefa {task_id}. Novo status desejado: '{novo_status}'")
+        comando = db.update(Notificacao).where(Notificacao.usuario_id == request.user_id, Notificacao.lida == db.false())
+        if ids is not None:
+            comando = comando.where(Notificacao.id.in_(ids))
+        marcadas = db.session.execute(comando.values(lida=True).execution_options(synchronize_session=False)).rowcount
+        db.session.commit()
 
-        # Validação do novo status
-        if not novo_status or novo_status not in ['a fazer', 'fazendo', 'concluido']:
-            return jsonify({'erro': 'Status inválido fornecido.'}), 400
+        logger.info("%s notificações marcadas como lidas pelo usuário %s.", marcadas, request.user_id)
+        return jsonify({'mensagem': 'Notificações marcadas como lidas.', 'marcadas': marcadas}), 200
 
-        # Busca a tarefa pelo ID e garante que ela pertence ao usuário logado
-        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+    except Exception as e:
+        logger.error(f"Erro ao marcar notificações como lidas para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao marcar notificações.'}), 500
 
-        if not tarefa:
-            logger.warning(f"Tentativa de atualizar tarefa {task_id} não encontrada ou não pertencente ao usuário {request.user_id}.")
-            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+# =============================================
+# ROTAS DE PROJETOS
+# =============================================
+def validar_dados_projeto(dados, parcial=False):
+    """
+    Valida nome (obrigatório na criação) e cor (opcional) de um projeto.
+    Retorna (valores, erro) como validar_nova_tarefa.
+    """
+    if not isinstance(dados, dict):
+        return None, 'Dados do projeto ausentes ou em formato inválido.'
+    valores = {}
+    if 'nome' in dados or not parcial:
+        nome = dados.get('nome')
+        if not isinstance(nome, str) or not nome.strip():
+            return None, 'Campo obrigatório faltando ou vazio: nome'
+        if len(nome.strip()) > TAMANHO_NOME_PROJETO:
+            return None, f'O nome do projeto deve ter no máximo {TAMANHO_NOME_PROJETO} caracteres.'
+        valores['nome'] = nome.strip()
+    if 'cor' in dados:
+        cor = dados['cor']
+        if cor is not None and not (isinstance(cor, str) and re.match(r'^#[0-9a-fA-F]{6}$', cor)):
+            return None, 'Cor inválida. Use o formato #RRGGBB.'
+        valores['cor'] = cor
+    return valores, None
 
-        logger.info(f"Recebida requisição PATCH para tarefa {task_id}. Novo status desejado: '{novo_status}'. Status atual: '{tarefa.status}'")
+def contagens_projetos(usuario_id):
+    """
+    Quantidade de tarefas (total e não concluídas) por projeto_id do usuário, lida dos contadores
+    das dimensões 'projeto' e 'projeto_aberto' (índice único (usuario_id, dimensao, valor)),
+    sem consultar as tarefas. A chave None reúne as tarefas sem projeto.
+    """
+    contagens = {}
+    for dimensao, valor, quantidade in db.session.query(
+        ContadorTarefa.dimensao, ContadorTarefa.valor, ContadorTarefa.quantidade
+    ).filter(ContadorTarefa.usuario_id == usuario_id, ContadorTarefa.dimensao.in_(('projeto', 'projeto_aberto'))):
+        contagem = contagens.setdefault(int(valor) if valor else None, {'total_tarefas': 0, 'tarefas_abertas': 0})
+        contagem['total_tarefas' if dimensao == 'projeto' else 'tarefas_abertas'] = quantidade
+    return contagens
 
-        # Atualiza a data de conclusão se o status mudar para 'concluido'
-        if novo_status == 'concluido' and tarefa.status != 'concluido':
-            tarefa.data_conclusao = datetime.utcnow()
-            logger.info(f"Definindo data de conclusão para tarefa {task_id}.")
-        # Remove a data de conclusão se o status mudar de 'concluido' para outro
-        elif novo_status != 'concluido' and tarefa.status == 'concluido':
-            tarefa.data_conclusao = None
-            logger.info(f"Removendo data de conclusão para tarefa {task_id}.")
+@app.route('/projects', methods=['POST'])
+@jwt_required
+def criar_projeto():
+    """Cria um projeto (nome único por usuário e cor opcional) para o usuário logado."""
+    try:
+        valores, erro = validar_dados_projeto(request.get_json(silent=True))
+        if erro:
+            return jsonify({'erro': erro}), 400
 
-        tarefa.status = novo_status
-        db.session.commit() # <<< AQUI: Garante que as mudanças são salvas no banco de dados
+        projeto = Projeto(usuario_id=request.user_id, **valores)
+        db.session.add(projeto)
+        db.session.commit()
 
-        logger.info(f"Status da tarefa {task_id} atualizado para '{novo_status}' e commitado pelo usuário {request.user_id}.")
-        return jsonify({'mensagem': 'Status da tarefa atualizado com sucesso!', 'tarefa': tarefa.to_dict()}), 200
+        logger.info("Projeto '%s' criado para o usuário %s.", projeto.nome, request.user_id)
+        return jsonify({'mensagem': 'Projeto criado com sucesso!', 'projeto': projeto.to_dict()}), 201
 
+    except db.exc.IntegrityError:
+        db.session.rollback()
+        return jsonify({'erro': 'Já existe um projeto com este nome.'}), 409
     except Exception as e:
-        logger.error(f"Erro ao atualizar status da tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        logger.error(f"Erro ao criar projeto para o usuário {request.user_id}: {str(e)}")
         db.session.rollback()
-        return jsonify({'erro': 'Erro interno no servidor ao atualizar tarefa.'}), 500
+        return jsonify({'erro': 'Erro interno no servidor ao criar projeto.'}), 500
 
-@app.route('/tasks/<int:task_id>', methods=['DELETE'])
-@jwt_required # Protege esta rota
-def deletar_tarefa(task_id):
+@app.route('/projects', methods=['GET'])
+@jwt_required
+def listar_projetos():
     """
-    Deleta uma tarefa específica do usuário logado.
+    Lista os projetos do usuário logado, em ordem de nome, com a quantidade de tarefas de
+    cada um (total_tarefas e tarefas_abertas, dos contadores pré-calculados), e as mesmas
+    contagens para as tarefas sem projeto.
     """
     try:
-        # Busca a tarefa pelo ID e garante que ela pertence ao usuário logado
-        tarefa = Tarefa.query.filter_by(id=task_id, usuario_id=request.user_id).first()
+        contagens = contagens_projetos(request.user_id)
+        vazio = {'total_tarefas': 0, 'tarefas_abertas': 0}
+        projetos = Projeto.query.filter_by(usuario_id=request.user_id).order_by(Projeto.nome).all()
+        return jsonify({
+            'projetos': [{**projeto.to_dict(), **contagens.get(projeto.id, vazio)} for projeto in projetos],
+            'sem_projeto': contagens.get(None, vazio)
+        }), 200
+    except Exception as e:
+        logger.error(f"Erro ao listar projetos para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao listar projetos.'}), 500
 
-        if not tarefa:
-            logger.warning(f"Tentativa de deletar tarefa {task_id} não encontrada ou não pertencente ao usuário {request.user_id}.")
-            return jsonify({'erro': 'Tarefa não encontrada ou não pertence ao usuário.'}), 404
+@app.route('/projects/<int:projeto_id>', methods=['GET'])
+@jwt_required
+def obter_projeto(projeto_id):
+    """Obtém um projeto do usuário logado, com as contagens de tarefas."""
+    try:
+        projeto = Projeto.query.filter_by(id=projeto_id, usuario_id=request.user_id).first()
+        if not projeto:
+            return jsonify({'erro': 'Projeto não encontrado ou não pertence ao usuário.'}), 404
+        contagem = contagens_projetos(request.user_id).get(projeto_id, {'total_tarefas': 0, 'tarefas_abertas': 0})
+        return jsonify({**projeto.to_dict(), **contagem}), 200
+    except Exception as e:
+        logger.error(f"Erro ao obter projeto {projeto_id} para o usuário {request.user_id}: {str(e)}")
+        return jsonify({'erro': 'Erro interno no servidor ao obter projeto.'}), 500
 
-        db.session.delete(tarefa)
+@app.route('/projects/<int:projeto_id>', methods=['PUT', 'PATCH'])
+@jwt_required
+def atualizar_projeto(projeto_id):
+    """
+    Renomeia e/ou muda a cor de um projeto. Ao renomear, as tarefas do projeto entram no log
+    de alterações (o nome do projeto faz parte do JSON de cada tarefa).
+    """
+    try:
+        projeto = Projeto.query.filter_by(id=projeto_id, usuario_id=request.user_id).first()
+        if not projeto:
+            return jsonify({'erro': 'Projeto não encontrado ou não pertence ao usuário.'}), 404
+
+        valores, erro = validar_dados_projeto(request.get_json(silent=True), parcial=True)
+        if erro:
+            return jsonify({'erro': erro}), 400
+        renomeado = 'nome' in valores and valores['nome'] != projeto.nome
+        for coluna, valor in valores.items():
+            setattr(projeto, coluna, valor)
+        db.session.flush()
+        if renomeado:
+            # Ids pelo índice (usuario_id, projeto_id, ...), sem ler as tarefas
+            ids = db.session.scalars(
+                db.select(Tarefa.id).where(Tarefa.usuario_id == request.user_id, Tarefa.projeto_id == projeto_id)
+            ).all()
+            registrar_alteracao_tarefas(request.user_id, alteradas=ids, evento='projeto')
         db.session.commit()
 
-        logger.info(f"Tarefa {task_id} deletada pelo usuário {request.user_id}.")
-        return jsonify({'mensagem': 'Tarefa deletada com sucesso!'}), 200
+        logger.info("Projeto %s atualizado pelo usuário %s.", projeto_id, request.user_id)
+        return jsonify({'mensagem': 'Projeto atualizado com sucesso!', 'projeto': projeto.to_dict()}), 200
+
+    except db.exc.IntegrityError:
+        db.session.rollback()
+        return jsonify({'erro': 'Já existe um projeto com este nome.'}), 409
+    except Exception as e:
+        logger.error(f"Erro ao atualizar projeto {projeto_id} para o usuário {request.user_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'erro': 'Erro interno no servidor ao atualizar projeto.'}), 500
+
+@app.route('/projects/<int:projeto_id>', methods=['DELETE'])
+@jwt_required
+def deletar_projeto(projeto_id):
+    """Remove um projeto: as tarefas (inclusive as arquivadas) e séries dele continuam, sem projeto."""
+    try:
+        projeto = Projeto.query.filter_by(id=projeto_id, usuario_id=request.user_id).first()
+        if not projeto:
+            return jsonify({'erro': 'Projeto não encontrado ou não pertence ao usuário.'}), 404
+
+        desvinculadas = db.session.scalars(
+            db.update(Tarefa)
+            .where(Tarefa.usuario_id == request.user_id, Tarefa.projeto_id == projeto_id)
+            .values(projeto_id=None)
+            .returning(Tarefa.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        for modelo in (SerieTarefa, TarefaArquivada):
+            db.session.execute(
+                db.update(modelo)
+                .where(modelo.usuario_id == request.user_id, modelo.projeto_id == projeto_id)
+                .values(projeto_id=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.delete(projeto)
+        registrar_alteracao_tarefas(request.user_id, alteradas=desvinculadas, evento='projeto')
+        db.session.commit()
+
+        logger.info("Projeto %s removido pelo usuário %s (%s tarefas desvinculadas).", projeto_id, request.user_id, len(desvinculadas))
+        return jsonify({'mensagem': 'Projeto removido com sucesso!', 'desvinculadas': len(desvinculadas)}), 200
 
     except Exception as e:
-        logger.error(f"Erro ao deletar tarefa {task_id} para o usuário {request.user_id}: {str(e)}")
+        logger.error(f"Erro ao remover projeto {projeto_id} para o usuário {request.user_id}: {str(e)}")
         db.session.rollback()
-        return jsonify({'erro': 'Erro interno no servidor ao deletar tarefa.'}), 500
+        return jsonify({'erro': 'Erro interno no servidor ao remover projeto.'}), 500
 
 # =============================================
 # ROTA DE SAÚDE DO SERVIDOR
@@ -596,7 +4594,56 @@ def health_check():
         "hora_servidor": datetime.utcnow().isoformat()
     }), 200
 
+def coletar_metricas_estado():
+    """Amostras lidas na hora da exportação: caches, conexões SSE e pool de banco."""
+    tokens = cache_tokens.estatisticas()
+    perfis = cache_perfis.estatisticas()
+    amostras = [
+        ('techflow_jwt_cache_acertos_total', 'counter', 'Acertos do cache de tokens JWT.', [((), tokens['acertos'])]),
+        ('techflow_jwt_cache_falhas_total', 'counter', 'Falhas do cache de tokens JWT (jwt.decode executado).', [((), tokens['falhas'])]),
+        ('techflow_jwt_cache_entradas', 'gauge', 'Tokens no cache de tokens JWT.', [((), tokens['tamanho'])]),
+        ('techflow_perfil_cache_acertos_total', 'counter', 'Acertos do cache de perfis de usuário.', [((), perfis['acertos'])]),
+        ('techflow_perfil_cache_falhas_total', 'counter', 'Falhas do cache de perfis de usuário (consulta ao banco).', [((), perfis['falhas'])]),
+        ('techflow_perfil_cache_entradas', 'gauge', 'Perfis no cache de perfis de usuário.', [((), perfis['tamanho'])]),
+        ('techflow_quadro_cache_bytes', 'gauge', 'Memória usada pelos snapshots de GET /tasks em cache.', [((), cache_quadros.bytes_usados)]),
+        ('techflow_eventos_assinantes', 'gauge', 'Conexões SSE abertas em GET /tasks/events.', [((), canal_eventos.total)]),
+        ('techflow_eventos_descartados_total', 'counter', 'Assinantes SSE descartados por fila cheia.', [((), canal_eventos.descartados)]),
+        ('techflow_lembretes_agendador_ativo', 'gauge', 'Se a thread do agendador de lembretes está rodando neste processo.',
+         [((), int(agendador_lembretes_rodando()))]),
+    ]
+    chaves_limite_taxa = backend_limite_taxa.quantidade_chaves()
+    if chaves_limite_taxa is not None:
+        amostras.append(('techflow_limite_taxa_chaves', 'gauge', 'Baldes mantidos pelo limite de taxa.', [((), chaves_limite_taxa)]))
+    if handler_fila_logs is not None:
+        amostras.append(('techflow_logs_descartados_total', 'counter', 'Registros de log descartados com a fila de escrita cheia.', [((), handler_fila_logs.descartados)]))
+    pool = db.engine.pool
+    if hasattr(pool, 'checkedout'):
+        amostras.append(('techflow_db_conexoes_em_uso', 'gauge', 'Conexões do pool do SQLAlchemy em uso.', [((), pool.checkedout())]))
+    return amostras
+
+metricas.coletores.append(coletar_metricas_estado)
+
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    """
+    Métricas do processo no formato texto do Prometheus: latência, status e requisições em
+    andamento por endpoint, tempos de SQL, jwt.decode e hash de senhas, e estado dos caches.
+    """
+    token = app.config['METRICAS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'erro': 'Token de métricas inválido.'}), 401
+    return app.response_class(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    # Inicia o servidor Flask em modo de depuração.
-    # Em produção, 'debug=True' deve ser desativado.
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Servidor local: aplica as migrações pendentes antes de atender (em produção, rode 'migrar' no deploy)
+    preparar_app(migrar=True)
+    if os.environ.get('TECHFLOW_SERVIDOR') == 'gevent':
+        # Modo cooperativo: cada conexão SSE ociosa custa uma greenlet, não uma thread.
+        # Requer 'pip install gevent'. Com gunicorn: gunicorn -k gevent --chdir backend app:app
+        from gevent.pywsgi import WSGIServer
+        logger.info("Servidor gevent escutando em 0.0.0.0:5000.")
+        WSGIServer(('0.0.0.0', 5000), app).serve_forever()
+    else:
+        # Inicia o servidor Flask em modo de depuração.
+        # Em produção, 'debug=True' deve ser desativado.
+        app.run(host='0.0.0.0', port=5000, debug=True)
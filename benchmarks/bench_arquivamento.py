@@ -0,0 +1,137 @@
+# benchmarks/bench_arquivamento.py
+"""
+Benchmark do arquivamento de tarefas concluídas (tabela tarefa_arquivada).
+
+Popula um banco SQLite temporário com um usuário "antigo": N tarefas, das quais uma fração
+foi concluída há mais de ARQUIVAMENTO_DIAS. Mede as consultas do quadro antes e depois
+do arquivamento, com o cache de snapshots de GET /tasks desativado:
+- GET /tasks (quadro completo) e GET /tasks?status=concluido&limite=50;
+- GET /tasks/archive?limite=50 (primeira página do arquivo, depois do arquivamento);
+- tamanho da tabela 'tarefa' e dos seus índices (páginas, via dbstat, quando disponível).
+Também mede a vazão do próprio arquivamento (tarefas movidas por segundo, em lotes).
+
+Uso:
+    python benchmarks/bench_arquivamento.py --tarefas 100000 --antigas 0.9 --consultas 20
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def medir(cliente, url, cabecalhos, consultas):
+    """Mediana da latência (ms) de GET url."""
+    latencias = []
+    for _ in range(consultas):
+        inicio = time.perf_counter()
+        resposta = cliente.get(url, headers=cabecalhos)
+        latencias.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.get_data(as_text=True)[:200]
+    return round(statistics.median(latencias) * 1000, 2)
+
+
+def tamanho_tabela(caminho_banco):
+    """Páginas ocupadas por 'tarefa' e pelos seus índices, ou None se o SQLite não tiver dbstat."""
+    conexao = sqlite3.connect(caminho_banco)
+    try:
+        return conexao.execute(
+            "SELECT SUM(pageno) FROM (SELECT COUNT(*) AS pageno FROM dbstat "
+            "WHERE name = 'tarefa' OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tarefa'))"
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tarefas', type=int, default=100000)
+    parser.add_argument('--antigas', type=float, default=0.9, help='Fração das tarefas concluídas há mais de ARQUIVAMENTO_DIAS')
+    parser.add_argument('--consultas', type=int, default=20, help='Repetições de cada consulta medida')
+    parser.add_argument('--perfil', default='producao', help="Perfil SQLite ('padrao' ou 'producao')")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-arquivo-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SQLITE_PERFIL'] = args.perfil
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+    techflow.cache_quadros.bytes_maximos = 0 # Cada GET /tasks consulta e serializa de novo
+
+    aleatorio = random.Random(args.semente)
+    dias = techflow.app.config['ARQUIVAMENTO_DIAS']
+
+    def linha(i):
+        if aleatorio.random() < args.antigas:
+            conclusao = f'2023-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d} 12:00:00.000000'
+            return (f'Tarefa {i}', 'concluido', conclusao)
+        return (f'Tarefa {i}', aleatorio.choice(['a fazer', 'fazendo']), None)
+
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (1, 'Bench', 'bench@techflow.dev', 'x', 0, 0)"
+    )
+    conexao.executemany(
+        "INSERT INTO tarefa (titulo, data_vencimento, prioridade, status, data_criacao, data_conclusao, usuario_id) "
+        "VALUES (?, '2025-06-01 00:00:00.000000', 'Média', ?, '2023-01-01 00:00:00.000000', ?, 1)",
+        (linha(i) for i in range(args.tarefas))
+    )
+    conexao.commit()
+    conexao.close()
+
+    with techflow.app.app_context():
+        token = techflow.jwt.encode(
+            {'sub': '1', 'exp': int(time.time()) + 3600}, techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+        )
+    cabecalhos = {'Authorization': f'Bearer {token}'}
+    cliente = techflow.app.test_client()
+
+    def medir_quadro():
+        return {
+            'quadro_completo_ms': medir(cliente, '/tasks', cabecalhos, args.consultas),
+            'concluidas_primeira_pagina_ms': medir(cliente, '/tasks?status=concluido&limite=50', cabecalhos, args.consultas),
+            'paginas_tarefa_e_indices': tamanho_tabela(caminho_banco)
+        }
+
+    antes = medir_quadro()
+    with techflow.app.app_context():
+        inicio = time.perf_counter()
+        arquivadas = techflow.arquivar_tarefas_concluidas()
+        tempo_arquivamento = time.perf_counter() - inicio
+    with techflow.app.app_context():
+        techflow.db.session.execute(techflow.db.text('VACUUM')) # Devolve as páginas liberadas, para comparar o tamanho
+    depois = medir_quadro()
+
+    resultado = {
+        'perfil': args.perfil,
+        'tarefas': args.tarefas,
+        'arquivamento_dias': dias,
+        'arquivadas': arquivadas,
+        'arquivamento_por_segundo': round(arquivadas / tempo_arquivamento, 1) if tempo_arquivamento else None,
+        'antes': antes,
+        'depois': depois,
+        'arquivo_primeira_pagina_ms': medir(cliente, '/tasks/archive?limite=50', cabecalhos, args.consultas)
+    }
+    print(json.dumps(resultado, indent=2))
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
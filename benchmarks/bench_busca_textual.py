@@ -0,0 +1,177 @@
+# benchmarks/bench_busca_textual.py
+"""
+Benchmark da busca textual (GET /tasks/search, SQLite FTS5) em um corpus sintético.
+
+Popula um banco SQLite temporário com N tarefas distribuídas entre vários usuários, com
+um vocabulário sintético de distribuição Zipf (poucas palavras muito comuns, muitas raras)
+e um usuário "pesado" dono de 10% das tarefas. O índice FTS5 é mantido pelos gatilhos
+durante a carga. Compara a latência de:
+- GET /tasks/search pelo app Flask (ranking bm25() e paginação no SQLite, destaque);
+- a alternativa ingênua com LIKE '%termo%' sobre título/descrição das tarefas do usuário;
+- LIKE '%termo%' sem o filtro de usuário (varredura completa da tabela).
+
+Uso:
+    python benchmarks/bench_busca_textual.py --linhas 1000000 --usuarios 1000 --consultas 200
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+SILABAS = ['ba', 'ca', 'da', 'fe', 'ga', 'li', 'ma', 'no', 'pa', 'ri', 'sa', 'ta', 'vo', 'xu', 'ze', 'tro', 'pla', 'cre']
+
+
+def gerar_vocabulario(tamanho, aleatorio):
+    """Palavras sintéticas distintas e os pesos acumulados de uma distribuição Zipf."""
+    palavras = set()
+    while len(palavras) < tamanho:
+        palavras.add(''.join(aleatorio.choices(SILABAS, k=aleatorio.randint(2, 4))))
+    palavras = sorted(palavras)
+    aleatorio.shuffle(palavras)
+    acumulado = []
+    total = 0.0
+    for posicao in range(tamanho):
+        total += 1.0 / (posicao + 1) ** 1.07
+        acumulado.append(total)
+    return palavras, acumulado
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def resumo(latencias):
+    return {
+        'p50_ms': round(percentil(latencias, 50) * 1000, 3),
+        'p95_ms': round(percentil(latencias, 95) * 1000, 3),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--vocabulario', type=int, default=20000)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-busca-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco() # Cria o esquema, o índice FTS5 e os gatilhos
+
+    aleatorio = random.Random(args.semente)
+    vocabulario, pesos = gerar_vocabulario(args.vocabulario, aleatorio)
+
+    def texto(minimo, maximo):
+        return ' '.join(aleatorio.choices(vocabulario, cum_weights=pesos, k=aleatorio.randint(minimo, maximo)))
+
+    def sortear_usuario():
+        # O usuário 1 é o usuário "pesado", com 10% das tarefas
+        return 1 if aleatorio.random() < 0.1 else aleatorio.randint(2, args.usuarios)
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute('PRAGMA synchronous=OFF')
+    conexao.executemany(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (?, ?, ?, 'x', 0, 0)",
+        [(i, f'Usuário {i}', f'u{i}@techflow.dev') for i in range(1, args.usuarios + 1)]
+    )
+
+    inicio = time.perf_counter()
+    bloco = []
+    for i in range(args.linhas):
+        bloco.append((texto(2, 5), texto(5, 30), sortear_usuario()))
+        if len(bloco) == 10000:
+            conexao.executemany(
+                "INSERT INTO tarefa (titulo, descricao, data_vencimento, prioridade, status, data_criacao, usuario_id) "
+                "VALUES (?, ?, '2025-01-01 00:00:00.000000', 'Média', 'a fazer', '2025-01-01 00:00:00.000000', ?)", bloco
+            )
+            bloco = []
+    if bloco:
+        conexao.executemany(
+            "INSERT INTO tarefa (titulo, descricao, data_vencimento, prioridade, status, data_criacao, usuario_id) "
+            "VALUES (?, ?, '2025-01-01 00:00:00.000000', 'Média', 'a fazer', '2025-01-01 00:00:00.000000', ?)", bloco
+        )
+    conexao.commit()
+    tempo_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    conexao.execute("INSERT INTO tarefa_fts(tarefa_fts) VALUES ('rebuild')")
+    conexao.commit()
+    tempo_rebuild = time.perf_counter() - inicio
+
+    # Termos de busca seguem a mesma distribuição do texto; metade das consultas é do usuário pesado
+    consultas = [
+        (1 if i % 2 == 0 else aleatorio.randint(2, args.usuarios), texto(1, 1))
+        for i in range(args.consultas)
+    ]
+
+    cliente = techflow.app.test_client()
+    tokens = {}
+    latencias_fts = []
+    for usuario_id, termo in consultas:
+        if usuario_id not in tokens:
+            with techflow.app.app_context():
+                tokens[usuario_id] = techflow.jwt.encode(
+                    {'sub': str(usuario_id), 'exp': int(time.time()) + 3600},
+                    techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+                )
+        inicio = time.perf_counter()
+        resposta = cliente.get(f'/tasks/search?q={termo}', headers={'Authorization': f'Bearer {tokens[usuario_id]}'})
+        latencias_fts.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.get_json()
+
+    latencias_like_usuario = []
+    latencias_like_total = []
+    for usuario_id, termo in consultas[:max(2, args.consultas // 10)]:
+        inicio = time.perf_counter()
+        conexao.execute(
+            "SELECT id FROM tarefa WHERE usuario_id = ? AND (titulo LIKE ? OR descricao LIKE ?)",
+            (usuario_id, f'%{termo}%', f'%{termo}%')
+        ).fetchall()
+        latencias_like_usuario.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        conexao.execute(
+            "SELECT id FROM tarefa WHERE titulo LIKE ? OR descricao LIKE ?",
+            (f'%{termo}%', f'%{termo}%')
+        ).fetchall()
+        latencias_like_total.append(time.perf_counter() - inicio)
+
+    resultado = {
+        'linhas': args.linhas,
+        'usuarios': args.usuarios,
+        'carga_com_gatilhos_s': round(tempo_carga, 2),
+        'rebuild_fts_s': round(tempo_rebuild, 2),
+        'tamanho_banco_mb': round(os.path.getsize(caminho_banco) / 1024 / 1024, 1),
+        'fts5_endpoint': resumo(latencias_fts),
+        'fts5_endpoint_usuario_pesado': resumo(latencias_fts[0::2]),
+        'fts5_endpoint_usuario_comum': resumo(latencias_fts[1::2]),
+        'like_por_usuario': resumo(latencias_like_usuario),
+        'like_por_usuario_pesado': resumo(latencias_like_usuario[0::2]),
+        'like_por_usuario_comum': resumo(latencias_like_usuario[1::2]),
+        'like_tabela_inteira': resumo(latencias_like_total)
+    }
+    print(json.dumps(resultado, indent=2))
+    conexao.close()
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
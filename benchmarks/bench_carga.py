@@ -0,0 +1,404 @@
+# benchmarks/bench_carga.py
+"""
+Suíte de carga reproduzível da API do TechFlow, para comparar execuções com uma linha de base.
+
+Popula um banco SQLite temporário com um conjunto sintético (U usuários × T tarefas, com
+status, prioridades e projetos variados) e executa, com várias threads, uma mistura
+realista de requisições contra o app Flask (test client, sem rede):
+- quadro: GET /tasks, revalidando com If-None-Match como o navegador;
+- criar: POST /tasks; mover: PATCH /tasks/<id>/status (drag-and-drop);
+- editar: PATCH /tasks/<id>; remover: DELETE /tasks/<id>;
+- login: POST /login (hash scrypt real); perfil: GET /perfil.
+Cada thread faz um número fixo de requisições sorteadas com a própria semente, então a
+sequência de operações se repete entre execuções. São reportados, por rota: vazão,
+p50/p95/p99 e erros. Os micro-benchmarks medem to_dict(), a serialização rápida
+(tarefa_json), jwt.decode (sem e com o cache de tokens) e o hash scrypt de senhas.
+
+A saída é JSON. Com --baseline, cada métrica é comparada com a de uma execução anterior,
+e o processo termina com código 1 se alguma piorar além de --tolerancia.
+
+Uso:
+    python benchmarks/bench_carga.py --usuarios 50 --tarefas 200 --threads 8 --requisicoes 500 --saida base.json
+    python benchmarks/bench_carga.py --usuarios 50 --tarefas 200 --threads 8 --requisicoes 500 --baseline base.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+MISTURA_PADRAO = 'quadro=30,criar=10,mover=30,editar=10,remover=5,login=1,perfil=14'
+STATUS = ['a fazer', 'fazendo', 'concluido']
+PESOS_STATUS = [4, 2, 4]
+PRIORIDADES = ['Baixa', 'Média', 'Alta']
+PALAVRAS = ['relatório', 'reunião', 'pagar', 'conta', 'revisar', 'código', 'enviar', 'proposta', 'cliente', 'ligar']
+SENHA = 'senha-bench-123'
+# Status esperados por rota; 404 em mover/editar/remover vem de uma tarefa removida por outra thread
+STATUS_ESPERADOS = {
+    'quadro': (200, 304),
+    'criar': (201,),
+    'mover': (200, 404),
+    'editar': (200, 404),
+    'remover': (200, 404),
+    'login': (200,),
+    'perfil': (200,),
+}
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def micro(funcao, repeticoes, por_chamada=1):
+    """Mediana, em µs por chamada, de 'repeticoes' execuções de funcao (após uma de aquecimento)."""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) / por_chamada)
+    return round(statistics.median(tempos) * 1e6, 2)
+
+
+def semear_banco(caminho_banco, args, hash_senha):
+    """Insere usuários, projetos e tarefas direto no SQLite (os gatilhos mantêm busca e contadores)."""
+    aleatorio = random.Random(args.semente)
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute('PRAGMA synchronous=OFF')
+    conexao.executemany(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (?, ?, ?, ?, 0, 0)",
+        [(u, f'Usuário {u}', f'u{u}@techflow.dev', hash_senha) for u in range(1, args.usuarios + 1)]
+    )
+    conexao.executemany(
+        "INSERT INTO projeto (usuario_id, nome, cor, data_criacao) VALUES (?, ?, NULL, '2025-01-01 00:00:00.000000')",
+        [(u, f'Projeto {p}') for u in range(1, args.usuarios + 1) for p in range(args.projetos)]
+    )
+    projetos = {}
+    for projeto_id, usuario_id in conexao.execute('SELECT id, usuario_id FROM projeto'):
+        projetos.setdefault(usuario_id, []).append(projeto_id)
+
+    def linhas():
+        for usuario_id in range(1, args.usuarios + 1):
+            for _ in range(args.tarefas):
+                status = aleatorio.choices(STATUS, weights=PESOS_STATUS)[0]
+                dia = aleatorio.randint(1, 28)
+                yield (
+                    ' '.join(aleatorio.choices(PALAVRAS, k=3)),
+                    ' '.join(aleatorio.choices(PALAVRAS, k=aleatorio.randint(0, 12))),
+                    f'2025-{aleatorio.randint(1, 12):02d}-{dia:02d} 00:00:00.000000',
+                    aleatorio.choice(PRIORIDADES),
+                    aleatorio.choice(projetos[usuario_id]) if projetos.get(usuario_id) and aleatorio.random() < 0.7 else None,
+                    status,
+                    # Conclusões recentes: o arquivamento não altera o conjunto durante a carga
+                    time.strftime('%Y-%m-%d %H:%M:%S.000000', time.gmtime()) if status == 'concluido' else None,
+                    usuario_id
+                )
+
+    conexao.executemany(
+        "INSERT INTO tarefa (titulo, descricao, data_vencimento, prioridade, projeto_id, status, data_criacao, data_conclusao, usuario_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, '2025-01-01 00:00:00.000000', ?, ?)", linhas()
+    )
+    conexao.commit()
+    ids_por_usuario = {}
+    for task_id, usuario_id in conexao.execute('SELECT id, usuario_id FROM tarefa'):
+        ids_por_usuario.setdefault(usuario_id, []).append(task_id)
+    conexao.close()
+    return ids_por_usuario
+
+
+def executar_carga(techflow, args, tokens, ids_por_usuario, mistura):
+    """Executa a mistura com args.threads threads; retorna latências e status por rota e o tempo total."""
+    operacoes, pesos = zip(*mistura.items())
+    latencias = {operacao: [] for operacao in operacoes}
+    codigos = {operacao: {} for operacao in operacoes}
+    lock_ids = threading.Lock()
+    inicio_geral = threading.Event()
+
+    def trabalhador(indice):
+        cliente = techflow.app.test_client()
+        aleatorio = random.Random(args.semente * 1000 + indice)
+        etags = {}
+        registros = []
+        inicio_geral.wait()
+        for _ in range(args.requisicoes):
+            operacao = aleatorio.choices(operacoes, weights=pesos)[0]
+            usuario_id = aleatorio.randint(1, args.usuarios)
+            cabecalhos = {'Authorization': f'Bearer {tokens[usuario_id]}'}
+            task_id = None
+            if operacao in ('mover', 'editar', 'remover'):
+                with lock_ids:
+                    ids = ids_por_usuario.get(usuario_id)
+                    if ids:
+                        posicao = aleatorio.randrange(len(ids))
+                        task_id = ids[posicao]
+                        if operacao == 'remover':
+                            ids[posicao] = ids[-1]
+                            ids.pop()
+                if task_id is None:
+                    operacao = 'criar'
+
+            inicio = time.perf_counter()
+            if operacao == 'quadro':
+                if usuario_id in etags:
+                    cabecalhos['If-None-Match'] = etags[usuario_id]
+                resposta = cliente.get('/tasks', headers=cabecalhos)
+                if resposta.status_code == 200:
+                    etags[usuario_id] = resposta.headers.get('ETag')
+            elif operacao == 'criar':
+                resposta = cliente.post('/tasks', headers=cabecalhos, json={
+                    'titulo': ' '.join(aleatorio.choices(PALAVRAS, k=3)),
+                    'data_vencimento': f'2025-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}',
+                    'prioridade': aleatorio.choice(PRIORIDADES),
+                    'projeto': f'Projeto {aleatorio.randrange(max(1, args.projetos))}'
+                })
+            elif operacao == 'mover':
+                resposta = cliente.patch(f'/tasks/{task_id}/status', headers=cabecalhos, json={'status': aleatorio.choice(STATUS)})
+            elif operacao == 'editar':
+                resposta = cliente.patch(f'/tasks/{task_id}', headers=cabecalhos, json={
+                    'titulo': ' '.join(aleatorio.choices(PALAVRAS, k=4)), 'prioridade': aleatorio.choice(PRIORIDADES)
+                })
+            elif operacao == 'remover':
+                resposta = cliente.delete(f'/tasks/{task_id}', headers=cabecalhos)
+            elif operacao == 'login':
+                resposta = cliente.post('/login', json={'email': f'u{usuario_id}@techflow.dev', 'senha': SENHA})
+            else:
+                resposta = cliente.get('/perfil', headers=cabecalhos)
+            duracao = time.perf_counter() - inicio
+
+            if operacao == 'criar' and resposta.status_code == 201:
+                with lock_ids:
+                    ids_por_usuario.setdefault(usuario_id, []).append(resposta.get_json()['tarefa']['id'])
+            registros.append((operacao, duracao, resposta.status_code))
+
+        with lock_ids:
+            for operacao, duracao, codigo in registros:
+                latencias[operacao].append(duracao)
+                codigos[operacao][codigo] = codigos[operacao].get(codigo, 0) + 1
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    inicio = time.perf_counter()
+    inicio_geral.set()
+    for thread in threads:
+        thread.join()
+    return latencias, codigos, time.perf_counter() - inicio
+
+
+def resumo_rotas(latencias, codigos, tempo_total):
+    rotas = {}
+    for operacao, valores in latencias.items():
+        if not valores:
+            continue
+        esperados = STATUS_ESPERADOS[operacao]
+        rotas[operacao] = {
+            'requisicoes': len(valores),
+            'por_segundo': round(len(valores) / tempo_total, 1),
+            'p50_ms': round(percentil(valores, 50) * 1000, 2),
+            'p95_ms': round(percentil(valores, 95) * 1000, 2),
+            'p99_ms': round(percentil(valores, 99) * 1000, 2),
+            'status': {str(codigo): quantidade for codigo, quantidade in sorted(codigos[operacao].items())},
+            'erros': sum(quantidade for codigo, quantidade in codigos[operacao].items() if codigo not in esperados)
+        }
+    todas = [valor for valores in latencias.values() for valor in valores]
+    total = {
+        'requisicoes': len(todas),
+        'por_segundo': round(len(todas) / tempo_total, 1),
+        'p50_ms': round(percentil(todas, 50) * 1000, 2),
+        'p95_ms': round(percentil(todas, 95) * 1000, 2),
+        'p99_ms': round(percentil(todas, 99) * 1000, 2),
+        'erros': sum(rota['erros'] for rota in rotas.values())
+    }
+    return rotas, total
+
+
+def executar_micro(techflow, args, tokens):
+    """Micro-benchmarks, em µs por chamada (ms no caso do scrypt)."""
+    from werkzeug.security import generate_password_hash, check_password_hash
+    app = techflow.app
+    resultado = {}
+    with app.app_context():
+        tarefas = techflow.Tarefa.query.filter_by(usuario_id=1).limit(1000).all()
+        linhas = techflow.db.session.query(*techflow.COLUNAS_JSON_TAREFA).filter(techflow.Tarefa.usuario_id == 1).limit(1000).all()
+        if tarefas:
+            resultado['to_dict_us'] = micro(lambda: [tarefa.to_dict() for tarefa in tarefas], args.micro_repeticoes, len(tarefas))
+            resultado['tarefa_json_us'] = micro(lambda: [techflow.tarefa_json(linha) for linha in linhas], args.micro_repeticoes, len(linhas))
+
+    chave = app.config['JWT_SECRET_KEY']
+    token = tokens[1]
+    resultado['jwt_decode_us'] = micro(
+        lambda: [techflow.jwt.decode(token, chave, algorithms=['HS256']) for _ in range(100)], args.micro_repeticoes, 100
+    )
+    resultado['jwt_decode_cache_us'] = micro(
+        lambda: [techflow.cache_tokens.decodificar(token, chave, ['HS256']) for _ in range(100)], args.micro_repeticoes, 100
+    )
+
+    metodo = app.config['SENHA_HASH_METODO']
+    hash_senha = generate_password_hash(SENHA, method=metodo)
+    repeticoes_hash = max(3, args.micro_repeticoes // 10)
+    resultado['scrypt_hash_ms'] = round(micro(lambda: generate_password_hash(SENHA, method=metodo), repeticoes_hash) / 1000, 2)
+    resultado['scrypt_verificacao_ms'] = round(micro(lambda: check_password_hash(hash_senha, SENHA), repeticoes_hash) / 1000, 2)
+    resultado['scrypt_metodo'] = metodo
+    return resultado
+
+
+def comparar(resultado, baseline, tolerancia, piso_ms):
+    """
+    Compara com uma execução anterior: latências (p95 e micro-benchmarks) pioram quando
+    sobem, vazões quando caem. Retorna a lista de métricas e a das regressões além da tolerância;
+    latências de rota que subiram menos de piso_ms (ruído de rotas rápidas) não contam.
+    """
+    metricas = []
+    for rota, atual in resultado['rotas'].items():
+        anterior = baseline.get('rotas', {}).get(rota)
+        if not anterior:
+            continue
+        metricas.append((f'rotas.{rota}.p95_ms', anterior['p95_ms'], atual['p95_ms'], True))
+        metricas.append((f'rotas.{rota}.por_segundo', anterior['por_segundo'], atual['por_segundo'], False))
+    if baseline.get('total'):
+        metricas.append(('total.por_segundo', baseline['total']['por_segundo'], resultado['total']['por_segundo'], False))
+    for nome, valor in resultado['micro'].items():
+        anterior = baseline.get('micro', {}).get(nome)
+        if isinstance(valor, (int, float)) and isinstance(anterior, (int, float)):
+            metricas.append((f'micro.{nome}', anterior, valor, True))
+
+    comparacao = []
+    regressoes = []
+    for nome, anterior, atual, menor_melhor in metricas:
+        if not anterior:
+            continue
+        razao = atual / anterior
+        piorou = razao > 1 + tolerancia if menor_melhor else razao < 1 - tolerancia
+        if piorou and nome.startswith('rotas.') and nome.endswith('_ms') and atual - anterior < piso_ms:
+            piorou = False
+        item = {'metrica': nome, 'baseline': anterior, 'atual': atual, 'razao': round(razao, 3), 'regressao': piorou}
+        comparacao.append(item)
+        if piorou:
+            regressoes.append(item)
+    return comparacao, regressoes
+
+
+def informacoes_ambiente():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO_BACKEND, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, default=50)
+    parser.add_argument('--tarefas', type=int, default=200, help='Tarefas por usuário')
+    parser.add_argument('--projetos', type=int, default=5, help='Projetos por usuário')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requisicoes', type=int, default=500, help='Requisições por thread')
+    parser.add_argument('--mistura', default=MISTURA_PADRAO, help='Pesos das operações (rota=peso, separados por vírgula)')
+    parser.add_argument('--perfil', default='producao', help="Perfil SQLite ('padrao' ou 'producao')")
+    parser.add_argument('--pool-senhas', type=int, default=0, help='Processos do pool de hash de senhas (0 = na própria thread)')
+    parser.add_argument('--micro-repeticoes', type=int, default=50)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo onde gravar o resultado em JSON')
+    parser.add_argument('--baseline', help='Resultado JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='Variação relativa tolerada antes de acusar regressão')
+    parser.add_argument('--piso-ms', type=float, default=1.0, help='Aumento mínimo (ms) do p95 de uma rota para acusar regressão')
+    args = parser.parse_args()
+
+    mistura = {}
+    for item in args.mistura.split(','):
+        operacao, peso = item.split('=')
+        if operacao not in STATUS_ESPERADOS:
+            parser.error(f'Operação desconhecida na mistura: {operacao}')
+        mistura[operacao] = float(peso)
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-carga-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SQLITE_PERFIL'] = args.perfil
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = str(args.pool_senhas)
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    from werkzeug.security import generate_password_hash
+    techflow.migrar_banco()
+
+    inicio = time.perf_counter()
+    ids_por_usuario = semear_banco(
+        caminho_banco, args, generate_password_hash(SENHA, method=techflow.app.config['SENHA_HASH_METODO'])
+    )
+    tempo_semeadura = time.perf_counter() - inicio
+
+    expiracao = int(time.time()) + 3600
+    tokens = {
+        usuario_id: techflow.jwt.encode(
+            {'sub': str(usuario_id), 'exp': expiracao, 'nome': f'Usuário {usuario_id}', 'email': f'u{usuario_id}@techflow.dev'},
+            techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+        )
+        for usuario_id in range(1, args.usuarios + 1)
+    }
+
+    micro_resultados = executar_micro(techflow, args, tokens)
+    latencias, codigos, tempo_total = executar_carga(techflow, args, tokens, ids_por_usuario, mistura)
+    rotas, total = resumo_rotas(latencias, codigos, tempo_total)
+
+    resultado = {
+        'configuracao': {
+            'usuarios': args.usuarios, 'tarefas_por_usuario': args.tarefas, 'projetos_por_usuario': args.projetos,
+            'threads': args.threads, 'requisicoes_por_thread': args.requisicoes, 'mistura': mistura,
+            'perfil': args.perfil, 'pool_senhas': args.pool_senhas, 'semente': args.semente
+        },
+        'ambiente': informacoes_ambiente(),
+        'semeadura_s': round(tempo_semeadura, 2),
+        'duracao_s': round(tempo_total, 2),
+        'total': total,
+        'rotas': rotas,
+        'micro': micro_resultados
+    }
+
+    regressoes = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as arquivo:
+            baseline = json.load(arquivo)
+        resultado['comparacao'], regressoes = comparar(resultado, baseline, args.tolerancia, args.piso_ms)
+
+    print(f"{'rota':<8} {'req':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for rota, r in list(rotas.items()) + [('total', total)]:
+        print(f"{rota:<8} {r['requisicoes']:>6} {r['por_segundo']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['erros']:>6}")
+    for item in regressoes:
+        print(f"REGRESSÃO {item['metrica']}: {item['baseline']} -> {item['atual']} ({item['razao']}x)")
+
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(saida + '\n')
+    print(saida)
+    shutil.rmtree(diretorio, ignore_errors=True)
+    sys.exit(1 if regressoes else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_inicializacao.py
+"""
+Benchmark do tempo de inicialização de um worker: do início do import de backend/app.py
+até a primeira requisição atendida (GET /tasks autenticado, que abre a primeira conexão).
+
+O banco temporário é migrado uma vez (como no deploy) e populado com N tarefas. Depois,
+K processos são iniciados ao mesmo tempo, como um servidor subindo K workers, e cada um mede:
+- import_ms: import do módulo (bibliotecas, configuração, modelos e rotas);
+- primeira_requisicao_ms: primeira requisição (inicialização adiada + conexão + consulta);
+- total_ms: soma dos dois;
+- processo_ms: tempo de parede do processo visto de fora (inclui o interpretador).
+
+Uso:
+    python benchmarks/bench_inicializacao.py --workers 1,4,8 --repeticoes 5 --tarefas 100000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def executar_worker():
+    """Executado em cada processo filho: mede o import e a primeira requisição."""
+    inicio = time.perf_counter()
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    importado = time.perf_counter()
+
+    token = techflow.jwt.encode(
+        {'sub': '1', 'exp': int(time.time()) + 3600}, techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+    )
+    resposta = techflow.app.test_client().get('/tasks?limite=50', headers={'Authorization': f'Bearer {token}'})
+    atendido = time.perf_counter()
+    assert resposta.status_code == 200, resposta.get_data(as_text=True)
+    return {
+        'import_ms': round((importado - inicio) * 1000, 1),
+        'primeira_requisicao_ms': round((atendido - importado) * 1000, 1),
+        'total_ms': round((atendido - inicio) * 1000, 1)
+    }
+
+
+def preparar_banco(caminho_banco, tarefas):
+    """Migra o banco (passo de deploy) e insere as tarefas do usuário 1."""
+    subprocess.run(
+        [sys.executable, '-c', f'import sys; sys.path.insert(0, {DIRETORIO_BACKEND!r}); import app; app.migrar_banco()'],
+        env=dict(os.environ, TECHFLOW_DATABASE_URI='sqlite:///' + caminho_banco), check=True, capture_output=True
+    )
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (1, 'Bench', 'bench@techflow.dev', 'x', 0, 0)"
+    )
+    conexao.executemany(
+        "INSERT INTO tarefa (titulo, data_vencimento, prioridade, status, data_criacao, usuario_id) "
+        "VALUES (?, '2025-06-01 00:00:00.000000', 'Média', ?, '2025-01-01 00:00:00.000000', 1)",
+        ((f'Tarefa {i}', ('a fazer', 'fazendo', 'concluido')[i % 3]) for i in range(tarefas))
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,4,8', help='Quantidades de processos iniciados simultaneamente')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--tarefas', type=int, default=100000)
+    parser.add_argument('--executar', action='store_true', help=argparse.SUPPRESS) # Uso interno: processo filho
+    args = parser.parse_args()
+
+    if args.executar:
+        print(json.dumps(executar_worker()))
+        return
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_banco = os.path.join(diretorio, 'bench.db')
+        preparar_banco(caminho_banco, args.tarefas)
+        ambiente = dict(os.environ)
+        ambiente['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+        ambiente['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+
+        for workers in [int(quantidade) for quantidade in args.workers.split(',')]:
+            medicoes = []
+            for _ in range(args.repeticoes):
+                inicio = time.perf_counter()
+                processos = [
+                    subprocess.Popen([sys.executable, __file__, '--executar'], env=ambiente,
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                    for _ in range(workers)
+                ]
+                for processo in processos:
+                    saida, _ = processo.communicate()
+                    medicao = json.loads(saida.strip().splitlines()[-1])
+                    medicao['processo_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+                    medicoes.append(medicao)
+            resultado = {'workers': workers, 'tarefas': args.tarefas}
+            for campo in ('import_ms', 'primeira_requisicao_ms', 'total_ms', 'processo_ms'):
+                valores = [medicao[campo] for medicao in medicoes]
+                resultado[campo] = round(statistics.median(valores), 1)
+                resultado[campo.replace('_ms', '_max_ms')] = max(valores)
+            resultados.append(resultado)
+
+    print(f"{'workers':>7} {'import ms':>10} {'1ª req ms':>10} {'total ms':>9} {'total máx':>10} {'processo ms':>12}")
+    for r in resultados:
+        print(f"{r['workers']:>7} {r['import_ms']:>10} {r['primeira_requisicao_ms']:>10} {r['total_ms']:>9} {r['total_max_ms']:>10} {r['processo_ms']:>12}")
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
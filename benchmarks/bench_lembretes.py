@@ -0,0 +1,133 @@
+# benchmarks/bench_lembretes.py
+"""
+Benchmark do agendador de lembretes de vencimento (verificar_vencimentos).
+
+Para cada tamanho de tabela, popula um banco SQLite temporário com N tarefas abertas e
+concluídas, de vários usuários, com vencimentos espalhados por dois anos em volta de hoje
+(horários aleatórios, para que cada janela tenha poucas tarefas). Depois mede:
+- verificacao_ms: mediana de uma verificação com o relógio avançando --passo-segundos
+  (o intervalo do agendador), com as notificações criadas em cada uma;
+- recuperacao_ms: a primeira verificação depois de uma parada de --parada-horas;
+- varredura_ms: a alternativa sem índice nem marco, que lê todas as tarefas abertas já
+  vencidas e compara com as notificações existentes (custo proporcional à tabela).
+
+Uso:
+    python benchmarks/bench_lembretes.py --tamanhos 10000,100000,1000000 --verificacoes 20
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+STATUS = ['a fazer', 'fazendo', 'concluido']
+FORMATO = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def popular(caminho_banco, tarefas, usuarios, aleatorio, agora):
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute('PRAGMA synchronous=OFF')
+    conexao.execute('DELETE FROM notificacao')
+    conexao.execute('DELETE FROM marco_lembretes')
+    conexao.execute('DELETE FROM tarefa')
+    conexao.execute('DELETE FROM usuario')
+    conexao.executemany(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (?, 'Bench', ?, 'x', 0, 0)",
+        [(u, f'u{u}@techflow.dev') for u in range(1, usuarios + 1)]
+    )
+
+    def linhas():
+        for i in range(tarefas):
+            vencimento = agora + timedelta(seconds=aleatorio.randint(-365 * 86400, 365 * 86400))
+            yield (f'Tarefa {i}', vencimento.strftime(FORMATO), aleatorio.choice(STATUS), aleatorio.randint(1, usuarios))
+
+    conexao.executemany(
+        "INSERT INTO tarefa (titulo, data_vencimento, prioridade, status, data_criacao, usuario_id) "
+        "VALUES (?, ?, 'Média', ?, '2025-01-01 00:00:00.000000', ?)", linhas()
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', default='10000,100000,1000000', help='Quantidades de tarefas na tabela')
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--verificacoes', type=int, default=20, help='Verificações medidas por tamanho')
+    parser.add_argument('--passo-segundos', type=int, default=60, help='Avanço do relógio entre verificações')
+    parser.add_argument('--parada-horas', type=int, default=12, help='Duração da parada simulada antes da recuperação')
+    parser.add_argument('--perfil', default='producao', help="Perfil SQLite ('padrao' ou 'producao')")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-lembretes-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SQLITE_PERFIL'] = args.perfil
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+
+    resultados = []
+    for tamanho in [int(quantidade) for quantidade in args.tamanhos.split(',')]:
+        aleatorio = random.Random(args.semente)
+        agora = datetime.utcnow()
+        popular(caminho_banco, tamanho, args.usuarios, aleatorio, agora)
+
+        with techflow.app.app_context():
+            techflow.verificar_vencimentos(agora) # Primeira execução: cria os marcos
+            latencias = []
+            criadas = []
+            for i in range(1, args.verificacoes + 1):
+                inicio = time.perf_counter()
+                resultado = techflow.verificar_vencimentos(agora + timedelta(seconds=i * args.passo_segundos))
+                latencias.append(time.perf_counter() - inicio)
+                criadas.append(sum(resultado.values()))
+
+            parada = agora + timedelta(seconds=args.verificacoes * args.passo_segundos, hours=args.parada_horas)
+            inicio = time.perf_counter()
+            recuperadas = sum(techflow.verificar_vencimentos(parada).values())
+            tempo_recuperacao = time.perf_counter() - inicio
+
+            limite_atraso = (parada - timedelta(hours=techflow.app.config['LEMBRETES_ATRASO_APOS_HORAS'])).strftime(FORMATO)
+            inicio = time.perf_counter()
+            techflow.db.session.execute(techflow.db.text(
+                "SELECT tarefa.id FROM tarefa WHERE status != 'concluido' AND data_vencimento < :limite "
+                "AND NOT EXISTS (SELECT 1 FROM notificacao WHERE notificacao.tarefa_id = tarefa.id AND notificacao.tipo = 'atrasada')"
+            ), {'limite': limite_atraso}).all()
+            tempo_varredura = time.perf_counter() - inicio
+            techflow.db.session.rollback()
+
+        resultados.append({
+            'tarefas': tamanho,
+            'verificacao_ms': round(statistics.median(latencias) * 1000, 2),
+            'verificacao_max_ms': round(max(latencias) * 1000, 2),
+            'notificacoes_por_verificacao': round(statistics.mean(criadas), 1),
+            'recuperacao_ms': round(tempo_recuperacao * 1000, 1),
+            'notificacoes_recuperacao': recuperadas,
+            'varredura_ms': round(tempo_varredura * 1000, 1)
+        })
+
+    print(f"{'tarefas':>9} {'verif. ms':>10} {'máx ms':>8} {'notif/verif':>12} {'recup. ms':>10} {'recup.':>7} {'varredura ms':>13}")
+    for r in resultados:
+        print(f"{r['tarefas']:>9} {r['verificacao_ms']:>10} {r['verificacao_max_ms']:>8} {r['notificacoes_por_verificacao']:>12} "
+              f"{r['recuperacao_ms']:>10} {r['notificacoes_recuperacao']:>7} {r['varredura_ms']:>13}")
+    print(json.dumps(resultados, indent=2))
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_logging.py
+"""
+Benchmark do custo de logging nas movimentações de status (PATCH /tasks/<id>).
+
+Executa a mesma sequência de PATCHs em processos separados, um por modo de log:
+- 'texto': handler síncrono padrão (formatação e escrita na thread da requisição);
+- 'estruturado': fila + thread de escrita em JSON, com as regras de LOG_ROTAS;
+- 'desligado': logging.disable, como referência do custo zero.
+A saída de log de cada processo vai para um arquivo temporário (escrita real em disco).
+
+Uso:
+    python benchmarks/bench_logging.py --requisicoes 5000 --threads 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def executar_modo(modo, requisicoes, threads):
+    """Executa a carga dentro deste processo, com o modo de log já definido no ambiente."""
+    import logging
+    if modo == 'desligado':
+        logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+
+    cliente = techflow.app.test_client()
+    cabecalhos = []
+    tarefas = []
+    for i in range(threads):
+        resposta = cliente.post('/cadastro', json={
+            'nome': f'Bench {i}', 'email': f'bench{i}@techflow.dev',
+            'senha': 'senha-bench-123', 'confirmarSenha': 'senha-bench-123'
+        })
+        cabecalho = {'Authorization': f"Bearer {resposta.get_json()['token']}"}
+        resposta = cliente.post('/tasks', headers=cabecalho, json={
+            'titulo': 'Movida', 'data_vencimento': '2025-06-01', 'prioridade': 'Média'
+        })
+        cabecalhos.append(cabecalho)
+        tarefas.append(resposta.get_json()['tarefa']['id'])
+
+    latencias = [[] for _ in range(threads)]
+
+    def trabalhador(indice):
+        cliente_thread = techflow.app.test_client()
+        for i in range(requisicoes // threads):
+            inicio = time.perf_counter()
+            resposta = cliente_thread.patch(
+                f'/tasks/{tarefas[indice]}', headers=cabecalhos[indice], json={'concluida': i % 2 == 0}
+            )
+            latencias[indice].append(time.perf_counter() - inicio)
+            assert resposta.status_code == 200, resposta.get_json()
+
+    trabalhadores = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    todas = [latencia for lista in latencias for latencia in lista]
+    return {
+        'modo': modo,
+        'requisicoes_por_segundo': round(len(todas) / duracao, 1),
+        'p50_ms': round(percentil(todas, 50) * 1000, 3),
+        'p99_ms': round(percentil(todas, 99) * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requisicoes', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--modos', default='desligado,texto,estruturado')
+    parser.add_argument('--executar', help=argparse.SUPPRESS) # Uso interno: roda um modo neste processo
+    args = parser.parse_args()
+
+    if args.executar:
+        print(json.dumps(executar_modo(args.executar, args.requisicoes, args.threads)))
+        return
+
+    resultados = []
+    for modo in args.modos.split(','):
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = dict(os.environ)
+            ambiente['TECHFLOW_LOG_MODO'] = 'texto' if modo == 'desligado' else modo
+            ambiente['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + os.path.join(diretorio, 'bench.db')
+            ambiente['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+            ambiente['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+            with open(os.path.join(diretorio, 'app.log'), 'w') as arquivo_log:
+                saida = subprocess.run(
+                    [sys.executable, __file__, '--executar', modo, '--requisicoes', str(args.requisicoes),
+                     '--threads', str(args.threads)],
+                    env=ambiente, stdout=subprocess.PIPE, stderr=arquivo_log, text=True, check=True
+                )
+            resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+            resultado['bytes_de_log'] = os.path.getsize(os.path.join(diretorio, 'app.log'))
+            resultados.append(resultado)
+
+    print(f"{'modo':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'bytes de log':>13}")
+    for r in resultados:
+        print(f"{r['modo']:<12} {r['requisicoes_por_segundo']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['bytes_de_log']:>13}")
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
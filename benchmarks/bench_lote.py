@@ -0,0 +1,118 @@
+# benchmarks/bench_lote.py
+"""
+Benchmark de POST /tasks/batch: operações por segundo em lotes de --tamanho operações.
+
+Para um usuário, mede pelo app Flask (test client, sem rede), em --lotes lotes de cada tipo:
+- criar: lotes só de criações;
+- status: lotes de mudanças de status das tarefas criadas;
+- atualizar: lotes de edições de título e prioridade;
+- deletar: lotes de remoções.
+Cada lote roda em uma transação, com os gatilhos (busca textual, contadores, versão) e o
+log de alterações. O resultado é a mediana de operações por segundo de cada tipo; com
+--minimo-ops, o script termina com erro se algum tipo ficar abaixo do mínimo.
+
+Uso:
+    python benchmarks/bench_lote.py --tamanho 5000 --lotes 5 --minimo-ops 10000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+STATUS = ['a fazer', 'fazendo', 'concluido']
+PRIORIDADES = ['Baixa', 'Média', 'Alta']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanho', type=int, default=5000, help='Operações por lote')
+    parser.add_argument('--lotes', type=int, default=5, help='Lotes medidos por tipo de operação')
+    parser.add_argument('--minimo-ops', type=float, default=0, help='Operações por segundo exigidas de cada tipo (0 não confere)')
+    parser.add_argument('--perfil', default='producao', help="Perfil SQLite ('padrao' ou 'producao')")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-lote-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SQLITE_PERFIL'] = args.perfil
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+    os.environ['TECHFLOW_LEMBRETES_ATIVO'] = '0'
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (1, 'Bench', 'bench@techflow.dev', 'x', 0, 0)"
+    )
+    conexao.commit()
+    conexao.close()
+
+    with techflow.app.app_context():
+        token = techflow.jwt.encode(
+            {'sub': '1', 'exp': int(time.time()) + 3600}, techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+        )
+    cabecalhos = {'Authorization': f'Bearer {token}'}
+    cliente = techflow.app.test_client()
+    aleatorio = random.Random(args.semente)
+
+    def executar(operacoes):
+        inicio = time.perf_counter()
+        resposta = cliente.post('/tasks/batch', headers=cabecalhos, json={'operacoes': operacoes})
+        duracao = time.perf_counter() - inicio
+        dados = resposta.get_json()
+        assert resposta.status_code == 200 and dados['falhas'] == 0, dados.get('erro') or dados['resultados'][:3]
+        return len(operacoes) / duracao, dados['resultados']
+
+    taxas = {'criar': [], 'status': [], 'atualizar': [], 'deletar': []}
+    lotes_ids = []
+    for i in range(args.lotes):
+        taxa, resultados = executar([
+            {'op': 'criar', 'dados': {
+                'titulo': f'Tarefa {i}-{j}', 'data_vencimento': f'2025-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}',
+                'prioridade': aleatorio.choice(PRIORIDADES)
+            }}
+            for j in range(args.tamanho)
+        ])
+        taxas['criar'].append(taxa)
+        lotes_ids.append([resultado['id'] for resultado in resultados])
+    for ids in lotes_ids:
+        taxas['status'].append(executar([{'op': 'status', 'id': task_id, 'status': aleatorio.choice(STATUS)} for task_id in ids])[0])
+    for ids in lotes_ids:
+        taxas['atualizar'].append(executar([
+            {'op': 'atualizar', 'id': task_id, 'dados': {'titulo': f'Editada {task_id}', 'prioridade': aleatorio.choice(PRIORIDADES)}}
+            for task_id in ids
+        ])[0])
+    for ids in lotes_ids:
+        taxas['deletar'].append(executar([{'op': 'deletar', 'id': task_id} for task_id in ids])[0])
+
+    resultado = {
+        'perfil': args.perfil,
+        'tamanho_lote': args.tamanho,
+        'lotes': args.lotes,
+        'ops_por_segundo': {tipo: round(statistics.median(valores)) for tipo, valores in taxas.items()}
+    }
+    print(json.dumps(resultado, indent=2))
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    abaixo = {tipo: ops for tipo, ops in resultado['ops_por_segundo'].items() if ops < args.minimo_ops}
+    if abaixo:
+        print(f"Abaixo do mínimo de {args.minimo_ops:g} operações/s: {abaixo}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/bench_mover_status.py
+"""
+Micro-benchmark do movimento de tarefas entre colunas do quadro (drag-and-drop).
+
+Compara, em movimentos por segundo, para um usuário com N tarefas:
+- rota de edição: PATCH /tasks/<id> com concluida (SELECT, objeto ORM, commit e to_dict), que só
+  alterna entre 'a fazer' e 'concluido' ({"status": ...} nela é recusado com 400);
+- rota de movimento: PATCH /tasks/<id>/status com a versão lida (um UPDATE condicional).
+
+Depois, várias threads ("abas" do mesmo usuário) movem as mesmas tarefas ao mesmo tempo pela
+rota de movimento, cada uma com as versões que leu, e o benchmark confere que nenhuma
+atualização se perdeu: a soma das versões das tarefas cresce exatamente o número de
+movimentos aceitos, e os demais foram recusados com 409.
+
+Uso:
+    python benchmarks/bench_mover_status.py --tarefas 1000 --movimentos 5000 --abas 4 --perfil producao
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+STATUS = ['a fazer', 'fazendo', 'concluido']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tarefas', type=int, default=1000)
+    parser.add_argument('--movimentos', type=int, default=5000, help='Movimentos medidos por rota')
+    parser.add_argument('--abas', type=int, default=4, help='Threads movendo as mesmas tarefas na etapa concorrente')
+    parser.add_argument('--perfil', default='producao', help="Perfil SQLite ('padrao' ou 'producao')")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-mover-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SQLITE_PERFIL'] = args.perfil
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.execute(
+        "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (1, 'Bench', 'bench@techflow.dev', 'x', 0, 0)"
+    )
+    conexao.executemany(
+        "INSERT INTO tarefa (titulo, data_vencimento, prioridade, status, data_criacao, usuario_id) "
+        "VALUES (?, '2025-06-01 00:00:00.000000', 'Média', 'a fazer', '2025-01-01 00:00:00.000000', 1)",
+        ((f'Tarefa {i}',) for i in range(args.tarefas))
+    )
+    conexao.commit()
+    conexao.close()
+
+    with techflow.app.app_context():
+        token = techflow.jwt.encode(
+            {'sub': '1', 'exp': int(time.time()) + 3600}, techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+        )
+    cabecalhos = {'Authorization': f'Bearer {token}'}
+    cliente = techflow.app.test_client()
+
+    def ler_quadro(cliente_quadro=cliente):
+        """Status e versão de cada tarefa, como o cliente os vê depois de carregar o quadro."""
+        quadro = cliente_quadro.get('/tasks', headers=cabecalhos).get_json()
+        return {tarefa['id']: [tarefa['status'], tarefa['versao']] for status in STATUS for tarefa in quadro[status]}
+
+    aleatorio = random.Random(args.semente)
+    tarefas = ler_quadro()
+    ids = list(tarefas)
+
+    def proximo_status(atual):
+        return aleatorio.choice([status for status in STATUS if status != atual])
+
+    # 1) Rota de edição
+    inicio = time.perf_counter()
+    for _ in range(args.movimentos):
+        task_id = aleatorio.choice(ids)
+        concluida = tarefas[task_id][0] != 'concluido'
+        resposta = cliente.patch(f'/tasks/{task_id}', headers=cabecalhos, json={'concluida': concluida})
+        assert resposta.status_code == 200, resposta.get_json()
+        tarefas[task_id][0] = resposta.get_json()['tarefa']['status']
+    tempo_edicao = time.perf_counter() - inicio
+
+    # 2) Rota de movimento (com a versão lida)
+    tarefas = ler_quadro()
+    inicio = time.perf_counter()
+    for _ in range(args.movimentos):
+        task_id = aleatorio.choice(ids)
+        status = proximo_status(tarefas[task_id][0])
+        resposta = cliente.patch(f'/tasks/{task_id}/status', headers=cabecalhos, json={'status': status, 'versao': tarefas[task_id][1]})
+        assert resposta.status_code == 200, resposta.get_json()
+        tarefas[task_id] = [status, resposta.get_json()['versao']]
+    tempo_movimento = time.perf_counter() - inicio
+
+    # 3) Abas concorrentes sobre as mesmas tarefas (poucas, para forçar conflitos)
+    disputadas = ids[:max(1, min(len(ids), args.abas * 2))]
+    versoes_antes = sum(versao for task_id, (_, versao) in ler_quadro().items() if task_id in disputadas)
+    aceitos = [0] * args.abas
+    conflitos = [0] * args.abas
+    erros = [0] * args.abas
+    movimentos_por_aba = max(1, args.movimentos // args.abas)
+
+    def aba(indice):
+        cliente_aba = techflow.app.test_client()
+        aleatorio_aba = random.Random(indice)
+        vistas = ler_quadro(cliente_aba)
+        for _ in range(movimentos_por_aba):
+            task_id = aleatorio_aba.choice(disputadas)
+            status = aleatorio_aba.choice([s for s in STATUS if s != vistas[task_id][0]])
+            resposta = cliente_aba.patch(f'/tasks/{task_id}/status', headers=cabecalhos, json={'status': status, 'versao': vistas[task_id][1]})
+            dados = resposta.get_json()
+            if resposta.status_code == 200:
+                aceitos[indice] += 1
+                vistas[task_id] = [status, dados['versao']]
+            elif resposta.status_code == 409:
+                conflitos[indice] += 1
+                vistas[task_id] = [dados['status'], dados['versao']] # Como o frontend ao recarregar o quadro
+            else:
+                erros[indice] += 1
+
+    threads = [threading.Thread(target=aba, args=(i,)) for i in range(args.abas)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tempo_concorrente = time.perf_counter() - inicio
+    versoes_depois = sum(versao for task_id, (_, versao) in ler_quadro().items() if task_id in disputadas)
+
+    resultado = {
+        'perfil': args.perfil,
+        'tarefas': args.tarefas,
+        'movimentos': args.movimentos,
+        'rota_edicao_por_segundo': round(args.movimentos / tempo_edicao, 1),
+        'rota_movimento_por_segundo': round(args.movimentos / tempo_movimento, 1),
+        'aceleracao': round(tempo_edicao / tempo_movimento, 2),
+        'concorrente': {
+            'abas': args.abas,
+            'tarefas_disputadas': len(disputadas),
+            'aceitos': sum(aceitos),
+            'conflitos_409': sum(conflitos),
+            'erros': sum(erros),
+            'tentativas_por_segundo': round(args.abas * movimentos_por_aba / tempo_concorrente, 1),
+            'atualizacoes_perdidas': sum(aceitos) - (versoes_depois - versoes_antes)
+        }
+    }
+    print(json.dumps(resultado, indent=2))
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
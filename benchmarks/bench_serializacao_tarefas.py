@@ -0,0 +1,155 @@
+# benchmarks/bench_serializacao_tarefas.py
+"""
+Benchmark da serialização do quadro de tarefas (GET /tasks) com 1k, 10k e 100k tarefas.
+
+Compara, para um usuário com N tarefas:
+- caminho antigo: objetos ORM Tarefa, to_dict() com isoformat() por data e jsonify;
+- caminho novo: tuplas de colunas, datas no texto do SQLite e JSON escrito por linha
+  (lista_tarefas_json/corpo_json, as mesmas funções usadas pelo endpoint);
+- o endpoint GET /tasks completo, com o cache de snapshots desativado.
+Confere também que as duas saídas são idênticas byte a byte.
+
+Uso:
+    python benchmarks/bench_serializacao_tarefas.py --tamanhos 1000,10000,100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+PALAVRAS = ['relatório', 'reunião', 'pagar', 'conta', 'revisar', 'código', 'enviar', 'proposta', 'cliente', 'ligar']
+
+
+def medir(funcao, repeticoes):
+    """Mediana, em ms, do tempo de 'repeticoes' execuções (após uma de aquecimento)."""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tempos) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', default='1000,10000,100000')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    tamanhos = [int(tamanho) for tamanho in args.tamanhos.split(',')]
+
+    diretorio = tempfile.mkdtemp(prefix='techflow-serializacao-')
+    caminho_banco = os.path.join(diretorio, 'bench.db')
+    os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + caminho_banco
+    os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+    os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+    from flask import jsonify
+
+    # Um usuário por tamanho, com tarefas em todos os status
+    aleatorio = random.Random(args.semente)
+    conexao = sqlite3.connect(caminho_banco)
+    for usuario_id, tamanho in enumerate(tamanhos, start=1):
+        conexao.execute(
+            "INSERT INTO usuario (id, nome, email, senha, versao_tarefas, versao_compactada) VALUES (?, ?, ?, 'x', 0, 0)",
+            (usuario_id, f'Usuário {usuario_id}', f'u{usuario_id}@techflow.dev')
+        )
+        projetos = [
+            conexao.execute(
+                "INSERT INTO projeto (usuario_id, nome, data_criacao) VALUES (?, ?, '2025-01-01 00:00:00.000000')",
+                (usuario_id, nome)
+            ).lastrowid
+            for nome in ('Familiar', 'Financeiro', 'Pessoal')
+        ]
+        linhas = []
+        for i in range(tamanho):
+            status = aleatorio.choice(techflow.STATUS_VALIDOS)
+            criacao = f'2025-01-{aleatorio.randint(1, 28):02d} 10:{aleatorio.randint(0, 59):02d}:00.{aleatorio.randint(0, 999999):06d}'
+            conclusao = f'2025-02-{aleatorio.randint(1, 28):02d} 18:30:00.000000' if status == 'concluido' else None
+            linhas.append((
+                ' '.join(aleatorio.choices(PALAVRAS, k=3)).capitalize(),
+                ' '.join(aleatorio.choices(PALAVRAS, k=12)) if i % 4 else None,
+                f'2025-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d} 00:00:00.000000',
+                aleatorio.choice(techflow.PRIORIDADES_VALIDAS),
+                aleatorio.choice(projetos + [None]),
+                status, criacao, conclusao, usuario_id
+            ))
+        conexao.executemany(
+            "INSERT INTO tarefa (titulo, descricao, data_vencimento, prioridade, projeto_id, status, "
+            "data_criacao, data_conclusao, usuario_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas
+        )
+    conexao.commit()
+    conexao.close()
+
+    Tarefa = techflow.Tarefa
+    techflow.cache_quadros.bytes_maximos = 0 # Mede a geração da resposta, não o cache
+    cliente = techflow.app.test_client()
+
+    def caminho_antigo(usuario_id):
+        consulta = Tarefa.query.filter(Tarefa.usuario_id == usuario_id)
+        tarefas_por_status = {
+            status: [
+                tarefa.to_dict() for tarefa in
+                consulta.filter(Tarefa.status == status).order_by(Tarefa.data_vencimento, Tarefa.id)
+            ]
+            for status in techflow.STATUS_VALIDOS
+        }
+        corpo = jsonify(tarefas_por_status).get_data()
+        techflow.db.session.expunge_all() # Como ao fim de uma requisição: o mapa de identidade não é reaproveitado
+        return corpo
+
+    def caminho_novo(usuario_id):
+        consulta = techflow.db.session.query(*techflow.COLUNAS_JSON_TAREFA).filter(Tarefa.usuario_id == usuario_id)
+        return techflow.corpo_json({
+            status: techflow.lista_tarefas_json(
+                consulta.filter(Tarefa.status == status).order_by(Tarefa.data_vencimento, Tarefa.id)
+            )
+            for status in techflow.STATUS_VALIDOS
+        })
+
+    resultados = []
+    for usuario_id, tamanho in enumerate(tamanhos, start=1):
+        with techflow.app.app_context():
+            token = techflow.jwt.encode(
+                {'sub': str(usuario_id), 'exp': int(time.time()) + 3600},
+                techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256'
+            )
+        cabecalhos = {'Authorization': f'Bearer {token}'}
+        repeticoes = max(3, 100000 // tamanho)
+        with techflow.app.test_request_context():
+            antigo = caminho_antigo(usuario_id)
+            novo = caminho_novo(usuario_id)
+            endpoint = cliente.get('/tasks', headers=cabecalhos).get_data()
+            assert antigo == novo == endpoint, 'A saída do caminho novo difere da de jsonify/to_dict'
+            resultado = {
+                'tarefas': tamanho,
+                'bytes': len(novo),
+                'to_dict_jsonify_ms': medir(lambda: caminho_antigo(usuario_id), repeticoes),
+                'tuplas_json_ms': medir(lambda: caminho_novo(usuario_id), repeticoes),
+                'endpoint_ms': medir(lambda: cliente.get('/tasks', headers=cabecalhos), repeticoes)
+            }
+        resultado['aceleracao'] = round(resultado['to_dict_jsonify_ms'] / resultado['tuplas_json_ms'], 2)
+        resultados.append(resultado)
+
+    print(f"{'tarefas':>8} {'to_dict+jsonify ms':>19} {'tuplas+json ms':>15} {'endpoint ms':>12} {'aceleração':>11}")
+    for r in resultados:
+        print(f"{r['tarefas']:>8} {r['to_dict_jsonify_ms']:>19} {r['tuplas_json_ms']:>15} {r['endpoint_ms']:>12} {r['aceleracao']:>10}x")
+    print(json.dumps(resultados, indent=2))
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
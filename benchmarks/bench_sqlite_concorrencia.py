@@ -0,0 +1,146 @@
+# benchmarks/bench_sqlite_concorrencia.py
+"""
+Benchmark de concorrência do SQLite: compara o perfil de armazenamento 'padrao'
+(rollback journal, configuração do SQLite sem ajustes) com o perfil 'producao'
+(WAL, pragmas, pool dimensionado e escritas serializadas).
+
+Várias threads disparam uma mistura de leituras (GET /tasks paginado) e escritas
+(POST /tasks e PATCH de status) contra o app Flask, cada perfil em um processo
+separado e com um banco SQLite temporário. São medidos throughput, latência e a
+quantidade de erros (ex.: "database is locked").
+
+Uso:
+    python benchmarks/bench_sqlite_concorrencia.py --threads 16 --duracao 10 --escritas 0.3
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+DIRETORIO_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def executar_perfil(perfil, threads, duracao, proporcao_escritas):
+    """Executa a carga dentro deste processo, com o perfil já definido no ambiente."""
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, DIRETORIO_BACKEND)
+    import app as techflow
+    techflow.migrar_banco()
+
+    app = techflow.app
+    cabecalhos = []
+    ids_por_thread = []
+    cliente = app.test_client()
+    for i in range(threads):
+        resposta = cliente.post('/cadastro', json={
+            'nome': f'Bench {i}', 'email': f'bench{i}@techflow.dev',
+            'senha': 'senha-bench-123', 'confirmarSenha': 'senha-bench-123'
+        })
+        cabecalho = {'Authorization': f"Bearer {resposta.get_json()['token']}"}
+        cabecalhos.append(cabecalho)
+        ids = []
+        for j in range(50):
+            resposta = cliente.post('/tasks', headers=cabecalho, json={
+                'titulo': f'Tarefa {j}', 'data_vencimento': f'2025-{j % 12 + 1:02d}-10', 'prioridade': 'Média'
+            })
+            ids.append(resposta.get_json()['tarefa']['id'])
+        ids_por_thread.append(ids)
+
+    latencias = [[] for _ in range(threads)]
+    erros = [0] * threads
+    inicio_geral = threading.Event()
+    fim = [0.0]
+
+    def trabalhador(indice):
+        cliente_thread = app.test_client()
+        cabecalho = cabecalhos[indice]
+        aleatorio = random.Random(indice)
+        inicio_geral.wait()
+        while time.perf_counter() < fim[0]:
+            sorteio = aleatorio.random()
+            inicio = time.perf_counter()
+            if sorteio < proporcao_escritas / 2:
+                resposta = cliente_thread.post('/tasks', headers=cabecalho, json={
+                    'titulo': 'Nova', 'data_vencimento': '2025-06-01', 'prioridade': 'Alta'
+                })
+            elif sorteio < proporcao_escritas:
+                task_id = aleatorio.choice(ids_por_thread[indice])
+                resposta = cliente_thread.post('/tasks/batch', headers=cabecalho, json={'operacoes': [
+                    {'op': 'status', 'id': task_id, 'status': aleatorio.choice(['a fazer', 'fazendo', 'concluido'])}
+                ]})
+            else:
+                resposta = cliente_thread.get('/tasks?limite=50', headers=cabecalho)
+            latencias[indice].append(time.perf_counter() - inicio)
+            if resposta.status_code >= 500:
+                erros[indice] += 1
+
+    trabalhadores = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    fim[0] = time.perf_counter() + duracao
+    inicio_geral.set()
+    for t in trabalhadores:
+        t.join()
+
+    todas = [latencia for lista in latencias for latencia in lista]
+    return {
+        'perfil': perfil,
+        'requisicoes': len(todas),
+        'requisicoes_por_segundo': round(len(todas) / duracao, 1),
+        'erros': sum(erros),
+        'p50_ms': round(percentil(todas, 50) * 1000, 2),
+        'p95_ms': round(percentil(todas, 95) * 1000, 2),
+        'p99_ms': round(percentil(todas, 99) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duracao', type=float, default=10.0, help='Segundos de carga por perfil')
+    parser.add_argument('--escritas', type=float, default=0.3, help='Proporção de requisições de escrita (0 a 1)')
+    parser.add_argument('--perfis', default='padrao,producao')
+    parser.add_argument('--executar', help=argparse.SUPPRESS) # Uso interno: roda um perfil neste processo
+    args = parser.parse_args()
+
+    if args.executar:
+        resultado = executar_perfil(args.executar, args.threads, args.duracao, args.escritas)
+        print(json.dumps(resultado))
+        return
+
+    resultados = []
+    for perfil in args.perfis.split(','):
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = dict(os.environ)
+            ambiente['TECHFLOW_SQLITE_PERFIL'] = perfil
+            ambiente['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + os.path.join(diretorio, 'bench.db')
+            ambiente['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+            ambiente['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Mede a aplicação, sem o limite de taxa
+            saida = subprocess.run(
+                [sys.executable, __file__, '--executar', perfil, '--threads', str(args.threads),
+                 '--duracao', str(args.duracao), '--escritas', str(args.escritas)],
+                env=ambiente, capture_output=True, text=True, check=True
+            )
+            resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    print(f"{'perfil':<10} {'req/s':>9} {'erros':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in resultados:
+        print(f"{r['perfil']:<10} {r['requisicoes_por_segundo']:>9} {r['erros']:>7} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
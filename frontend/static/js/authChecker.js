@@ -17,7 +17,7 @@ async function checkAuthentication() {
 
     // Se o token existe, tente buscar os dados do perfil para preencher o nome
     try {
-        const response = await fetch('http://localhost:5000/perfil', {
+        const response = await fetch('http://localhost:5000/perfil?modo=token', { // Só valida o token, sem consultar o banco
             method: 'GET',
             headers: {
                 'Authorization': `Bearer ${token}`
@@ -68,8 +68,8 @@ async function checkAuthentication() {
     }
 
     try {
-        console.log('authChecker: Tentando verificar token com /perfil...');
-        const response = await fetch('http://localhost:5000/perfil', {
+        console.log('authChecker: Tentando verificar token com /perfil?modo=token...');
+        const response = await fetch('http://localhost:5000/perfil?modo=token', { // Só valida o token, sem consultar o banco
             method: 'GET',
             headers: {
                 'Authorization': `Bearer ${token}`
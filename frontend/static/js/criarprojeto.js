@@ -34,9 +34,9 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
-    // Validação do formulário
+    // Validação e envio do formulário
     const form = document.querySelector('form');
-    form.addEventListener('submit', (e) => {
+    form.addEventListener('submit', async (e) => {
         e.preventDefault();
         
         // Validação básica
@@ -46,9 +46,43 @@ document.addEventListener('DOMContentLoaded', () => {
             projectName.focus();
             return;
         }
-        
-        // Lógica de envio do formulário
-        console.log('Projeto criado com sucesso!');
-        form.reset();
+
+        const token = localStorage.getItem('jwt_token');
+        if (!token) {
+            alert('Você precisa estar logado para criar projetos.');
+            window.location.href = '/login.html';
+            return;
+        }
+
+        // Cor escolhida (opcional), no atributo data-cor da opção selecionada
+        const selectedColor = Array.from(colorOptions).find(option => option.classList.contains('border-[#1d4ed8]'));
+        try {
+            const response = await fetch('http://localhost:5000/projects', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Authorization': `Bearer ${token}`
+                },
+                body: JSON.stringify({
+                    nome: projectName.value.trim(),
+                    cor: selectedColor ? selectedColor.dataset.cor || null : null
+                })
+            });
+            const data = await response.json();
+            if (response.ok) {
+                alert(data.mensagem);
+                form.reset();
+                // O reset do formulário não alcança as cores, que são botões
+                colorOptions.forEach(option => {
+                    option.classList.remove('border-[#1d4ed8]', 'border-2');
+                    option.classList.add('border-transparent');
+                });
+            } else {
+                alert(data.erro || 'Erro ao criar projeto.');
+            }
+        } catch (error) {
+            console.error('Erro na requisição de criação de projeto:', error);
+            alert('Erro ao conectar com o servidor. Tente novamente mais tarde.');
+        }
     });
 });
\ No newline at end of file
@@ -37,6 +37,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     // Chama a função para carregar o perfil do usuário logo no início
     await loadUserProfile(); // Carrega perfil primeiro, se necessário para UI
     await loadAndRenderTasks();
+    iniciarEventosTempoReal(); // Recebe alterações feitas em outras abas/dispositivos
 
     const addTarefaBtn = document.getElementById('add-tarefa-btn');
     if (addTarefaBtn) {
@@ -136,6 +137,66 @@ async function loadAndRenderTasks() {
     }
 }
 
+// Atualizações em tempo real (Server-Sent Events): quando outra aba ou dispositivo altera
+// tarefas, o quadro é recarregado. O GET /tasks é revalidado por ETag, então a recarga é barata.
+let recargaAgendada = null;
+let jaConectado = false; // Vale entre conexões: uma reabertura com ticket novo também recarrega o quadro
+
+async function iniciarEventosTempoReal() {
+    const token = localStorage.getItem('jwt_token');
+    if (!token || !window.EventSource) return;
+
+    // EventSource não envia cabeçalhos: em vez do token de sessão, a URL leva um ticket
+    // de curta duração, válido só para abrir esta conexão
+    let ticket;
+    try {
+        const response = await fetch('http://localhost:5000/tasks/events/ticket', {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (!response.ok) return;
+        ticket = (await response.json()).ticket;
+    } catch (error) {
+        console.error('Erro ao obter ticket de eventos:', error);
+        return;
+    }
+
+    const eventos = new EventSource(`http://localhost:5000/tasks/events?ticket=${encodeURIComponent(ticket)}`);
+    eventos.onerror = () => {
+        // Reconexão recusada (ticket expirado): o navegador desiste, então abre com um ticket novo
+        if (eventos.readyState === EventSource.CLOSED) {
+            setTimeout(iniciarEventosTempoReal, 5000);
+        }
+    };
+    const agendarRecarga = () => {
+        // Agrupa rajadas de eventos em uma única recarga
+        clearTimeout(recargaAgendada);
+        recargaAgendada = setTimeout(loadAndRenderTasks, 300);
+    };
+
+    eventos.addEventListener('conectado', () => {
+        // Em uma reconexão, eventos podem ter sido perdidos: recarrega o quadro
+        if (jaConectado) agendarRecarga();
+        jaConectado = true;
+    });
+    ['criada', 'atualizada', 'status', 'removida', 'lote', 'serie', 'projeto', 'arquivada', 'restaurada', 'reiniciar'].forEach(tipo => {
+        eventos.addEventListener(tipo, agendarRecarga);
+    });
+}
+
+// Ocorrências de séries recorrentes ainda não materializadas chegam com id null: o card
+// usa o id 's<serie_id>-<AAAA-MM-DD>' e as ações vão para a rota da ocorrência.
+function idDoCard(task) {
+    return task.id !== null ? task.id : `s${task.serie_id}-${task.data_vencimento.split('T')[0]}`;
+}
+
+function urlTarefa(taskId) {
+    const ocorrencia = /^s(\d+)-(\d{4}-\d{2}-\d{2})$/.exec(String(taskId));
+    return ocorrencia
+        ? `http://localhost:5000/tasks/series/${ocorrencia[1]}/ocorrencias/${ocorrencia[2]}`
+        : `http://localhost:5000/tasks/${taskId}`;
+}
+
 // REMOVIDA: function showEmptyMessages(tasks) - agora é gerenciado por updateTaskCounters e HTML estático
 
 function createTaskCard(task, columnListId) {
@@ -148,8 +209,10 @@ function createTaskCard(task, columnListId) {
     const taskCard = document.createElement('div');
     taskCard.className = 'task-card bg-white rounded-lg shadow-md p-4 mb-3 cursor-grab';
     taskCard.setAttribute('draggable', 'true');
-    taskCard.id = `task-${task.id}`;
-    taskCard.dataset.taskId = task.id;
+    const cardId = idDoCard(task);
+    taskCard.id = `task-${cardId}`;
+    taskCard.dataset.taskId = cardId;
+    taskCard.dataset.versao = task.versao ?? ''; // Versão lida, enviada ao mover (concorrência otimista)
 
     let priorityClass = '';
     switch (task.prioridade) {
@@ -194,8 +257,8 @@ function createTaskCard(task, columnListId) {
             ${task.projeto ? `<span>Projeto: ${task.projeto}</span>` : ''}
         </div>
         <div class="task-actions flex justify-end space-x-2">
-             <button class="edit-btn bg-blue-500 hover:bg-blue-600 text-white text-xs px-3 py-1 rounded-md" data-task-id="${task.id}">Editar</button>
-             <button class="delete-btn bg-red-500 hover:bg-red-600 text-white text-xs px-3 py-1 rounded-md" data-task-id="${task.id}">Excluir</button>
+             <button class="edit-btn bg-blue-500 hover:bg-blue-600 text-white text-xs px-3 py-1 rounded-md ${task.id === null ? 'hidden' : ''}" data-task-id="${cardId}">Editar</button>
+             <button class="delete-btn bg-red-500 hover:bg-red-600 text-white text-xs px-3 py-1 rounded-md" data-task-id="${cardId}">Excluir</button>
         </div>
     `;
 
@@ -209,7 +272,7 @@ function createTaskCard(task, columnListId) {
     });
     taskCard.querySelector('.delete-btn').addEventListener('click', (e) => {
         e.stopPropagation();
-        deleteTask(task.id);
+        deleteTask(cardId);
     });
 }
 
@@ -292,7 +355,12 @@ async function handleDrop(e) {
         
         // Atualizar contadores novamente para refletir o estado revertido
         updateTaskCounters();
-        alert('Falha ao mover tarefa. A alteração foi desfeita.');
+        if (error.conflito) {
+            // A tarefa mudou em outra aba/dispositivo: recarrega o quadro com as versões atuais
+            await loadAndRenderTasks();
+        } else {
+            alert('Falha ao mover tarefa. A alteração foi desfeita.');
+        }
     } finally {
         // Limpa as variáveis de estado do drag
         draggedItem = null;
@@ -334,20 +402,36 @@ async function updateTaskStatus(taskId, newStatus) {
         throw new Error('Token não encontrado'); // Lança erro para ser pego pelo catch no handleDrop
     }
 
+    // Tarefas usam a rota de movimento (UPDATE condicional pela versão); ocorrências
+    // virtuais de séries continuam indo para a rota da ocorrência
+    const taskCard = document.getElementById(`task-${taskId}`);
+    const virtual = urlTarefa(taskId).includes('/ocorrencias/');
+    const body = { status: newStatus };
+    if (!virtual && taskCard && taskCard.dataset.versao !== '') {
+        body.versao = Number(taskCard.dataset.versao);
+    }
+
     try {
-        const response = await fetch(`http://localhost:5000/tasks/${taskId}`, {
+        const response = await fetch(virtual ? urlTarefa(taskId) : `${urlTarefa(taskId)}/status`, {
             method: 'PATCH',
             headers: {
                 'Content-Type': 'application/json',
                 'Authorization': `Bearer ${token}`
             },
-            body: JSON.stringify({ status: newStatus })
+            body: JSON.stringify(body)
         });
 
         if (!response.ok) {
             const errorData = await response.json();
             console.error('Erro ao atualizar status no backend:', errorData);
-            throw new Error(errorData.erro || 'Erro ao atualizar status da tarefa no servidor');
+            const erro = new Error(errorData.erro || 'Erro ao atualizar status da tarefa no servidor');
+            erro.conflito = response.status === 409;
+            throw erro;
+        }
+
+        if (!virtual && taskCard) {
+            const data = await response.json();
+            taskCard.dataset.versao = data.versao; // Próximo movimento parte desta versão
         }
 
         console.log(`Status da tarefa ${taskId} atualizado para ${newStatus} no backend.`);
@@ -376,7 +460,7 @@ async function deleteTask(taskId) {
     }
 
     try {
-        const response = await fetch(`http://localhost:5000/tasks/${taskId}`, {
+        const response = await fetch(urlTarefa(taskId), {
             method: 'DELETE',
             headers: {
                 'Authorization': `Bearer ${token}`
@@ -0,0 +1,97 @@
+# tests/conftest.py
+"""
+Fixtures dos testes da API do TechFlow.
+
+O app é um objeto único do módulo backend/app.py, configurado no import pelas variáveis
+TECHFLOW_*: aqui elas apontam para um banco SQLite temporário (migrado uma vez por sessão),
+sem limite de taxa, sem agendador de lembretes e com um scrypt barato. Cada teste usa um
+usuário novo, então os testes não dependem da ordem nem compartilham tarefas.
+
+Uso:
+    python -m pytest -q
+"""
+import atexit
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+DIRETORIO_RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DIRETORIO_BACKEND = os.path.join(DIRETORIO_RAIZ, 'backend')
+
+DIRETORIO_TEMPORARIO = tempfile.mkdtemp(prefix='techflow-testes-')
+atexit.register(shutil.rmtree, DIRETORIO_TEMPORARIO, ignore_errors=True)
+
+os.environ['TECHFLOW_DATABASE_URI'] = 'sqlite:///' + os.path.join(DIRETORIO_TEMPORARIO, 'techflow.db')
+os.environ['TECHFLOW_LIMITE_TAXA_ATIVO'] = '0' # Ligado só nos testes do limite de taxa
+os.environ['TECHFLOW_LEMBRETES_ATIVO'] = '0' # Os testes chamam verificar_vencimentos diretamente
+os.environ['TECHFLOW_SENHA_POOL_PROCESSOS'] = '0'
+os.environ['TECHFLOW_SENHA_HASH_METODO'] = 'scrypt:1024:8:1'
+
+sys.path.insert(0, DIRETORIO_BACKEND)
+import app as techflow # noqa: E402
+
+techflow.migrar_banco()
+
+emails = (f'usuario{numero}@techflow.dev' for numero in itertools.count(1))
+
+
+@pytest.fixture
+def app_techflow():
+    """O módulo backend/app.py (app, modelos e funções auxiliares)."""
+    return techflow
+
+
+@pytest.fixture
+def cliente():
+    return techflow.app.test_client()
+
+
+@pytest.fixture
+def cadastrar(cliente):
+    """Cadastra um usuário novo e retorna (id, cabeçalhos com o token)."""
+    def cadastrar_usuario(nome='Teste'):
+        resposta = cliente.post('/cadastro', json={
+            'nome': nome, 'email': next(emails), 'senha': 'senha-forte-1', 'confirmarSenha': 'senha-forte-1'
+        })
+        assert resposta.status_code == 201, resposta.get_json()
+        dados = resposta.get_json()
+        return dados['usuario']['id'], {'Authorization': f"Bearer {dados['token']}"}
+    return cadastrar_usuario
+
+
+@pytest.fixture
+def usuario(cadastrar):
+    return cadastrar()
+
+
+@pytest.fixture
+def cabecalhos(usuario):
+    return usuario[1]
+
+
+@pytest.fixture
+def criar_tarefa(cliente, cabecalhos):
+    """Cria uma tarefa do usuário da fixture e retorna o JSON dela."""
+    def criar(titulo='Tarefa', data_vencimento='2030-01-10', prioridade='Média', **extras):
+        resposta = cliente.post('/tasks', headers=cabecalhos, json={
+            'titulo': titulo, 'data_vencimento': data_vencimento, 'prioridade': prioridade, **extras
+        })
+        assert resposta.status_code == 201, resposta.get_json()
+        return resposta.get_json()['tarefa']
+    return criar
+
+
+@pytest.fixture
+def sql(app_techflow):
+    """Executa um comando SQL no banco dos testes (com commit) e retorna as linhas, se houver."""
+    def executar(comando, parametros=None):
+        with app_techflow.app.app_context():
+            resultado = app_techflow.db.session.execute(app_techflow.db.text(comando), parametros or {})
+            linhas = resultado.all() if resultado.returns_rows else None
+            app_techflow.db.session.commit()
+            return linhas
+    return executar
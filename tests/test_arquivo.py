@@ -0,0 +1,113 @@
+# tests/test_arquivo.py
+"""Arquivamento das tarefas concluídas, GET /tasks/archive e desarquivamento."""
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def arquivar(app_techflow, sql):
+    """Marca as tarefas como concluídas há 40 dias e roda o arquivamento."""
+    def arquivar_tarefas(ids, dias=40):
+        for posicao, task_id in enumerate(ids):
+            data_conclusao = datetime.utcnow() - timedelta(days=dias, minutes=posicao)
+            sql(
+                "UPDATE tarefa SET status = 'concluido', data_conclusao = :data WHERE id = :id",
+                {'data': data_conclusao.strftime(app_techflow.FORMATO_DATA_SQLITE), 'id': task_id}
+            )
+        with app_techflow.app.app_context():
+            return app_techflow.arquivar_tarefas_concluidas()
+    return arquivar_tarefas
+
+
+def test_arquivamento_e_listagem(cliente, cabecalhos, criar_tarefa, arquivar):
+    tarefas = [criar_tarefa(titulo=f'T{i}') for i in range(5)]
+    recente = criar_tarefa(titulo='Recente')
+    cliente.patch(f"/tasks/{recente['id']}/status", headers=cabecalhos, json={'status': 'concluido'})
+    versao = int(cliente.get('/tasks', headers=cabecalhos).headers['X-Versao-Tarefas'])
+
+    assert arquivar([tarefa['id'] for tarefa in tarefas]) >= 5
+    quadro = cliente.get('/tasks', headers=cabecalhos).get_json()
+    assert [tarefa['id'] for tarefa in quadro['concluido']] == [recente['id']]
+    alteracoes = cliente.get(f'/tasks/changes?since={versao}', headers=cabecalhos).get_json()
+    assert sorted(alteracoes['removidas']) == sorted(tarefa['id'] for tarefa in tarefas)
+
+    # Das concluídas mais recentemente para as mais antigas, em páginas por cursor
+    vistos = []
+    cursor = ''
+    while True:
+        dados = cliente.get(f'/tasks/archive?limite=2{cursor}', headers=cabecalhos).get_json()
+        vistos += [tarefa['id'] for tarefa in dados['tarefas']]
+        if dados['paginacao']['proximo_cursor'] is None:
+            break
+        cursor = f"&cursor={dados['paginacao']['proximo_cursor']}"
+    assert vistos == [tarefa['id'] for tarefa in tarefas]
+
+
+@pytest.mark.parametrize('parametros', ['limite=abc', 'limite=0', 'limite=501', 'cursor=%%%'])
+def test_listagem_do_arquivo_parametros_invalidos(cliente, cabecalhos, parametros):
+    assert cliente.get(f'/tasks/archive?{parametros}', headers=cabecalhos).status_code == 400
+
+
+def test_estatisticas_contam_as_arquivadas(cliente, cabecalhos, criar_tarefa, arquivar):
+    tarefas = [criar_tarefa(projeto='Casa') for _ in range(3)]
+    antes = cliente.get('/tasks/stats', headers=cabecalhos).get_json()
+    arquivar([tarefas[0]['id']])
+    cliente.patch(f"/tasks/{tarefas[1]['id']}/status", headers=cabecalhos, json={'status': 'concluido'})
+    arquivar([tarefas[1]['id']])
+
+    depois = cliente.get('/tasks/stats', headers=cabecalhos).get_json()
+    assert depois['total'] == antes['total'] == 3
+    assert depois['por_status'] == {'a fazer': 1, 'fazendo': 0, 'concluido': 2}
+    assert depois['por_projeto'] == {'Casa': 3}
+    assert depois['conclusao']['concluidas'] == 2
+    projetos = cliente.get('/projects', headers=cabecalhos).get_json()['projetos']
+    assert (projetos[0]['total_tarefas'], projetos[0]['tarefas_abertas']) == (3, 1)
+
+
+def test_ids_arquivados_nao_sao_reaproveitados(cliente, cabecalhos, criar_tarefa, arquivar, sql):
+    tarefa = criar_tarefa()
+    maior_id = sql('SELECT MAX(id) FROM tarefa')[0][0]
+    assert maior_id == tarefa['id']
+    arquivar([tarefa['id']])
+    nova = criar_tarefa()
+    assert nova['id'] > tarefa['id']
+    # O mesmo vale para o lote
+    resultado = cliente.post('/tasks/batch', headers=cabecalhos, json={'operacoes': [
+        {'op': 'criar', 'dados': {'titulo': 'x', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta'}}
+    ]}).get_json()['resultados'][0]
+    assert resultado['id'] > nova['id']
+
+
+def test_desarquivar(cliente, cabecalhos, criar_tarefa, arquivar, cadastrar):
+    tarefas = [criar_tarefa(titulo=f'T{i}') for i in range(2)]
+    arquivar([tarefa['id'] for tarefa in tarefas])
+    arquivada = cliente.get('/tasks/archive', headers=cabecalhos).get_json()['tarefas'][0]
+    url = f"/tasks/archive/{arquivada['id']}/unarchive"
+
+    _, outro = cadastrar()
+    assert cliente.post(url, headers=outro).status_code == 404
+    assert cliente.post('/tasks/archive/999999/unarchive', headers=cabecalhos).status_code == 404
+    assert cliente.post(url, headers=cabecalhos, json={'status': 'pronto'}).status_code == 400
+
+    resposta = cliente.post(url, headers=cabecalhos)
+    assert resposta.status_code == 200
+    devolvida = resposta.get_json()['tarefa']
+    assert devolvida['id'] == arquivada['id']
+    assert (devolvida['status'], devolvida['data_conclusao']) == ('a fazer', None)
+    assert devolvida['versao'] == arquivada['versao'] + 1
+    assert cliente.post(url, headers=cabecalhos).status_code == 404
+
+    outra = cliente.get('/tasks/archive', headers=cabecalhos).get_json()['tarefas'][0]
+    devolvida = cliente.post(
+        f"/tasks/archive/{outra['id']}/unarchive", headers=cabecalhos, json={'status': 'concluido'}
+    ).get_json()['tarefa']
+    assert (devolvida['status'], devolvida['data_conclusao']) == ('concluido', outra['data_conclusao'])
+    assert cliente.get('/tasks/archive', headers=cabecalhos).get_json()['tarefas'] == []
+    assert cliente.get('/tasks/stats', headers=cabecalhos).get_json()['total'] == 2
+
+
+def test_arquivamento_desativado(app_techflow, monkeypatch):
+    monkeypatch.setitem(app_techflow.app.config, 'ARQUIVAMENTO_DIAS', 0)
+    with app_techflow.app.app_context():
+        assert app_techflow.arquivar_tarefas_concluidas() == 0
@@ -0,0 +1,131 @@
+# tests/test_autenticacao.py
+"""Cadastro, login, perfil e tokens: caminhos de erro, ticket de GET /tasks/events e logs sem credenciais."""
+import logging
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+
+def gerar_token(app_techflow, **claims):
+    return jwt.encode(claims, app_techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+
+@pytest.mark.parametrize('campo', ['nome', 'email', 'senha', 'confirmarSenha'])
+def test_cadastro_exige_campos(cliente, campo):
+    dados = {'nome': 'A', 'email': 'faltando@techflow.dev', 'senha': '12345678', 'confirmarSenha': '12345678'}
+    dados[campo] = ''
+    resposta = cliente.post('/cadastro', json=dados)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == f'Campo obrigatório faltando ou vazio: {campo}'
+
+
+def test_cadastro_valida_email_e_senha(cliente):
+    base = {'nome': 'A', 'email': 'valido@techflow.dev', 'senha': '12345678', 'confirmarSenha': '12345678'}
+    assert cliente.post('/cadastro', json={**base, 'email': 'sem-arroba'}).status_code == 400
+    assert cliente.post('/cadastro', json={**base, 'senha': '123', 'confirmarSenha': '123'}).status_code == 400
+    assert cliente.post('/cadastro', json={**base, 'confirmarSenha': '87654321'}).status_code == 400
+
+
+def test_cadastro_email_duplicado(cliente):
+    dados = {'nome': 'A', 'email': 'Duplicado@techflow.dev', 'senha': '12345678', 'confirmarSenha': '12345678'}
+    assert cliente.post('/cadastro', json=dados).status_code == 201
+    assert cliente.post('/cadastro', json={**dados, 'email': 'duplicado@techflow.dev'}).status_code == 409
+
+
+def test_login(cliente):
+    dados = {'nome': 'A', 'email': 'login@techflow.dev', 'senha': '12345678', 'confirmarSenha': '12345678'}
+    cliente.post('/cadastro', json=dados)
+    assert cliente.post('/login', json={'email': 'login@techflow.dev'}).status_code == 400
+    assert cliente.post('/login', json={'email': 'login@techflow.dev', 'senha': 'errada00'}).status_code == 401
+    assert cliente.post('/login', json={'email': 'ninguem@techflow.dev', 'senha': '12345678'}).status_code == 401
+    resposta = cliente.post('/login', json={'email': ' LOGIN@techflow.dev ', 'senha': '12345678'})
+    assert resposta.status_code == 200
+    assert resposta.get_json()['token']
+
+
+def test_perfil_e_introspeccao(cliente, usuario):
+    usuario_id, cabecalhos = usuario
+    perfil = cliente.get('/perfil', headers=cabecalhos).get_json()
+    assert perfil['id'] == usuario_id
+    token = cliente.get('/perfil?modo=token', headers=cabecalhos).get_json()
+    assert token['ativo'] is True and token['id'] == usuario_id and token['email'] == perfil['email']
+
+
+def test_perfil_de_usuario_inexistente(cliente, app_techflow):
+    token = gerar_token(app_techflow, sub='999999', exp=datetime.utcnow() + timedelta(hours=1))
+    assert cliente.get('/perfil', headers={'Authorization': f'Bearer {token}'}).status_code == 404
+
+
+@pytest.mark.parametrize('cabecalho', [None, 'Token abc', 'Bearer nao-e-um-jwt'])
+def test_rotas_protegidas_exigem_token_valido(cliente, cabecalho):
+    cabecalhos = {'Authorization': cabecalho} if cabecalho else {}
+    resposta = cliente.get('/tasks', headers=cabecalhos)
+    assert resposta.status_code == 401
+    assert 'erro' in resposta.get_json()
+
+
+def test_token_expirado_e_assinatura_errada(cliente, app_techflow):
+    expirado = gerar_token(app_techflow, sub='1', exp=datetime.utcnow() - timedelta(seconds=5))
+    resposta = cliente.get('/tasks', headers={'Authorization': f'Bearer {expirado}'})
+    assert resposta.status_code == 401
+    assert 'expirado' in resposta.get_json()['erro']
+
+    forjado = jwt.encode({'sub': '1', 'exp': datetime.utcnow() + timedelta(hours=1)}, 'outra-chave-secreta-com-32-bytes-ou-mais', algorithm='HS256')
+    assert cliente.get('/tasks', headers={'Authorization': f'Bearer {forjado}'}).status_code == 401
+
+
+def test_logout(cliente):
+    assert cliente.post('/logout').status_code == 200
+
+
+def test_eventos_nao_aceitam_token_de_sessao_na_url(cliente, cabecalhos):
+    token = cabecalhos['Authorization'].split()[1]
+    assert cliente.get(f'/tasks/events?token={token}').status_code == 401
+    assert cliente.get(f'/tasks/events?ticket={token}').status_code == 401
+
+
+def test_ticket_de_eventos(cliente, cabecalhos):
+    assert cliente.post('/tasks/events/ticket').status_code == 401
+    resposta = cliente.post('/tasks/events/ticket', headers=cabecalhos)
+    assert resposta.status_code == 201
+    dados = resposta.get_json()
+    assert dados['expira_em_segundos'] == 60
+
+    eventos = cliente.get(f"/tasks/events?ticket={dados['ticket']}")
+    assert eventos.status_code == 200
+    assert eventos.mimetype == 'text/event-stream'
+    assert next(iter(eventos.response)).startswith(b'retry: 5000\nid: 0\nevent: conectado\n')
+    eventos.close()
+
+    # O ticket só abre GET /tasks/events: não vale como token de sessão
+    ticket = {'Authorization': f"Bearer {dados['ticket']}"}
+    assert cliente.get('/tasks', headers=ticket).status_code == 401
+    assert cliente.post('/tasks/events/ticket', headers=ticket).status_code == 401
+
+
+def test_ticket_de_eventos_expirado(cliente, usuario, app_techflow):
+    usuario_id, _ = usuario
+    expirado = gerar_token(app_techflow, sub=str(usuario_id), finalidade='eventos', exp=datetime.utcnow() - timedelta(seconds=1))
+    assert cliente.get(f'/tasks/events?ticket={expirado}').status_code == 401
+
+
+def test_log_de_acesso_sem_credenciais_na_url(app_techflow):
+    registros = []
+
+    class Coletor(logging.Handler):
+        def emit(self, record):
+            registros.append(record.getMessage())
+
+    logger_werkzeug = logging.getLogger('werkzeug')
+    coletor = Coletor()
+    logger_werkzeug.addHandler(coletor)
+    try:
+        logger_werkzeug.info('%s - - "%s" %s', '127.0.0.1', 'GET /tasks/events?ticket=abc.def.ghi&x=1 HTTP/1.1', '200')
+        logger_werkzeug.info('"GET /tasks/events?token=segredo HTTP/1.1" 401')
+    finally:
+        logger_werkzeug.removeHandler(coletor)
+    assert registros == [
+        '127.0.0.1 - - "GET /tasks/events?ticket=[removido]&x=1 HTTP/1.1" 200',
+        '"GET /tasks/events?token=[removido] HTTP/1.1" 401',
+    ]
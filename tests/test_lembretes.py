@@ -0,0 +1,107 @@
+# tests/test_lembretes.py
+"""Agendador de lembretes: marcos de verificação de vencimentos e rotas de notificações."""
+from datetime import datetime, timedelta
+
+import pytest
+
+# Instante dos testes, longe das datas usadas pelos outros testes (os marcos são globais)
+INICIO = datetime(2031, 1, 10, 12, 0)
+
+
+@pytest.fixture
+def verificar(app_techflow, sql):
+    """Começa sem marcos e retorna uma função que executa uma verificação em um instante."""
+    sql('DELETE FROM marco_lembretes')
+
+    def verificar_vencimentos(agora):
+        with app_techflow.app.app_context():
+            return app_techflow.verificar_vencimentos(agora)
+    return verificar_vencimentos
+
+
+def notificacoes(cliente, cabecalhos, parametros=''):
+    resposta = cliente.get(f'/notifications{parametros}', headers=cabecalhos)
+    assert resposta.status_code == 200
+    return resposta.get_json()
+
+
+def avisos(cliente, cabecalhos):
+    """(tipo, tarefa_id) das notificações do usuário, das mais antigas para as mais recentes."""
+    return [(item['tipo'], item['tarefa_id']) for item in reversed(notificacoes(cliente, cabecalhos)['notificacoes'])]
+
+
+def test_marcos_de_vencimento(cliente, cabecalhos, criar_tarefa, verificar):
+    ja_atrasada = criar_tarefa(titulo='Já atrasada', data_vencimento='2031-01-08')
+    # Primeira execução: os marcos começam agora, sem avisos do que já estava atrasado
+    verificar(INICIO)
+    assert avisos(cliente, cabecalhos) == []
+
+    # A primeira verificação já cobriu as próximas 24 horas: estas vencem depois
+    proxima = criar_tarefa(titulo='Próxima', data_vencimento='2031-01-12')
+    criar_tarefa(titulo='Mais tarde', data_vencimento='2031-01-20')
+    concluida = criar_tarefa(titulo='Concluída', data_vencimento='2031-01-12')
+    cliente.patch(f"/tasks/{concluida['id']}/status", headers=cabecalhos, json={'status': 'concluido'})
+
+    verificar(datetime(2031, 1, 11, 0, 1))
+    assert avisos(cliente, cabecalhos) == [('vence_em_breve', proxima['id'])]
+    # A mesma janela não é verificada de novo
+    assert verificar(datetime(2031, 1, 11, 0, 2)) == {'vence_em_breve': 0, 'atrasada': 0}
+
+    # Depois do dia do vencimento, a tarefa fica atrasada
+    verificar(datetime(2031, 1, 13, 1, 0))
+    assert avisos(cliente, cabecalhos) == [('vence_em_breve', proxima['id']), ('atrasada', proxima['id'])]
+    assert notificacoes(cliente, cabecalhos)['nao_lidas'] == 2
+    assert ja_atrasada['id'] not in {tarefa_id for _, tarefa_id in avisos(cliente, cabecalhos)}
+
+
+def test_lotes_com_o_mesmo_vencimento(cliente, cabecalhos, criar_tarefa, verificar, app_techflow, monkeypatch):
+    monkeypatch.setitem(app_techflow.app.config, 'LEMBRETES_LOTE', 2)
+    verificar(INICIO)
+    tarefas = [criar_tarefa(titulo=f'T{i}', data_vencimento='2031-01-12') for i in range(5)]
+    # O desempate pelo id no marco não repete nem pula tarefas entre os lotes
+    verificar(datetime(2031, 1, 11, 1, 0))
+    assert avisos(cliente, cabecalhos) == [('vence_em_breve', tarefa['id']) for tarefa in tarefas]
+
+
+def test_recuperacao_apos_parada(cliente, cabecalhos, criar_tarefa, verificar):
+    verificar(INICIO)
+    antiga = criar_tarefa(titulo='Antiga', data_vencimento='2031-01-12')
+    recente = criar_tarefa(titulo='Recente', data_vencimento='2031-01-25')
+    # Servidor parado até 2031-01-27: atrasos mais antigos que a recuperação máxima são ignorados,
+    # e a tarefa que já atrasou recebe só o aviso 'atrasada'
+    verificar(datetime(2031, 1, 27, 1, 0))
+    assert avisos(cliente, cabecalhos) == [('atrasada', recente['id'])]
+    assert antiga['id'] not in {tarefa_id for _, tarefa_id in avisos(cliente, cabecalhos)}
+
+
+def test_rotas_de_notificacoes(cliente, cabecalhos, criar_tarefa, verificar, cadastrar):
+    assert cliente.get('/notifications?limite=0', headers=cabecalhos).status_code == 400
+    assert cliente.get('/notifications?cursor=abc', headers=cabecalhos).status_code == 400
+    assert cliente.post('/notifications/read', headers=cabecalhos, json={'ids': 'todas'}).status_code == 400
+    assert cliente.post('/notifications/read', headers=cabecalhos, json={'ids': [True]}).status_code == 400
+
+    verificar(INICIO)
+    for i in range(3):
+        criar_tarefa(titulo=f'T{i}', data_vencimento='2031-01-12')
+    verificar(datetime(2031, 1, 11, 1, 0))
+
+    primeira = notificacoes(cliente, cabecalhos, '?limite=2')
+    assert len(primeira['notificacoes']) == 2 and primeira['nao_lidas'] == 3
+    segunda = notificacoes(cliente, cabecalhos, f"?limite=2&cursor={primeira['paginacao']['proximo_cursor']}")
+    assert len(segunda['notificacoes']) == 1 and segunda['paginacao']['proximo_cursor'] is None
+
+    _, outro = cadastrar()
+    escolhida = primeira['notificacoes'][0]['id']
+    assert cliente.post('/notifications/read', headers=outro, json={'ids': [escolhida]}).get_json()['marcadas'] == 0
+    assert cliente.post('/notifications/read', headers=cabecalhos, json={'ids': [escolhida]}).get_json()['marcadas'] == 1
+    assert [item['id'] for item in notificacoes(cliente, cabecalhos, '?nao_lidas=1')['notificacoes']] == [
+        item['id'] for item in primeira['notificacoes'][1:] + segunda['notificacoes']
+    ]
+    assert cliente.post('/notifications/read', headers=cabecalhos).get_json()['marcadas'] == 2
+    assert notificacoes(cliente, cabecalhos)['nao_lidas'] == 0
+
+
+def test_agendador_desativado_nao_inicia_thread(cliente, app_techflow):
+    cliente.get('/health')
+    assert app_techflow.agendador_lembretes['pid'] is not None
+    assert not app_techflow.agendador_lembretes_rodando()
@@ -0,0 +1,81 @@
+# tests/test_limite_taxa.py
+"""Limite de taxa (cabeçalhos RateLimit-*, 429 com Retry-After), /health e /metrics."""
+import pytest
+
+
+@pytest.fixture
+def limite_ativo(app_techflow, monkeypatch):
+    monkeypatch.setitem(app_techflow.app.config, 'LIMITE_TAXA_ATIVO', True)
+
+
+def test_cabecalhos_da_regra_padrao(cliente, cabecalhos, limite_ativo):
+    resposta = cliente.get('/tasks', headers=cabecalhos)
+    assert resposta.status_code == 200
+    assert resposta.headers['RateLimit-Limit'] == '120'
+    assert resposta.headers['RateLimit-Remaining'] == '119'
+    assert int(resposta.headers['RateLimit-Reset']) >= 1
+    # A busca tem balde próprio
+    assert cliente.get('/tasks/search?q=x', headers=cabecalhos).headers['RateLimit-Limit'] == '30'
+
+
+def test_sem_cabecalhos_com_o_limite_desativado(cliente, cabecalhos):
+    assert 'RateLimit-Limit' not in cliente.get('/tasks', headers=cabecalhos).headers
+
+
+def test_lote_excedido_por_usuario(cliente, cabecalhos, cadastrar, limite_ativo):
+    corpo = {'operacoes': [{'op': 'deletar', 'id': 999999}]}
+    for _ in range(10):
+        assert cliente.post('/tasks/batch', headers=cabecalhos, json=corpo).status_code == 200
+    resposta = cliente.post('/tasks/batch', headers=cabecalhos, json=corpo)
+    assert resposta.status_code == 429
+    assert resposta.headers['Retry-After'] == '1'
+    assert resposta.headers['RateLimit-Remaining'] == '0'
+    # O balde é por usuário
+    _, outro = cadastrar()
+    assert cliente.post('/tasks/batch', headers=outro, json=corpo).status_code == 200
+
+
+def test_login_excedido_por_ip(cliente, limite_ativo):
+    credenciais = {'email': 'ninguem@techflow.dev', 'senha': 'senha-errada-1'}
+    ip = {'REMOTE_ADDR': '203.0.113.10'}
+    for _ in range(10):
+        assert cliente.post('/login', json=credenciais, environ_base=ip).status_code == 401
+    resposta = cliente.post('/login', json=credenciais, environ_base=ip)
+    assert resposta.status_code == 429
+    assert int(resposta.headers['Retry-After']) == 6
+    # Outro IP não é afetado
+    assert cliente.post('/login', json=credenciais, environ_base={'REMOTE_ADDR': '203.0.113.11'}).status_code == 401
+
+
+def test_ip_atras_de_proxy(cliente, app_techflow, limite_ativo, monkeypatch):
+    monkeypatch.setitem(app_techflow.app.config, 'LIMITE_TAXA_PROXIES', 1)
+    credenciais = {'email': 'ninguem@techflow.dev', 'senha': 'senha-errada-1'}
+    for numero in range(11):
+        # Mesmo IP de conexão (o proxy), clientes diferentes no X-Forwarded-For
+        cabecalhos = {'X-Forwarded-For': f'198.51.100.7, 192.0.2.{numero}'}
+        resposta = cliente.post('/login', json=credenciais, headers=cabecalhos, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        assert resposta.status_code == 401
+
+
+def test_backend_sqlite(app_techflow, tmp_path):
+    backend = app_techflow.BackendLimiteTaxaSQLite(str(tmp_path / 'limite_taxa.db'), 60)
+    resultados = [backend.consumir('regra:u1', 2, 1 / 60) for _ in range(3)]
+    assert [permitido for permitido, _ in resultados] == [True, True, False]
+    assert backend.consumir('regra:u2', 2, 1 / 60)[0]
+    assert backend.quantidade_chaves() == 2
+
+
+def test_health(cliente):
+    resposta = cliente.get('/health')
+    assert resposta.status_code == 200
+    assert resposta.get_json()['status'] == 'online'
+
+
+def test_metricas(cliente, cabecalhos, app_techflow, monkeypatch):
+    cliente.get('/tasks', headers=cabecalhos)
+    assert 'techflow_jwt_cache_entradas' in cliente.get('/metrics').get_data(as_text=True)
+
+    monkeypatch.setitem(app_techflow.app.config, 'METRICAS_TOKEN', 'token-das-metricas')
+    assert cliente.get('/metrics').status_code == 401
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 401
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer token-das-metricas'}).status_code == 200
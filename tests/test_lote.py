@@ -0,0 +1,88 @@
+# tests/test_lote.py
+"""POST /tasks/batch: validação do lote, resultados por item e efeitos aplicados em uma transação."""
+import pytest
+
+
+def enviar_lote(cliente, cabecalhos, operacoes):
+    resposta = cliente.post('/tasks/batch', headers=cabecalhos, json={'operacoes': operacoes})
+    assert resposta.status_code == 200, resposta.get_json()
+    return resposta.get_json()
+
+
+@pytest.mark.parametrize('corpo', [None, {}, {'operacoes': []}, {'operacoes': {'op': 'criar'}}])
+def test_lote_invalido(cliente, cabecalhos, corpo):
+    resposta = cliente.post('/tasks/batch', headers=cabecalhos, json=corpo)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == 'Envie uma lista não vazia de operações em "operacoes".'
+
+
+def test_lote_acima_do_maximo(cliente, cabecalhos, app_techflow):
+    operacoes = [{'op': 'deletar', 'id': 1}] * (app_techflow.LIMITE_LOTE_MAXIMO + 1)
+    resposta = cliente.post('/tasks/batch', headers=cabecalhos, json={'operacoes': operacoes})
+    assert resposta.status_code == 400
+
+
+def test_resultados_por_item(cliente, cabecalhos, criar_tarefa, cadastrar):
+    existente = criar_tarefa(titulo='Existente')
+    removida = criar_tarefa(titulo='Removida')
+    _, outro = cadastrar()
+    alheia = cliente.post('/tasks', headers=outro, json={'titulo': 'Alheia', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta'}).get_json()['tarefa']
+
+    dados = enviar_lote(cliente, cabecalhos, [
+        {'op': 'criar', 'dados': {'titulo': 'Nova 1', 'data_vencimento': '2030-05-01', 'prioridade': 'Alta', 'projeto': 'Lote'}},
+        {'op': 'criar', 'dados': {'titulo': 'Sem prioridade', 'data_vencimento': '2030-05-01'}},
+        {'op': 'mover'},
+        'texto',
+        {'op': 'status', 'id': existente['id'], 'status': 'concluido'},
+        {'op': 'status', 'id': existente['id'], 'status': 'pronto'},
+        {'op': 'atualizar', 'id': existente['id'], 'dados': {'titulo': 'Editada', 'prioridade': 'Baixa'}},
+        {'op': 'atualizar', 'id': existente['id'], 'dados': {'status': 'a fazer'}},
+        {'op': 'deletar', 'id': alheia['id']},
+        {'op': 'deletar', 'id': removida['id']},
+        {'op': 'status', 'id': removida['id'], 'status': 'fazendo'},
+        {'op': 'criar', 'dados': {'titulo': 'Nova 2', 'data_vencimento': '2030-05-02', 'prioridade': 'Baixa'}},
+    ])
+    codigos = [resultado['codigo'] for resultado in dados['resultados']]
+    assert codigos == [201, 400, 400, 400, 200, 400, 200, 400, 404, 200, 404, 201]
+    assert [resultado['indice'] for resultado in dados['resultados']] == list(range(12))
+    assert (dados['aplicadas'], dados['falhas']) == (5, 7)
+    assert dados['resultados'][7]['erro'] == f"Para mudar o status da tarefa, use PATCH /tasks/{existente['id']}/status com {{\"status\": ..., \"versao\": N}}."
+
+    # Os ids das criações seguem a ordem das operações
+    nova_1, nova_2 = dados['resultados'][0]['id'], dados['resultados'][11]['id']
+    assert cliente.get(f'/tasks/{nova_1}', headers=cabecalhos).get_json()['titulo'] == 'Nova 1'
+    assert cliente.get(f'/tasks/{nova_2}', headers=cabecalhos).get_json()['titulo'] == 'Nova 2'
+    assert nova_1 < nova_2
+
+    editada = cliente.get(f"/tasks/{existente['id']}", headers=cabecalhos).get_json()
+    assert (editada['titulo'], editada['prioridade'], editada['status']) == ('Editada', 'Baixa', 'concluido')
+    assert editada['data_conclusao'] is not None
+    assert editada['versao'] == existente['versao'] + 1 # Um incremento por lote, não por operação
+    assert cliente.get(f"/tasks/{removida['id']}", headers=cabecalhos).status_code == 404
+    assert cliente.get(f"/tasks/{alheia['id']}", headers=outro).status_code == 200
+
+
+def test_lote_atualiza_busca_contadores_e_log(cliente, cabecalhos, criar_tarefa):
+    tarefas = [criar_tarefa(titulo=f'Original {i}') for i in range(3)]
+    versao = int(cliente.get('/tasks', headers=cabecalhos).headers['X-Versao-Tarefas'])
+    enviar_lote(cliente, cabecalhos, [
+        {'op': 'atualizar', 'id': tarefas[0]['id'], 'dados': {'titulo': 'Orçamento anual'}},
+        {'op': 'status', 'id': tarefas[1]['id'], 'status': 'fazendo'},
+        {'op': 'deletar', 'id': tarefas[2]['id']},
+    ])
+
+    busca = cliente.get('/tasks/search?q=orcamento', headers=cabecalhos).get_json()['resultados']
+    assert [resultado['id'] for resultado in busca] == [tarefas[0]['id']]
+    assert cliente.get('/tasks/stats', headers=cabecalhos).get_json()['por_status'] == {'a fazer': 1, 'fazendo': 1, 'concluido': 0}
+
+    alteracoes = cliente.get(f'/tasks/changes?since={versao}', headers=cabecalhos).get_json()
+    assert alteracoes['versao'] == versao + 1
+    assert sorted(tarefa['id'] for tarefa in alteracoes['alteradas']) == [tarefas[0]['id'], tarefas[1]['id']]
+    assert alteracoes['removidas'] == [tarefas[2]['id']]
+
+
+def test_lote_sem_operacoes_validas_nao_muda_a_versao(cliente, cabecalhos):
+    versao = cliente.get('/tasks', headers=cabecalhos).headers['X-Versao-Tarefas']
+    dados = enviar_lote(cliente, cabecalhos, [{'op': 'deletar', 'id': 999999}])
+    assert dados['falhas'] == 1
+    assert cliente.get('/tasks', headers=cabecalhos).headers['X-Versao-Tarefas'] == versao
@@ -0,0 +1,136 @@
+# tests/test_migracoes.py
+"""
+Migrações 1-8 sobre uma cópia de instance/techflow.db (o banco de antes das migrações).
+
+O app é configurado no import, então cada banco migrado roda em um processo Python
+separado, que imprime em JSON o que os testes conferem. O arquivo original não é alterado.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from conftest import DIRETORIO_BACKEND, DIRETORIO_RAIZ
+
+BANCO_ORIGINAL = os.path.join(DIRETORIO_RAIZ, 'instance', 'techflow.db')
+
+# Executado no processo filho, com o banco copiado em TECHFLOW_DATABASE_URI
+VERIFICACAO = """
+import json
+from datetime import datetime
+
+import jwt
+
+import app as techflow
+
+resultado = {'aplicadas': techflow.migrar_banco(), 'reaplicadas': techflow.migrar_banco()}
+cliente = techflow.app.test_client()
+
+def cabecalhos(usuario_id):
+    token = jwt.encode({
+        'sub': str(usuario_id), 'exp': datetime.utcnow() + techflow.app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+        'nome': 'Teste', 'email': f'usuario{usuario_id}@techflow.dev'
+    }, techflow.app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+with techflow.app.app_context():
+    sessao = techflow.db.session
+    consultar = lambda comando: [list(linha) for linha in sessao.execute(techflow.db.text(comando))]
+    resultado['user_version'] = techflow.versao_esquema()
+    resultado['colunas_tarefa'] = [linha[1] for linha in consultar('PRAGMA table_info(tarefa)')]
+    resultado['tarefas'] = consultar('SELECT id, usuario_id, projeto_id, versao FROM tarefa ORDER BY id')
+    resultado['projetos'] = consultar('SELECT id, usuario_id, nome FROM projeto ORDER BY usuario_id, nome')
+    resultado['sequencia'] = consultar("SELECT seq FROM sqlite_sequence WHERE name = 'tarefa'")[0][0]
+    sessao.execute(techflow.db.text("INSERT INTO tarefa_fts (tarefa_fts, rank) VALUES ('integrity-check', 1)"))
+    resultado['contadores_corrigidos'] = techflow.reconciliar_contadores_tarefas()
+    resultado['arquivadas'] = techflow.arquivar_tarefas_concluidas()
+
+resultado['busca'] = [item['id'] for item in cliente.get('/tasks/search?q=orcamento', headers=cabecalhos(10)).get_json()['resultados']]
+resultado['estatisticas'] = cliente.get('/tasks/stats', headers=cabecalhos(10)).get_json()
+resultado['nova'] = cliente.post('/tasks', headers=cabecalhos(10), json={
+    'titulo': 'Nova', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta', 'projeto': 'CASA'
+}).get_json()['tarefa']
+print(json.dumps(resultado))
+"""
+
+
+def migrar_copia(caminho):
+    ambiente = {
+        **os.environ,
+        'TECHFLOW_DATABASE_URI': f'sqlite:///{caminho}',
+        'TECHFLOW_LIMITE_TAXA_ATIVO': '0',
+        'TECHFLOW_LEMBRETES_ATIVO': '0',
+        'TECHFLOW_SENHA_POOL_PROCESSOS': '0',
+        'PYTHONPATH': DIRETORIO_BACKEND,
+    }
+    processo = subprocess.run(
+        [sys.executable, '-c', VERIFICACAO], env=ambiente, cwd=DIRETORIO_RAIZ,
+        capture_output=True, text=True, timeout=120
+    )
+    assert processo.returncode == 0, processo.stderr
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope='module')
+def migrado(tmp_path_factory):
+    """Copia o banco original, acrescenta tarefas com projetos em texto livre e migra a cópia."""
+    caminho = str(tmp_path_factory.mktemp('migracoes') / 'techflow.db')
+    shutil.copyfile(BANCO_ORIGINAL, caminho)
+    conexao = sqlite3.connect(caminho)
+    colunas = 'titulo, data_vencimento, prioridade, projeto, status, data_criacao, data_conclusao, usuario_id'
+    conexao.executemany(f'INSERT INTO tarefa ({colunas}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [
+        ('Orçamento da casa', '2025-06-10 00:00:00.000000', 'Alta', 'casa', 'a fazer', '2025-05-01 10:00:00.000000', None, 10),
+        ('Pintura', '2025-06-10 00:00:00.000000', 'Média', 'Casa ', 'a fazer', '2025-04-01 10:00:00.000000', None, 10),
+        ('Jardim', '2025-06-10 00:00:00.000000', 'Baixa', 'casa', 'a fazer', '2025-06-01 10:00:00.000000', None, 10),
+        ('Sem projeto', '2025-06-10 00:00:00.000000', 'Baixa', '  ', 'a fazer', '2025-06-01 10:00:00.000000', None, 10),
+        ('Relatório', '2025-06-10 00:00:00.000000', 'Alta', 'Pessoal', 'a fazer', '2025-05-01 10:00:00.000000', None, 11),
+        ('Academia', '2025-06-10 00:00:00.000000', 'Alta', 'pessoal', 'concluido', '2025-05-02 10:00:00.000000', '2025-05-03 10:00:00.000000', 11),
+    ])
+    conexao.commit()
+    antes = conexao.execute('SELECT COUNT(*), MAX(id) FROM tarefa').fetchone()
+    conexao.close()
+    return antes, migrar_copia(caminho)
+
+
+def test_versao_e_idempotencia(migrado):
+    _, resultado = migrado
+    assert (resultado['aplicadas'], resultado['reaplicadas']) == (8, 0)
+    assert resultado['user_version'] == 8
+    assert 'projeto' not in resultado['colunas_tarefa']
+    assert {'projeto_id', 'versao', 'serie_id'} <= set(resultado['colunas_tarefa'])
+
+
+def test_tarefas_preservadas(migrado):
+    (quantidade, maior_id), resultado = migrado
+    assert len(resultado['tarefas']) == quantidade
+    assert resultado['sequencia'] == maior_id
+    assert all(versao == 0 for _, _, _, versao in resultado['tarefas']) # server_default da coluna nova
+
+
+def test_projetos_migrados(migrado):
+    _, resultado = migrado
+    # A grafia mais usada; no empate, a da tarefa criada primeiro
+    assert [(usuario_id, nome) for _, usuario_id, nome in resultado['projetos']] == [(10, 'casa'), (11, 'Pessoal')]
+    projetos = {usuario_id: projeto_id for projeto_id, usuario_id, _ in resultado['projetos']}
+    vinculadas = [(usuario_id, projeto_id) for _, usuario_id, projeto_id, _ in resultado['tarefas'] if projeto_id is not None]
+    assert sorted(vinculadas) == [(10, projetos[10])] * 3 + [(11, projetos[11])] * 2
+
+
+def test_busca_e_contadores(migrado):
+    (_, maior_id), resultado = migrado
+    assert resultado['contadores_corrigidos'] == 0
+    assert resultado['busca'] == [maior_id - 5]
+    assert resultado['estatisticas']['por_projeto'] == {'casa': 3}
+    assert resultado['estatisticas']['total'] == 5
+
+
+def test_ids_novos_depois_do_arquivamento(migrado):
+    (_, maior_id), resultado = migrado
+    # As concluídas em 2025 (inclusive a de maior id) foram para o arquivo
+    assert resultado['arquivadas'] >= 2
+    assert resultado['nova']['id'] == maior_id + 1
+    assert resultado['nova']['projeto'] == 'casa'
@@ -0,0 +1,113 @@
+# tests/test_series_projetos.py
+"""Séries recorrentes (ocorrências virtuais e materializadas) e rotas de projetos."""
+import pytest
+
+SERIE = {'titulo': 'Semanal', 'data_vencimento': '2030-01-07', 'prioridade': 'Média', 'recorrencia': {'frequencia': 'semanal'}}
+
+
+@pytest.fixture
+def serie(cliente, cabecalhos):
+    resposta = cliente.post('/tasks/series', headers=cabecalhos, json=SERIE)
+    assert resposta.status_code == 201
+    return resposta.get_json()['serie']
+
+
+@pytest.mark.parametrize('recorrencia, erro', [
+    (None, 'Campo obrigatório faltando ou vazio: recorrencia'),
+    ({'frequencia': 'anual'}, 'Frequência inválida. Use diaria, semanal ou mensal.'),
+    ({'frequencia': 'diaria', 'intervalo': 0}, 'Intervalo deve ser um inteiro entre 1 e 365.'),
+    ({'frequencia': 'diaria', 'data_fim': '2029-12-31'}, 'A data de fim deve ser igual ou posterior à primeira ocorrência.'),
+    ({'frequencia': 'diaria', 'data_fim': '31/12/2030'}, 'Formato de data de fim inválido. Use AAAA-MM-DD.'),
+    ({'frequencia': 'diaria', 'quantidade': 0}, 'Quantidade de ocorrências deve ser um inteiro positivo.'),
+])
+def test_criar_serie_invalida(cliente, cabecalhos, recorrencia, erro):
+    resposta = cliente.post('/tasks/series', headers=cabecalhos, json={**SERIE, 'recorrencia': recorrencia})
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == erro
+
+
+def test_ocorrencias_no_quadro(cliente, cabecalhos, serie):
+    quadro = cliente.get('/tasks?status=a fazer&vencimento_de=2030-01-01&vencimento_ate=2030-01-31', headers=cabecalhos).get_json()
+    ocorrencias = [tarefa for tarefa in quadro['a fazer'] if tarefa['serie_id'] == serie['id']]
+    assert [tarefa['data_vencimento'][:10] for tarefa in ocorrencias] == ['2030-01-07', '2030-01-14', '2030-01-21', '2030-01-28']
+    assert all(tarefa['id'] is None for tarefa in ocorrencias)
+    assert cliente.get('/tasks/series', headers=cabecalhos).get_json()['series'][0]['id'] == serie['id']
+
+
+def test_materializar_ocorrencia(cliente, cabecalhos, serie, cadastrar):
+    url = f"/tasks/series/{serie['id']}/ocorrencias"
+    assert cliente.patch(f'{url}/07-01-2030', headers=cabecalhos, json={}).status_code == 400
+    assert cliente.patch(f'{url}/2030-01-08', headers=cabecalhos, json={}).status_code == 404
+    _, outro = cadastrar()
+    assert cliente.patch(f'{url}/2030-01-07', headers=outro, json={}).status_code == 404
+    assert cliente.patch(f'{url}/2030-01-07', headers=cabecalhos, json={'prioridade': 'Urgente'}).status_code == 400
+
+    resposta = cliente.patch(f'{url}/2030-01-07', headers=cabecalhos, json={'status': 'fazendo', 'concluida': True})
+    assert resposta.status_code == 201
+    tarefa = resposta.get_json()['tarefa']
+    # 'status' prevalece sobre 'concluida', sem data de conclusão
+    assert (tarefa['status'], tarefa['data_conclusao'], tarefa['serie_id']) == ('fazendo', None, serie['id'])
+
+    repetida = cliente.patch(f'{url}/2030-01-07', headers=cabecalhos, json={'concluida': True})
+    assert repetida.status_code == 409
+    assert repetida.get_json()['tarefa']['id'] == tarefa['id']
+
+
+def test_remover_ocorrencias_e_serie(cliente, cabecalhos, serie):
+    url = f"/tasks/series/{serie['id']}/ocorrencias"
+    assert cliente.delete(f'{url}/2030-01-14', headers=cabecalhos).status_code == 200
+    assert cliente.delete(f'{url}/2030-01-14', headers=cabecalhos).status_code == 404
+    tarefa = cliente.patch(f'{url}/2030-01-21', headers=cabecalhos, json={'concluida': True}).get_json()['tarefa']
+    # Remover a tarefa materializada pela rota comum também impede que a ocorrência volte
+    assert cliente.delete(f"/tasks/{tarefa['id']}", headers=cabecalhos).status_code == 200
+    assert cliente.patch(f'{url}/2030-01-21', headers=cabecalhos, json={}).status_code == 404
+
+    quadro = cliente.get('/tasks?status=a fazer&vencimento_de=2030-01-01&vencimento_ate=2030-01-31', headers=cabecalhos).get_json()
+    assert [tarefa['data_vencimento'][:10] for tarefa in quadro['a fazer']] == ['2030-01-07', '2030-01-28']
+
+    materializada = cliente.patch(f'{url}/2030-01-07', headers=cabecalhos, json={'titulo': 'Editada'}).get_json()['tarefa']
+    assert cliente.delete(f"/tasks/series/{serie['id']}", headers=cabecalhos).get_json()['desvinculadas'] == 1
+    assert cliente.delete(f"/tasks/series/{serie['id']}", headers=cabecalhos).status_code == 404
+    avulsa = cliente.get(f"/tasks/{materializada['id']}", headers=cabecalhos).get_json()
+    assert (avulsa['titulo'], avulsa['serie_id']) == ('Editada', None)
+
+
+@pytest.mark.parametrize('dados, erro', [
+    ({}, 'Campo obrigatório faltando ou vazio: nome'),
+    ({'nome': '   '}, 'Campo obrigatório faltando ou vazio: nome'),
+    ({'nome': 'x' * 101}, 'O nome do projeto deve ter no máximo 100 caracteres.'),
+    ({'nome': 'Casa', 'cor': 'azul'}, 'Cor inválida. Use o formato #RRGGBB.'),
+])
+def test_criar_projeto_invalido(cliente, cabecalhos, dados, erro):
+    resposta = cliente.post('/projects', headers=cabecalhos, json=dados)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == erro
+
+
+def test_projetos(cliente, cabecalhos, criar_tarefa, cadastrar):
+    resposta = cliente.post('/projects', headers=cabecalhos, json={'nome': 'Casa', 'cor': '#10b981'})
+    assert resposta.status_code == 201
+    projeto = resposta.get_json()['projeto']
+    assert projeto['cor'] == '#10b981'
+    assert cliente.post('/projects', headers=cabecalhos, json={'nome': 'casa'}).status_code == 409
+    outro_projeto = cliente.post('/projects', headers=cabecalhos, json={'nome': 'Trabalho'}).get_json()['projeto']
+
+    criar_tarefa(projeto='CASA') # Mesmo projeto: os nomes não diferenciam maiúsculas
+    criar_tarefa()
+    dados = cliente.get('/projects', headers=cabecalhos).get_json()
+    assert [(item['nome'], item['total_tarefas']) for item in dados['projetos']] == [('Casa', 1), ('Trabalho', 0)]
+    assert dados['sem_projeto'] == {'total_tarefas': 1, 'tarefas_abertas': 1}
+
+    _, outro = cadastrar()
+    url = f"/projects/{projeto['id']}"
+    assert cliente.get(url, headers=outro).status_code == 404
+    assert cliente.patch(url, headers=outro, json={'nome': 'x'}).status_code == 404
+    assert cliente.delete(url, headers=outro).status_code == 404
+    assert cliente.patch(url, headers=cabecalhos, json={'cor': '#123'}).status_code == 400
+    assert cliente.patch(url, headers=cabecalhos, json={'nome': outro_projeto['nome']}).status_code == 409
+
+    assert cliente.patch(url, headers=cabecalhos, json={'nome': 'Lar'}).get_json()['projeto']['nome'] == 'Lar'
+    assert cliente.get(url, headers=cabecalhos).get_json()['total_tarefas'] == 1
+    assert cliente.delete(url, headers=cabecalhos).get_json()['desvinculadas'] == 1
+    assert cliente.get(url, headers=cabecalhos).status_code == 404
+    assert cliente.get('/projects', headers=cabecalhos).get_json()['sem_projeto']['total_tarefas'] == 2
@@ -0,0 +1,317 @@
+# tests/test_tarefas.py
+"""Rotas de tarefas: validação, concorrência otimista, ETag/304, paginação por chave, busca e sincronização."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.mark.parametrize('dados, erro', [
+    ({'data_vencimento': '2030-01-10', 'prioridade': 'Alta'}, 'Campo obrigatório faltando ou vazio: titulo'),
+    ({'titulo': 'x', 'data_vencimento': '10/01/2030', 'prioridade': 'Alta'}, 'Formato de data de vencimento inválido. Use AAAA-MM-DD.'),
+    ({'titulo': 'x', 'data_vencimento': '2030-01-10', 'prioridade': 'Urgente'}, 'Prioridade inválida. Use Baixa, Média ou Alta.'),
+    ({'titulo': ['x'], 'data_vencimento': '2030-01-10', 'prioridade': 'Alta'}, 'Título e descrição devem ser texto.'),
+    ({'titulo': 'x', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta', 'projeto_id': 'um'}, 'projeto_id deve ser um inteiro.'),
+])
+def test_criar_tarefa_invalida(cliente, cabecalhos, dados, erro):
+    resposta = cliente.post('/tasks', headers=cabecalhos, json=dados)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == erro
+
+
+def test_criar_tarefa_com_projeto_de_outro_usuario(cliente, cabecalhos, cadastrar):
+    _, outro = cadastrar()
+    projeto_id = cliente.post('/projects', headers=outro, json={'nome': 'Alheio'}).get_json()['projeto']['id']
+    resposta = cliente.post('/tasks', headers=cabecalhos, json={
+        'titulo': 'x', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta', 'projeto_id': projeto_id
+    })
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == 'Projeto não encontrado ou não pertence ao usuário.'
+
+
+def test_tarefa_de_outro_usuario_nao_e_visivel(cliente, criar_tarefa, cadastrar):
+    tarefa = criar_tarefa()
+    _, outro = cadastrar()
+    assert cliente.get(f"/tasks/{tarefa['id']}", headers=outro).status_code == 404
+    assert cliente.put(f"/tasks/{tarefa['id']}", headers=outro, json={'titulo': 'y'}).status_code == 404
+    assert cliente.patch(f"/tasks/{tarefa['id']}/status", headers=outro, json={'status': 'fazendo'}).status_code == 404
+    assert cliente.delete(f"/tasks/{tarefa['id']}", headers=outro).status_code == 404
+
+
+def test_editar_tarefa(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    resposta = cliente.patch(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'titulo': ' Nova ', 'prioridade': 'Alta'})
+    assert resposta.status_code == 200
+    editada = resposta.get_json()['tarefa']
+    assert (editada['titulo'], editada['prioridade'], editada['versao']) == ('Nova', 'Alta', tarefa['versao'] + 1)
+
+    assert cliente.patch(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'prioridade': 'Urgente'}).status_code == 400
+    assert cliente.patch(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'data_vencimento': 'amanhã'}).status_code == 400
+    assert cliente.patch('/tasks/999999', headers=cabecalhos, json={'titulo': 'y'}).status_code == 404
+
+
+def test_edicao_recusa_status(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    resposta = cliente.put(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'titulo': 'y', 'status': 'concluido'})
+    assert resposta.status_code == 400
+    assert f"PATCH /tasks/{tarefa['id']}/status" in resposta.get_json()['erro']
+    assert cliente.get(f"/tasks/{tarefa['id']}", headers=cabecalhos).get_json()['status'] == 'a fazer'
+
+
+def test_edicao_por_concluida(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    concluida = cliente.put(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'concluida': True}).get_json()['tarefa']
+    assert concluida['status'] == 'concluido' and concluida['data_conclusao']
+    reaberta = cliente.put(f"/tasks/{tarefa['id']}", headers=cabecalhos, json={'concluida': False}).get_json()['tarefa']
+    assert reaberta['status'] == 'a fazer' and reaberta['data_conclusao'] is None
+
+
+def test_mudanca_de_status(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    url = f"/tasks/{tarefa['id']}/status"
+    assert cliente.patch(url, headers=cabecalhos).status_code == 400
+    assert cliente.patch(url, headers=cabecalhos, json={'status': 'pronto'}).status_code == 400
+    assert cliente.patch(url, headers=cabecalhos, json={'status': 'fazendo', 'versao': '1'}).status_code == 400
+
+    resposta = cliente.patch(url, headers=cabecalhos, json={'status': 'concluido', 'versao': tarefa['versao']})
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['status'] == 'concluido' and dados['versao'] == tarefa['versao'] + 1
+    datetime.fromisoformat(dados['data_conclusao'])
+
+    # Sem a versão, a última escrita prevalece; ao sair de 'concluido' a data de conclusão é limpa
+    dados = cliente.patch(url, headers=cabecalhos, json={'status': 'fazendo'}).get_json()
+    assert dados['data_conclusao'] is None and dados['versao'] == tarefa['versao'] + 2
+
+
+def test_mudanca_de_status_com_versao_antiga(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    url = f"/tasks/{tarefa['id']}/status"
+    assert cliente.patch(url, headers=cabecalhos, json={'status': 'fazendo', 'versao': tarefa['versao']}).status_code == 200
+
+    resposta = cliente.patch(url, headers=cabecalhos, json={'status': 'concluido', 'versao': tarefa['versao']})
+    assert resposta.status_code == 409
+    assert resposta.get_json() == {
+        'erro': 'A tarefa foi alterada em outro lugar. Recarregue o quadro.',
+        'id': tarefa['id'], 'status': 'fazendo', 'versao': tarefa['versao'] + 1
+    }
+    assert cliente.get(f"/tasks/{tarefa['id']}", headers=cabecalhos).get_json()['status'] == 'fazendo'
+
+
+def test_deletar_tarefa(cliente, cabecalhos, criar_tarefa):
+    tarefa = criar_tarefa()
+    assert cliente.delete(f"/tasks/{tarefa['id']}", headers=cabecalhos).status_code == 200
+    assert cliente.get(f"/tasks/{tarefa['id']}", headers=cabecalhos).status_code == 404
+    assert cliente.delete(f"/tasks/{tarefa['id']}", headers=cabecalhos).status_code == 404
+
+
+@pytest.mark.parametrize('parametros, erro', [
+    ('status=pronto', 'Status inválido fornecido.'),
+    ('prioridade=Urgente', 'Prioridade inválida. Use Baixa, Média ou Alta.'),
+    ('vencimento_de=01-01-2030', 'Formato de data inválido. Use AAAA-MM-DD.'),
+    ('limite=abc', 'Limite inválido.'),
+    ('limite=0', 'Limite deve estar entre 1 e 500.'),
+    ('limite=501', 'Limite deve estar entre 1 e 500.'),
+    ('projeto_id=abc', 'projeto_id inválido.'),
+    ('limite=2&cursor=abc', 'O cursor exige os parâmetros status e limite.'),
+    ('status=fazendo&limite=2&cursor=%%%', 'Cursor inválido.'),
+])
+def test_listar_tarefas_parametros_invalidos(cliente, cabecalhos, parametros, erro):
+    resposta = cliente.get(f'/tasks?{parametros}', headers=cabecalhos)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'] == erro
+
+
+def test_paginacao_por_chave(cliente, cabecalhos, criar_tarefa):
+    vencimentos = ['2030-03-01', '2030-01-01', '2030-02-01', '2030-01-01', '2030-02-01', '2030-01-01', '2030-04-01']
+    criadas = [criar_tarefa(titulo=f'T{i}', data_vencimento=vencimento) for i, vencimento in enumerate(vencimentos)]
+    esperado = [tarefa['id'] for tarefa in sorted(criadas, key=lambda tarefa: (tarefa['data_vencimento'], tarefa['id']))]
+
+    vistos = []
+    cursor = ''
+    while True:
+        resposta = cliente.get(f'/tasks?status=a fazer&limite=3{cursor}', headers=cabecalhos)
+        assert resposta.status_code == 200
+        dados = resposta.get_json()
+        assert list(dados) == ['a fazer', 'paginacao']
+        assert len(dados['a fazer']) <= 3
+        vistos += [tarefa['id'] for tarefa in dados['a fazer']]
+        proximo = dados['paginacao']['a fazer']['proximo_cursor']
+        if proximo is None:
+            break
+        cursor = f'&cursor={proximo}'
+    assert vistos == esperado
+
+    # Uma tarefa inserida antes do cursor não desloca as páginas seguintes
+    primeira = cliente.get('/tasks?status=a fazer&limite=3', headers=cabecalhos).get_json()
+    criar_tarefa(titulo='Antes', data_vencimento='2029-12-31')
+    cursor = primeira['paginacao']['a fazer']['proximo_cursor']
+    segunda = cliente.get(f'/tasks?status=a fazer&limite=3&cursor={cursor}', headers=cabecalhos).get_json()
+    assert [tarefa['id'] for tarefa in segunda['a fazer']] == esperado[3:6]
+
+
+def test_etag_e_304(cliente, cabecalhos, criar_tarefa):
+    criar_tarefa()
+    resposta = cliente.get('/tasks', headers=cabecalhos)
+    etag = resposta.headers['ETag']
+    assert resposta.status_code == 200
+    assert resposta.headers['Cache-Control'] == 'private, no-cache'
+    assert resposta.headers['X-Versao-Tarefas'] == etag.strip('"').rsplit('-', 1)[1]
+
+    revalidada = cliente.get('/tasks', headers={**cabecalhos, 'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.data == b''
+
+    criar_tarefa(titulo='Outra')
+    nova = cliente.get('/tasks', headers={**cabecalhos, 'If-None-Match': etag})
+    assert nova.status_code == 200
+    assert nova.headers['ETag'] != etag
+    assert len(nova.get_json()['a fazer']) == 2
+
+
+def test_etag_e_cache_mudam_com_o_dia(cliente, cabecalhos, app_techflow, monkeypatch):
+    # A janela padrão das ocorrências recorrentes começa hoje: a ocorrência de hoje sai do quadro amanhã
+    hoje = datetime.utcnow().date()
+    resposta = cliente.post('/tasks/series', headers=cabecalhos, json={
+        'titulo': 'Diária', 'data_vencimento': hoje.isoformat(), 'prioridade': 'Baixa',
+        'recorrencia': {'frequencia': 'diaria'}
+    })
+    assert resposta.status_code == 201
+    resposta = cliente.get('/tasks', headers=cabecalhos)
+    etag = resposta.headers['ETag']
+    assert resposta.get_json()['a fazer'][0]['data_vencimento'].startswith(hoje.isoformat())
+
+    class Amanha(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=1)
+
+    monkeypatch.setattr(app_techflow, 'datetime', Amanha)
+    resposta = cliente.get('/tasks', headers={**cabecalhos, 'If-None-Match': etag})
+    assert resposta.status_code == 200
+    assert resposta.headers['ETag'] != etag
+    assert resposta.get_json()['a fazer'][0]['data_vencimento'].startswith((hoje + timedelta(days=1)).isoformat())
+
+
+def test_filtros_do_quadro(cliente, cabecalhos, criar_tarefa):
+    criar_tarefa(titulo='A', prioridade='Alta', projeto='Casa', data_vencimento='2030-01-05')
+    criar_tarefa(titulo='B', prioridade='Baixa', data_vencimento='2030-02-05')
+    criar_tarefa(titulo='C', prioridade='Alta', data_vencimento='2030-03-05')
+    titulos = lambda parametros: sorted(
+        tarefa['titulo'] for tarefa in cliente.get(f'/tasks?status=a fazer&{parametros}', headers=cabecalhos).get_json()['a fazer']
+    )
+    assert titulos('prioridade=Alta') == ['A', 'C']
+    assert titulos('projeto=Casa') == ['A']
+    assert titulos('projeto=') == ['B', 'C']
+    assert titulos('projeto=Inexistente') == []
+    assert titulos('vencimento_de=2030-02-01&vencimento_ate=2030-03-05') == ['B', 'C']
+
+
+def test_busca_parametros_invalidos(cliente, cabecalhos):
+    assert cliente.get('/tasks/search', headers=cabecalhos).status_code == 400
+    assert cliente.get('/tasks/search?q=***', headers=cabecalhos).status_code == 400
+    assert cliente.get('/tasks/search?q=a&limite=x', headers=cabecalhos).status_code == 400
+    assert cliente.get('/tasks/search?q=a&limite=101', headers=cabecalhos).status_code == 400
+    assert cliente.get('/tasks/search?q=a&pagina=0', headers=cabecalhos).status_code == 400
+
+
+@pytest.mark.parametrize('consulta', ['"relatório', 'relat*', 'NEAR(relatorio', 'relatorio AND OR NOT', 'titulo:relatorio', '-relatorio ^', "relatorio' --"])
+def test_busca_escapa_a_sintaxe_do_fts(cliente, cabecalhos, criar_tarefa, consulta):
+    criar_tarefa(titulo='Relatório mensal')
+    resposta = cliente.get('/tasks/search', headers=cabecalhos, query_string={'q': consulta})
+    assert resposta.status_code == 200
+
+
+def test_busca_destaca_em_html_escapado(cliente, cabecalhos, criar_tarefa, cadastrar):
+    criar_tarefa(titulo='<script>alert(1)</script> relatório', descricao=' '.join(['palavra'] * 30 + ['<b>relatorio</b>'] + ['fim'] * 30))
+    criar_tarefa(titulo='Sem relação')
+    _, outro = cadastrar()
+    cliente.post('/tasks', headers=outro, json={'titulo': 'relatório alheio', 'data_vencimento': '2030-01-10', 'prioridade': 'Alta'})
+
+    dados = cliente.get('/tasks/search?q=relatorio', headers=cabecalhos).get_json()
+    assert len(dados['resultados']) == 1
+    resultado = dados['resultados'][0]
+    assert resultado['titulo_destacado'] == '&lt;script&gt;alert(1)&lt;/script&gt; <mark>relatório</mark>'
+    trecho = resultado['trecho_descricao']
+    assert trecho.startswith('…') and trecho.endswith('…')
+    assert '&lt;b&gt;<mark>relatorio</mark>&lt;/b&gt;' in trecho
+    assert len(trecho.split()) <= 16
+
+
+def test_busca_por_prefixo_e_paginas(cliente, cabecalhos, criar_tarefa):
+    for i in range(3):
+        criar_tarefa(titulo=f'Planejamento {i}')
+    pagina = cliente.get('/tasks/search?q=planej&limite=2', headers=cabecalhos).get_json()
+    assert len(pagina['resultados']) == 2 and pagina['tem_mais'] is True
+    pagina = cliente.get('/tasks/search?q=planej&limite=2&pagina=2', headers=cabecalhos).get_json()
+    assert len(pagina['resultados']) == 1 and pagina['tem_mais'] is False
+    # Terminada em espaço, a consulta não casa por prefixo
+    assert cliente.get('/tasks/search', headers=cabecalhos, query_string={'q': 'planej '}).get_json()['resultados'] == []
+
+
+def test_sincronizacao_incremental(cliente, cabecalhos, criar_tarefa):
+    assert cliente.get('/tasks/changes', headers=cabecalhos).status_code == 400
+    assert cliente.get('/tasks/changes?since=-1', headers=cabecalhos).status_code == 400
+
+    mantida = criar_tarefa()
+    removida = criar_tarefa()
+    versao = int(cliente.get('/tasks', headers=cabecalhos).headers['X-Versao-Tarefas'])
+    cliente.patch(f"/tasks/{mantida['id']}/status", headers=cabecalhos, json={'status': 'fazendo'})
+    cliente.delete(f"/tasks/{removida['id']}", headers=cabecalhos)
+
+    dados = cliente.get(f'/tasks/changes?since={versao}', headers=cabecalhos).get_json()
+    assert dados['versao'] == versao + 2
+    assert [tarefa['id'] for tarefa in dados['alteradas']] == [mantida['id']]
+    assert dados['removidas'] == [removida['id']]
+    assert cliente.get(f"/tasks/changes?since={dados['versao']}", headers=cabecalhos).get_json()['alteradas'] == []
+
+
+def test_sincronizacao_apos_compactacao(cliente, usuario, sql):
+    usuario_id, cabecalhos = usuario
+    sql('UPDATE usuario SET versao_tarefas = 10, versao_compactada = 5 WHERE id = :id', {'id': usuario_id})
+    resposta = cliente.get('/tasks/changes?since=4', headers=cabecalhos)
+    assert resposta.status_code == 410
+    assert resposta.get_json()['versao'] == 10
+    assert cliente.get('/tasks/changes?since=5', headers=cabecalhos).status_code == 200
+
+
+def test_estatisticas(cliente, cabecalhos, criar_tarefa):
+    ontem = (datetime.utcnow().date() - timedelta(days=1)).isoformat()
+    hoje = datetime.utcnow().date().isoformat()
+    criar_tarefa(data_vencimento=ontem, prioridade='Alta', projeto='Casa')
+    criar_tarefa(data_vencimento=hoje, prioridade='Baixa')
+    concluida = criar_tarefa(data_vencimento=ontem)
+    cliente.patch(f"/tasks/{concluida['id']}/status", headers=cabecalhos, json={'status': 'concluido'})
+
+    dados = cliente.get('/tasks/stats', headers=cabecalhos).get_json()
+    assert dados['total'] == 3
+    assert dados['por_status'] == {'a fazer': 2, 'fazendo': 0, 'concluido': 1}
+    assert dados['por_prioridade'] == {'Baixa': 1, 'Média': 1, 'Alta': 1}
+    assert dados['por_projeto'] == {'Casa': 1} and dados['sem_projeto'] == 2
+    assert (dados['atrasadas'], dados['vencem_hoje']) == (1, 1)
+    assert dados['conclusao']['concluidas'] == 1
+
+
+def test_exportar_e_importar(cliente, cabecalhos, criar_tarefa, cadastrar):
+    assert cliente.get('/tasks/export?formato=xml', headers=cabecalhos).status_code == 400
+    assert cliente.post('/tasks/import?formato=xml', headers=cabecalhos, data='').status_code == 400
+
+    criar_tarefa(titulo='Um', projeto='Casa')
+    criar_tarefa(titulo='Dois')
+    linhas = cliente.get('/tasks/export', headers=cabecalhos).data.decode().splitlines()
+    assert sorted(json.loads(linha)['titulo'] for linha in linhas) == ['Dois', 'Um']
+    csv = cliente.get('/tasks/export?formato=csv', headers=cabecalhos).data.decode()
+    assert csv.splitlines()[0] == 'id,titulo,descricao,data_vencimento,prioridade,projeto,projeto_id,status,data_criacao,data_conclusao,usuario_id'
+
+    _, outro = cadastrar()
+    corpo = '\n'.join(linhas + ['{quebrado', json.dumps({'titulo': 'Sem data', 'prioridade': 'Alta'})])
+    dados = cliente.post('/tasks/import', headers=outro, data=corpo).get_json()
+    assert (dados['importadas'], dados['falhas']) == (2, 2)
+    assert dados['erros'] == [
+        {'linha': 3, 'erro': 'JSON inválido.'},
+        {'linha': 4, 'erro': 'Campo obrigatório faltando ou vazio: data_vencimento'}
+    ]
+    assert cliente.get('/tasks/stats', headers=outro).get_json()['por_projeto'] == {'Casa': 1}
+
+    dados = cliente.post('/tasks/import', headers={**outro, 'Content-Type': 'text/csv'}, data=csv).get_json()
+    assert (dados['importadas'], dados['falhas']) == (2, 0)